@@ -1,20 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Dict, Any, Optional
 import os
 from pathlib import Path
 
-from app.database.config import get_db
+from app.database.config import get_async_read_db
 from app.database.models import Movie, Genre
 from app.api.services.tmdb_service import tmdb_api
-from app.database.import_movies import (
-    fetch_and_store_genres,
-    import_popular_movies,
-    import_top_rated_movies,
-    search_and_import_movies
-)
+from app.api.services.import_jobs import import_jobs
 
 # Create templates directory if it doesn't exist
 templates_dir = Path("app/templates")
@@ -32,9 +29,9 @@ async def admin_dashboard(request: Request):
     return templates.TemplateResponse("admin/dashboard.html", {"request": request})
 
 @admin_router.get("/movies", response_class=HTMLResponse)
-async def list_movies(request: Request, db: Session = Depends(get_db)):
+async def list_movies(request: Request, db: AsyncSession = Depends(get_async_read_db)):
     """List all movies in the database."""
-    movies = db.query(Movie).all()
+    movies = (await db.scalars(select(Movie).options(selectinload(Movie.genres)))).all()
     return templates.TemplateResponse(
         "admin/movies.html", 
         {
@@ -44,9 +41,9 @@ async def list_movies(request: Request, db: Session = Depends(get_db)):
     )
 
 @admin_router.get("/genres", response_class=HTMLResponse)
-async def list_genres(request: Request, db: Session = Depends(get_db)):
+async def list_genres(request: Request, db: AsyncSession = Depends(get_async_read_db)):
     """List all genres in the database."""
-    genres = db.query(Genre).all()
+    genres = (await db.scalars(select(Genre))).all()
     return templates.TemplateResponse(
         "admin/genres.html", 
         {
@@ -57,9 +54,9 @@ async def list_genres(request: Request, db: Session = Depends(get_db)):
 
 # API endpoints for JSON data
 @admin_router.get("/api/movies", response_model=List[Dict[str, Any]])
-async def get_movies(db: Session = Depends(get_db)):
+async def get_movies(db: AsyncSession = Depends(get_async_read_db)):
     """Get all movies as JSON."""
-    movies = db.query(Movie).all()
+    movies = (await db.scalars(select(Movie).options(selectinload(Movie.genres)))).all()
     result = []
     
     for movie in movies:
@@ -84,9 +81,9 @@ async def get_movies(db: Session = Depends(get_db)):
     return result
 
 @admin_router.get("/api/genres", response_model=List[Dict[str, Any]])
-async def get_genres(db: Session = Depends(get_db)):
+async def get_genres(db: AsyncSession = Depends(get_async_read_db)):
     """Get all genres as JSON."""
-    genres = db.query(Genre).all()
+    genres = (await db.scalars(select(Genre))).all()
     return [{"id": genre.id, "name": genre.name} for genre in genres]
 
 @admin_router.get("/import", response_class=HTMLResponse)
@@ -95,32 +92,47 @@ async def import_page(request: Request):
     return templates.TemplateResponse("admin/import.html", {"request": request})
 
 @admin_router.post("/import/popular")
-async def import_popular(
+def import_popular(
     request: Request,
-    page_count: int = Form(1),
-    db: Session = Depends(get_db)
+    page_count: int = Form(1)
 ):
-    """Import popular movies from TMDb."""
-    await import_popular_movies(db, page_count=page_count)
-    return RedirectResponse(url="/admin/movies", status_code=303)
+    """Queue an import of popular movies from TMDb."""
+    import_jobs.submit("popular", {"page_count": page_count})
+    return RedirectResponse(url="/admin/jobs", status_code=303)
 
 @admin_router.post("/import/top_rated")
-async def import_top_rated(
+def import_top_rated(
     request: Request,
-    page_count: int = Form(1),
-    db: Session = Depends(get_db)
+    page_count: int = Form(1)
 ):
-    """Import top rated movies from TMDb."""
-    await import_top_rated_movies(db, page_count=page_count)
-    return RedirectResponse(url="/admin/movies", status_code=303)
+    """Queue an import of top rated movies from TMDb."""
+    import_jobs.submit("top_rated", {"page_count": page_count})
+    return RedirectResponse(url="/admin/jobs", status_code=303)
 
 @admin_router.post("/import/search")
-async def import_from_search(
+def import_from_search(
     request: Request,
     query: str = Form(...),
-    page_count: int = Form(1),
-    db: Session = Depends(get_db)
+    page_count: int = Form(1)
 ):
-    """Search for movies by title and import them."""
-    await search_and_import_movies(db, query, page_count=page_count)
-    return RedirectResponse(url="/admin/movies", status_code=303) 
\ No newline at end of file
+    """Queue a search for movies by title and import of the results."""
+    import_jobs.submit("search", {"query": query, "page_count": page_count})
+    return RedirectResponse(url="/admin/jobs", status_code=303)
+
+@admin_router.get("/jobs", response_class=HTMLResponse)
+def list_jobs(request: Request):
+    """List recent import jobs and their progress."""
+    return templates.TemplateResponse(
+        "admin/jobs.html",
+        {
+            "request": request,
+            "jobs": import_jobs.list_jobs()
+        }
+    )
+
+@admin_router.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: int):
+    """Cancel a queued or running import job."""
+    if import_jobs.cancel(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return RedirectResponse(url="/admin/jobs", status_code=303) 
\ No newline at end of file
@@ -0,0 +1,21 @@
+from typing import Dict, Any
+from fastapi import APIRouter
+
+from app.api.services.query_cache import query_cache
+
+router = APIRouter()
+
+@router.get("/stats", response_model=Dict[str, Any])
+def get_cache_stats():
+    """
+    Get the response cache's hit rate, size and generations (hit and miss counters are per worker process).
+    """
+    return query_cache.get_stats()
+
+@router.post("/clear", response_model=Dict[str, Any])
+def clear_cache():
+    """
+    Remove all cached responses.
+    """
+    query_cache.clear()
+    return query_cache.get_stats()
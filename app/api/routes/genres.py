@@ -1,26 +1,47 @@
-from typing import List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 
-from app.database.config import get_db
+from app.database.config import get_read_db
+from app.api.schemas.movie import Genre
 from app.api.services.genre_service import get_genres, get_genre_by_id
+from app.api.services.query_cache import query_cache, GENRES
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Dict[str, Any]])
-def read_genres(db: Session = Depends(get_db)):
+# Genres rarely change; once expired, clients and CDNs revalidate with If-None-Match
+GENRES_CACHE_CONTROL = "public, max-age=3600"
+
+@router.get("/", response_model=List[Genre], response_class=ORJSONResponse)
+def read_genres(request: Request, db: Session = Depends(get_read_db)):
     """
     Get all genres.
     """
+    cache_key = query_cache.make_key(GENRES, "list")
+    cached = query_cache.get(cache_key, request)
+    if cached is not None:
+        return cached
+    
     genres = get_genres(db)
-    return [{"id": genre.id, "name": genre.name} for genre in genres]
+    return query_cache.respond(
+        cache_key, [{"id": genre.id, "name": genre.name} for genre in genres],
+        request=request, cache_control=GENRES_CACHE_CONTROL
+    )
 
-@router.get("/{genre_id}", response_model=Dict[str, Any])
-def read_genre(genre_id: int, db: Session = Depends(get_db)):
+@router.get("/{genre_id}", response_model=Genre, response_class=ORJSONResponse)
+def read_genre(genre_id: int, request: Request, db: Session = Depends(get_read_db)):
     """
     Get a specific genre by its ID.
     """
+    cache_key = query_cache.make_key(GENRES, "detail", {"id": genre_id})
+    cached = query_cache.get(cache_key, request)
+    if cached is not None:
+        return cached
+    
     genre = get_genre_by_id(db, genre_id)
     if not genre:
         raise HTTPException(status_code=404, detail="Genre not found")
-    return {"id": genre.id, "name": genre.name} 
\ No newline at end of file
+    return query_cache.respond(
+        cache_key, {"id": genre.id, "name": genre.name}, request=request, cache_control=GENRES_CACHE_CONTROL
+    ) 
\ No newline at end of file
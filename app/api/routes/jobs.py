@@ -0,0 +1,33 @@
+from typing import Dict, List, Any
+from fastapi import APIRouter, HTTPException, Query
+
+from app.api.services.import_jobs import import_jobs
+
+router = APIRouter()
+
+@router.get("/", response_model=List[Dict[str, Any]])
+def list_jobs(limit: int = Query(50, ge=1, le=500)):
+    """
+    Get the most recent import jobs.
+    """
+    return import_jobs.list_jobs(limit)
+
+@router.get("/{job_id}", response_model=Dict[str, Any])
+def read_job(job_id: int):
+    """
+    Get an import job's status, progress, rate and ETA.
+    """
+    job = import_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/{job_id}/cancel", response_model=Dict[str, Any])
+def cancel_job(job_id: int):
+    """
+    Cancel a queued or running import job.
+    """
+    job = import_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,69 +1,137 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session
 
-from app.database.config import get_db
-from app.database.models.movie import Movie as MovieModel, Genre
-from app.api.services.movie_service import get_movie_by_id, add_genre_to_movie
+from app.database.config import get_db, get_read_db
+from app.api.schemas.movie import Movie
+from app.api.services.movie_service import (
+    add_genre_to_movie, movie_list_query, movie_page, encode_cursor, decode_cursor, search_movies,
+    movie_responses, get_movie_response, parse_movie_fields, movie_columns, MOVIE_SORTS
+)
+from app.api.services.query_cache import query_cache, MOVIES
 
 router = APIRouter()
 
-@router.get("/")
+# The fields parameter of the list and detail routes (see MOVIE_FIELD_PRESETS)
+FIELDS_QUERY = Query(None, description="Comma-separated fields and presets (card, detail, full); id is always included")
+
+# Cache-Control of the movie responses; once expired, clients and CDNs revalidate with If-None-Match
+LIST_CACHE_CONTROL = "public, max-age=60"
+DETAIL_CACHE_CONTROL = "public, max-age=300"
+
+@router.get("/", response_model=List[Movie], response_class=ORJSONResponse)
 def read_movies(
+    request: Request,
     skip: int = 0, 
     limit: int = 100,
+    cursor: Optional[str] = None,  # X-Next-Cursor of the previous page
+    sort: Literal["rating", "votes", "year", "title", "added"] = "rating",
     title: Optional[str] = None,
     year_from: Optional[int] = None,
     year_to: Optional[int] = None,
     rating_from: Optional[float] = None,
     rating_to: Optional[float] = None,
-    genres: Optional[str] = Query(None),  # Comma-separated list of genres
-    db: Session = Depends(get_db)
+    genres: Optional[str] = Query(None),  # Comma-separated list of genres, any of which matches
+    genres_all: Optional[str] = Query(None),  # Comma-separated list of genres that must all match
+    fields: Optional[str] = FIELDS_QUERY,
+    db: Session = Depends(get_read_db)
 ):
     """
     Get a list of movies with optional filtering.
-    """
-    query = db.query(MovieModel).options(joinedload(MovieModel.genres))
     
-    # Apply filters
-    if title:
-        query = query.filter(MovieModel.title.ilike(f"%{title}%"))
+    Full pages carry an ``X-Next-Cursor`` header; passing it back as
+    ``cursor`` (with the same filters and sort) returns the next page, at the
+    same cost however deep it is and without rows shifting between pages
+    while movies are imported. ``skip`` still pages by offset.
     
-    if year_from:
-        query = query.filter(MovieModel.year >= year_from)
+    ``fields`` limits the response to some fields (``fields=card`` for the
+    movie cards); only their columns are selected, and genres are only read
+    if asked for.
     
-    if year_to:
-        query = query.filter(MovieModel.year <= year_to)
-    
-    if rating_from:
-        query = query.filter(MovieModel.rating >= rating_from)
+    Responses are cached until the next import or genre change, and carry
+    an ETag: a matching ``If-None-Match`` gets a 304.
+    """
+    try:
+        field_list = parse_movie_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    genres_list = [genre for genre in genres.split(",") if genre] if genres else None
+    genres_all_list = [genre for genre in genres_all.split(",") if genre] if genres_all else None
+    # Equivalent requests share a cache entry: genre order and repeats don't matter (the title is matched as is)
+    cache_key = query_cache.make_key(MOVIES, "list", {
+        "skip": skip, "limit": limit, "cursor": cursor, "sort": sort,
+        "title": title,
+        "year_from": year_from, "year_to": year_to, "rating_from": rating_from, "rating_to": rating_to,
+        "genres": ",".join(sorted(set(genres_list))) if genres_list else None,
+        "genres_all": ",".join(sorted(set(genres_all_list))) if genres_all_list else None,
+        "fields": ",".join(field_list)
+    })
+    cached = query_cache.get(cache_key, request)
+    if cached is not None:
+        return cached
     
-    if rating_to:
-        query = query.filter(MovieModel.rating <= rating_to)
+    # The sort key is selected even if not returned, for the next page's cursor
+    columns = movie_columns(field_list, extra=[MOVIE_SORTS[sort][0].key])
+    query = movie_list_query(
+        db, title, year_from, year_to, rating_from, rating_to, genres_list, genres_all_list, sort, columns=columns
+    )
     
-    # Filter by genres if provided
-    if genres:
-        genres_list = genres.split(",")
-        if genres_list:
-            query = query.join(MovieModel.genres).filter(Genre.name.in_(genres_list))
+    if cursor:
+        if skip:
+            raise HTTPException(status_code=400, detail="Use either skip or cursor, not both")
+        try:
+            after = decode_cursor(sort, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        movies = movie_page(query, sort, after, limit)
+    else:
+        movies = query.offset(skip).limit(limit).all()
     
-    # Apply pagination and ordering
-    query = query.order_by(MovieModel.rating.desc())
-    movies = query.offset(skip).limit(limit).all()
+    headers = {}
+    if movies and len(movies) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(sort, movies[-1])
+    return query_cache.respond(cache_key, movie_responses(db, movies, field_list), headers, request, LIST_CACHE_CONTROL)
+
+@router.get("/search", response_model=List[Movie], response_class=ORJSONResponse)
+def search_movies_endpoint(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = FIELDS_QUERY,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Search movies by title and director, best matches first.
     
-    return movies
+    The last word matches as a prefix, so partial input like "star wa"
+    already finds "Star Wars".
+    """
+    try:
+        field_list = parse_movie_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ORJSONResponse(search_movies(db, q, limit, field_list))
 
-@router.get("/{movie_id}")
-def read_movie(movie_id: int, db: Session = Depends(get_db)):
+@router.get("/{movie_id}", response_model=Movie, response_class=ORJSONResponse)
+def read_movie(movie_id: int, request: Request, fields: Optional[str] = FIELDS_QUERY, db: Session = Depends(get_read_db)):
     """
-    Get a specific movie by its ID.
+    Get a specific movie by its ID (only some fields with ``fields``, e.g. ``fields=detail``).
     """
-    db_movie = get_movie_by_id(db, movie_id)
-    if db_movie is None:
+    try:
+        field_list = parse_movie_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    cache_key = query_cache.make_key(MOVIES, "detail", {"id": movie_id, "fields": ",".join(field_list)})
+    cached = query_cache.get(cache_key, request)
+    if cached is not None:
+        return cached
+    
+    movie = get_movie_response(db, movie_id, field_list)
+    if movie is None:
         raise HTTPException(status_code=404, detail="Movie not found")
-    return db_movie
+    return query_cache.respond(cache_key, movie, request=request, cache_control=DETAIL_CACHE_CONTROL)
 
-@router.post("/{movie_id}/genres/{genre_id}")
+@router.post("/{movie_id}/genres/{genre_id}", response_model=Movie)
 def add_genre_to_movie_endpoint(movie_id: int, genre_id: int, db: Session = Depends(get_db)):
     """
     Add a genre to a movie.
@@ -1,18 +1,20 @@
 from typing import Dict, List, Optional, Any
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.config import get_db
+from app.database.config import get_async_db
+from app.database.models import Movie
 from app.api.services.tmdb_service import tmdb_api
-from app.database.import_movies import search_and_import_movies, import_movie
+from app.database.import_movies import write_movies
+from app.api.services.import_jobs import import_jobs
 
-router = APIRouter(prefix="/tmdb", tags=["tmdb"])
+router = APIRouter()
 
 @router.get("/search")
 async def search_movies(
     query: str,
-    page: int = Query(1, ge=1),
-    db: Session = Depends(get_db)
+    page: int = Query(1, ge=1)
 ):
     """
     Search for movies in TMDb.
@@ -27,60 +29,70 @@ async def search_movies(
 @router.post("/import")
 async def import_from_tmdb(
     tmdb_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Import a specific movie from TMDb by ID.
     """
+    # Skip the TMDb request entirely for movies we already have
+    if await db.scalar(select(Movie.id).where(Movie.tmdb_id == tmdb_id).limit(1)) is not None:
+        return {"message": "Movie already exists in the database or could not be imported"}
+    
     # Get movie details
     movie_details = await tmdb_api.get_movie_details(tmdb_id)
     
     if "error" in movie_details:
         raise HTTPException(status_code=500, detail=f"TMDb API error: {movie_details['error']}")
     
-    # Import the movie
-    movie = await import_movie(db, movie_details)
+    # The bulk writer is synchronous; run_sync drives it over the async engine's connection, so the
+    # event loop keeps serving requests. It loads an import context for just this movie, shared with no one
+    movie_ids = await db.run_sync(write_movies, [(movie_details, movie_details)])
     
-    if not movie:
+    if not movie_ids:
         return {"message": "Movie already exists in the database or could not be imported"}
     
-    return {"message": f"Movie '{movie.title}' imported successfully", "movie_id": movie.id}
+    return {"message": f"Movie '{movie_details.get('title')}' imported successfully", "movie_id": next(iter(movie_ids.values()))}
+
+def _job_response(job: Dict[str, Any], message: str) -> Dict[str, Any]:
+    return {"message": message, "job_id": job["id"], "status_url": f"/api/jobs/{job['id']}", "job": job}
 
-@router.post("/import/search")
-async def import_from_search(
+@router.post("/import/search", status_code=202)
+def import_from_search(
     query: str,
-    page_count: int = Query(1, ge=1, le=5),
-    db: Session = Depends(get_db)
+    page_count: int = Query(1, ge=1, le=5)
 ):
     """
-    Search for movies by title and import them.
+    Search for movies by title and import them in a background job.
     """
-    await search_and_import_movies(db, query, page_count)
-    return {"message": f"Search for '{query}' completed and movies imported"}
+    job = import_jobs.submit("search", {"query": query, "page_count": page_count})
+    return _job_response(job, f"Import of search results for '{query}' queued")
 
-@router.post("/import/popular")
-async def import_popular_movies(
-    page_count: int = Query(1, ge=1, le=5),
-    db: Session = Depends(get_db)
+@router.post("/import/popular", status_code=202)
+def import_popular_movies(
+    page_count: int = Query(1, ge=1, le=5)
 ):
     """
-    Import popular movies from TMDb.
+    Import popular movies from TMDb in a background job.
     """
-    from app.database.import_movies import import_popular_movies
-    await import_popular_movies(db, page_count)
-    return {"message": "Popular movies imported successfully"}
+    job = import_jobs.submit("popular", {"page_count": page_count})
+    return _job_response(job, "Import of popular movies queued")
 
-@router.post("/import/top_rated")
-async def import_top_rated_movies(
-    page_count: int = Query(1, ge=1, le=5),
-    db: Session = Depends(get_db)
+@router.post("/import/top_rated", status_code=202)
+def import_top_rated_movies(
+    page_count: int = Query(1, ge=1, le=5)
 ):
     """
-    Import top rated movies from TMDb.
+    Import top rated movies from TMDb in a background job.
+    """
+    job = import_jobs.submit("top_rated", {"page_count": page_count})
+    return _job_response(job, "Import of top rated movies queued")
+
+@router.get("/stats")
+async def get_client_stats():
+    """
+    Get TMDb client statistics (connection reuse, cache, rate limiting and coalesced calls).
     """
-    from app.database.import_movies import import_top_rated_movies
-    await import_top_rated_movies(db, page_count)
-    return {"message": "Top rated movies imported successfully"}
+    return tmdb_api.get_stats()
 
 @router.get("/genres")
 async def get_movie_genres():
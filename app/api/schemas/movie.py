@@ -1,85 +1,57 @@
-from typing import List, Optional, Dict, Any
-from datetime import date
-from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+
+# Schemas of the API's responses, matching the models in app/database/models
 
 # Base schemas for related entities
 class GenreBase(BaseModel):
     name: str
-    
+
 class GenreCreate(GenreBase):
     pass
 
 class Genre(GenreBase):
-    id: int
-    
-    class Config:
-        from_attributes = True
-
-class PersonBase(BaseModel):
-    name: str
-    imdb_id: Optional[str] = None
-    tmdb_id: Optional[int] = None
-    profile_url: Optional[str] = None
-
-class ActorCreate(PersonBase):
-    pass
+    model_config = ConfigDict(from_attributes=True)
 
-class Actor(PersonBase):
     id: int
-    
-    class Config:
-        from_attributes = True
-
-class DirectorCreate(PersonBase):
-    pass
-
-class Director(PersonBase):
-    id: int
-    
-    class Config:
-        from_attributes = True
 
 # Movie schemas
 class MovieBase(BaseModel):
     title: str
-    original_title: Optional[str] = None
-    year: Optional[int] = None
-    release_date: Optional[date] = None
-    runtime: Optional[int] = None
-    imdb_rating: Optional[float] = None
-    imdb_votes: Optional[int] = None
-    metacritic_score: Optional[int] = None
-    rotten_tomatoes_score: Optional[int] = None
-    plot: Optional[str] = None
-    tagline: Optional[str] = None
-    poster_url: Optional[str] = None
-    backdrop_url: Optional[str] = None
-    movie_metadata: Optional[Dict[str, Any]] = None
+    year: int
+    director: Optional[str] = None
+    runtime: Optional[int] = None  # in minutes
+    rating: Optional[float] = None  # TMDb rating, e.g. 8.7
+    votes: Optional[int] = None  # TMDb vote count
+    tmdb_id: Optional[int] = None
+    imdb_id: Optional[str] = None
+    language: Optional[str] = None  # original language, e.g. 'en'
+    poster_path: Optional[str] = None  # TMDb image paths
+    backdrop_path: Optional[str] = None
 
 class MovieCreate(MovieBase):
-    imdb_id: str
-    tmdb_id: Optional[str] = None
+    identifier: str  # "Title (Year)"
 
 class MovieUpdate(MovieBase):
     pass
 
 class Movie(MovieBase):
-    imdb_id: str
-    tmdb_id: Optional[str] = None
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    identifier: str
+    created_at: datetime
+    updated_at: datetime
     genres: List[Genre] = []
-    actors: List[Actor] = []
-    directors: List[Director] = []
-    
-    class Config:
-        from_attributes = True
 
-# Schema for filtering movies
+# Schema for filtering movies (the query parameters of GET /api/movies/)
 class MovieFilter(BaseModel):
     title: Optional[str] = None
     year_from: Optional[int] = None
     year_to: Optional[int] = None
     rating_from: Optional[float] = None
     rating_to: Optional[float] = None
-    genres: Optional[List[str]] = None
-    directors: Optional[List[str]] = None
-    actors: Optional[List[str]] = None 
\ No newline at end of file
+    genres: Optional[List[str]] = None  # any of these
+    genres_all: Optional[List[str]] = None  # all of these
+    sort: Literal["rating", "votes", "year", "title", "added"] = "rating"
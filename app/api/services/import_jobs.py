@@ -0,0 +1,373 @@
+import os
+import uuid
+import socket
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Any, Callable, Awaitable, Tuple
+from sqlalchemy import and_, or_
+
+from app.database.config import engine, SessionLocal
+from app.database.models import ImportJob
+from app.database.import_pipeline import ImportPipeline
+from app.api.services.tmdb_service import tmdb_api
+
+logger = logging.getLogger(__name__)
+
+# Movies per TMDb list page, used to estimate a job's total
+PAGE_SIZE = 20
+
+def _page_source(kind: str, params: Dict[str, Any]) -> Tuple[Callable[[int], Awaitable[Dict[str, Any]]], int]:
+    """Get the page fetcher and page count for a job."""
+    page_count = int(params.get("page_count", 1))
+    if kind == "popular":
+        return tmdb_api.get_popular_movies, page_count
+    if kind == "top_rated":
+        return tmdb_api.get_top_rated_movies, page_count
+    if kind == "search":
+        query = params["query"]
+
+        async def fetch_page(page: int) -> Dict[str, Any]:
+            return await tmdb_api.search_movies(query, page)
+
+        return fetch_page, page_count
+    raise ValueError(f"Unknown import job kind: {kind}")
+
+JOB_KINDS = ("popular", "top_rated", "search")
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """SQLite returns naive datetimes; treat them as UTC."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+def job_to_dict(job: ImportJob) -> Dict[str, Any]:
+    """Serialize a job with its progress, rate and ETA."""
+    processed = job.imported + job.skipped + job.failed
+    started_at = _as_utc(job.started_at)
+    finished_at = _as_utc(job.finished_at)
+
+    elapsed = None
+    rate = None
+    eta = None
+    if started_at is not None:
+        elapsed = ((finished_at or _now()) - started_at).total_seconds()
+        if elapsed > 0 and processed:
+            rate = processed / elapsed
+            if job.status == ImportJob.RUNNING and job.total:
+                eta = max(job.total - processed, 0) / rate
+
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "params": job.params,
+        "status": "cancelling" if job.status == ImportJob.RUNNING and job.cancel_requested else job.status,
+        "progress": {
+            "total": job.total,
+            "processed": processed,
+            "imported": job.imported,
+            "skipped": job.skipped,
+            "failed": job.failed,
+            "percent": round(min(processed / job.total, 1.0) * 100, 1) if job.total else None
+        },
+        "rate_per_s": round(rate, 2) if rate is not None else None,
+        "elapsed_s": round(elapsed, 1) if elapsed is not None else None,
+        "eta_s": round(eta, 1) if eta is not None else None,
+        "error": job.error,
+        "created_at": _as_utc(job.created_at).isoformat() if job.created_at else None,
+        "started_at": started_at.isoformat() if started_at else None,
+        "finished_at": finished_at.isoformat() if finished_at else None
+    }
+
+class ImportJobQueue:
+    """
+    Runs TMDb imports as background jobs.
+
+    Jobs are persisted in the ``import_jobs`` table, so queued (and
+    interrupted) jobs survive a restart, and several API processes can share
+    the table. A fixed number of workers claim jobs in submission order; each
+    job runs an ``ImportPipeline`` with its own database session and records
+    its progress after every written batch.
+
+    A claimed job is leased to this queue (``worker_id``) for
+    ``IMPORT_JOB_LEASE_SECONDS`` and the lease is renewed (``heartbeat_at``)
+    while it runs. Only jobs whose lease expired, i.e. whose process died,
+    are claimed again by another worker. Cancellation is a flag in the row
+    that the worker running the job polls, so it works across processes.
+
+    The workers run on the event loop but do all their database work
+    (claims, heartbeats, progress and the pipeline's writes) in threads, so
+    a large import doesn't stall the API's requests. ``submit``, ``get``,
+    ``list_jobs`` and ``cancel`` query the database synchronously and are
+    meant to be called from threadpool (plain ``def``) routes, which hand the
+    loop their wakeups.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, lease_seconds: Optional[float] = None,
+                 poll_interval: Optional[float] = None):
+        """
+        Args:
+            max_workers: Number of jobs that run concurrently
+            lease_seconds: Seconds without a heartbeat after which a running job is claimed again
+            poll_interval: Seconds between heartbeats, cancellation checks and looks for new jobs
+        """
+        self.max_workers = max_workers or int(os.getenv("IMPORT_JOB_WORKERS", "2"))
+        self.lease_seconds = lease_seconds or float(os.getenv("IMPORT_JOB_LEASE_SECONDS", "60"))
+        self.poll_interval = poll_interval or float(os.getenv("IMPORT_JOB_POLL_SECONDS", "2"))
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+        self._monitor_task: Optional[asyncio.Task] = None
+        self._running: Dict[int, asyncio.Task] = {}
+        self._cancel_requested = set()
+        self._lost = set()
+
+    async def startup(self):
+        """Create the jobs table if needed and start the workers."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        queued = await asyncio.to_thread(self._prepare)
+
+        self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self.max_workers)]
+        self._monitor_task = asyncio.ensure_future(self._monitor())
+        logger.info(f"Import job queue {self.worker_id} started ({self.max_workers} workers, {queued} queued)")
+
+    async def shutdown(self):
+        """Stop the workers and hand their jobs back to the queue."""
+        tasks = self._workers + ([self._monitor_task] if self._monitor_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._monitor_task = None
+
+        # Interrupted jobs start over right away instead of waiting for their lease to expire
+        released = await asyncio.to_thread(self._release)
+        if released:
+            logger.info(f"Requeued {released} interrupted import jobs")
+
+    def _prepare(self) -> int:
+        """Create the jobs table if needed; returns the number of queued jobs."""
+        ImportJob.__table__.create(bind=engine, checkfirst=True)
+        with SessionLocal() as db:
+            return db.query(ImportJob).filter(ImportJob.status == ImportJob.QUEUED).count()
+
+    def _release(self) -> int:
+        """Requeue the jobs this queue is running; returns their number."""
+        with SessionLocal() as db:
+            released = db.query(ImportJob).filter(
+                ImportJob.worker_id == self.worker_id, ImportJob.status == ImportJob.RUNNING
+            ).update({"status": ImportJob.QUEUED, "worker_id": None, "heartbeat_at": None}, synchronize_session=False)
+            db.commit()
+        return released
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Persist a new job and wake the workers."""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown import job kind: {kind}")
+        page_count = int(params.get("page_count", 1))
+        with SessionLocal() as db:
+            job = ImportJob(kind=kind, params=params, status=ImportJob.QUEUED, total=page_count * PAGE_SIZE)
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            result = job_to_dict(job)
+        if self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        logger.info(f"Queued import job {result['id']} ({kind} {params})")
+        return result
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Get a job's status, or None if it does not exist."""
+        with SessionLocal() as db:
+            job = db.get(ImportJob, job_id)
+            return job_to_dict(job) if job else None
+
+    def list_jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get the most recent jobs."""
+        with SessionLocal() as db:
+            jobs = db.query(ImportJob).order_by(ImportJob.id.desc()).limit(limit).all()
+            return [job_to_dict(job) for job in jobs]
+
+    def cancel(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a queued or running job.
+
+        Queued jobs are cancelled at once. Running jobs are flagged, and the
+        process running them stops them within ``poll_interval``. Movies
+        written before the cancellation are kept. Returns the job's status,
+        or None if it does not exist.
+        """
+        with SessionLocal() as db:
+            if db.get(ImportJob, job_id) is None:
+                return None
+            db.query(ImportJob).filter(ImportJob.id == job_id, ImportJob.status == ImportJob.QUEUED).update(
+                {"status": ImportJob.CANCELLED, "finished_at": _now()}, synchronize_session=False
+            )
+            db.query(ImportJob).filter(ImportJob.id == job_id, ImportJob.status == ImportJob.RUNNING).update(
+                {"cancel_requested": True}, synchronize_session=False
+            )
+            db.commit()
+            result = job_to_dict(db.get(ImportJob, job_id))
+
+        # Jobs running in this process stop right away
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._cancel_local, job_id)
+        return result
+
+    def _cancel_local(self, job_id: int):
+        """Stop a job if it runs in this process; called on the event loop."""
+        task = self._running.get(job_id)
+        if task is not None and job_id not in self._cancel_requested:
+            self._cancel_requested.add(job_id)
+            task.cancel()
+
+    def _update(self, job_id: int, **values) -> bool:
+        """Persist fields of a job this queue holds the lease of; returns False if it lost the lease."""
+        with SessionLocal() as db:
+            updated = db.query(ImportJob).filter(
+                ImportJob.id == job_id, ImportJob.worker_id == self.worker_id
+            ).update(values, synchronize_session=False)
+            db.commit()
+        return bool(updated)
+
+    def _claim_next(self) -> Optional[ImportJob]:
+        """
+        Atomically take the oldest queued job, or a running job whose lease expired.
+
+        Every candidate is claimed with a conditional UPDATE, so of several
+        workers (in any process) racing for a job exactly one gets it.
+        """
+        expired = _now() - timedelta(seconds=self.lease_seconds)
+        claimable = or_(
+            ImportJob.status == ImportJob.QUEUED,
+            and_(ImportJob.status == ImportJob.RUNNING, ImportJob.heartbeat_at < expired)
+        )
+        with SessionLocal() as db:
+            candidates = [job_id for (job_id,) in db.query(ImportJob.id).filter(claimable).order_by(ImportJob.id).limit(10)]
+            for job_id in candidates:
+                now = _now()
+                claimed = db.query(ImportJob).filter(ImportJob.id == job_id, claimable).update({
+                    "status": ImportJob.RUNNING,
+                    "worker_id": self.worker_id,
+                    "heartbeat_at": now,
+                    "started_at": now
+                }, synchronize_session=False)
+                db.commit()
+                if claimed:
+                    job = db.get(ImportJob, job_id)
+                    db.expunge(job)
+                    return job
+        return None
+
+    async def _worker(self):
+        while True:
+            job = await asyncio.to_thread(self._claim_next)
+            if job is None:
+                # Submissions in this process wake the workers; others' are found by polling
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            job_id = job.id
+            if job.cancel_requested:
+                await asyncio.to_thread(self._update, job_id, status=ImportJob.CANCELLED, finished_at=_now())
+                continue
+
+            task = asyncio.ensure_future(self._run(job))
+            self._running[job_id] = task
+            try:
+                await task
+            except asyncio.CancelledError:
+                if job_id in self._lost:
+                    logger.warning(f"Import job {job_id} stopped: its lease was taken over by another worker")
+                elif job_id in self._cancel_requested:
+                    await asyncio.to_thread(self._update, job_id, status=ImportJob.CANCELLED, finished_at=_now())
+                    logger.info(f"Import job {job_id} cancelled")
+                else:
+                    # The worker itself is shutting down; shutdown() requeues the job
+                    task.cancel()
+                    raise
+            except Exception as e:
+                await asyncio.to_thread(self._update, job_id, status=ImportJob.FAILED, error=str(e), finished_at=_now())
+                logger.error(f"Import job {job_id} failed: {e}")
+            finally:
+                self._running.pop(job_id, None)
+                self._cancel_requested.discard(job_id)
+                self._lost.discard(job_id)
+
+    async def _monitor(self):
+        """Renew the leases of this queue's running jobs and stop the ones cancelled or taken over elsewhere."""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            job_ids = list(self._running)
+            if not job_ids:
+                continue
+            try:
+                rows = await asyncio.to_thread(self._renew_leases, job_ids)
+            except Exception as e:
+                logger.error(f"Error renewing import job leases: {e}")
+                continue
+
+            for job_id, worker_id, status, cancel_requested in rows:
+                task = self._running.get(job_id)
+                if task is None or task.done():
+                    continue
+                if worker_id != self.worker_id or status != ImportJob.RUNNING:
+                    self._lost.add(job_id)
+                    task.cancel()
+                elif cancel_requested and job_id not in self._cancel_requested:
+                    self._cancel_requested.add(job_id)
+                    task.cancel()
+
+    def _renew_leases(self, job_ids: List[int]) -> List[Tuple[int, Optional[str], str, bool]]:
+        """Renew the leases of jobs this queue holds; returns the owner, status and cancel flag of each job."""
+        with SessionLocal() as db:
+            db.query(ImportJob).filter(
+                ImportJob.id.in_(job_ids), ImportJob.worker_id == self.worker_id
+            ).update({"heartbeat_at": _now()}, synchronize_session=False)
+            db.commit()
+            return db.query(ImportJob.id, ImportJob.worker_id, ImportJob.status, ImportJob.cancel_requested).filter(
+                ImportJob.id.in_(job_ids)
+            ).all()
+
+    async def _run(self, job: ImportJob):
+        """Run one job's import pipeline."""
+        fetch_page, page_count = _page_source(job.kind, job.params)
+
+        async def on_progress(stats: Dict[str, Any]):
+            await asyncio.to_thread(
+                self._update, job.id, imported=stats["imported"], skipped=stats["skipped"], failed=stats["failed"]
+            )
+
+        # The pipeline queries and writes through this session on its own database thread
+        db = SessionLocal()
+        try:
+            pipeline = ImportPipeline(db, on_progress=on_progress)
+            stats = await pipeline.import_pages(fetch_page, page_count)
+        finally:
+            await asyncio.to_thread(db.close)
+
+        # The actual total is only known once TMDb reported the number of pages
+        processed = stats["imported"] + stats["skipped"] + stats["failed"]
+        await asyncio.to_thread(
+            self._update,
+            job.id,
+            status=ImportJob.COMPLETED,
+            imported=stats["imported"],
+            skipped=stats["skipped"],
+            failed=stats["failed"],
+            total=processed,
+            finished_at=_now()
+        )
+        logger.info(f"Import job {job.id} completed: {stats['imported']} imported, {stats['skipped']} skipped")
+
+# Create a singleton instance
+import_jobs = ImportJobQueue()
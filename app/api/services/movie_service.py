@@ -1,7 +1,16 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session, joinedload
+import re
+import json
+import base64
+import binascii
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import Float, Integer, and_, bindparam, column, false, func, literal_column, or_, select, text, type_coerce
+from sqlalchemy.orm import Query, Session, joinedload, selectinload
 
-from app.database.models.movie import Movie, Genre
+from app.database.models.movie import Movie, Genre, movie_genre, genre_bit, genre_mask
+from app.database.models.movie_search import FTS_TABLE, TITLE_FTS_TABLE, SEARCH_VECTOR_SQL
+from app.api.schemas.movie import Movie as MovieSchema
+from app.api.services.query_cache import query_cache, MOVIES
 
 def get_movies(db: Session, skip: int = 0, limit: int = 100) -> List[Movie]:
     """
@@ -15,12 +24,289 @@ def get_movies(db: Session, skip: int = 0, limit: int = 100) -> List[Movie]:
     movies = query.offset(skip).limit(limit).all()
     return movies
 
+def movie_list_query(
+    db: Session,
+    title: Optional[str] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    rating_from: Optional[float] = None,
+    rating_to: Optional[float] = None,
+    genres: Optional[List[str]] = None,
+    genres_all: Optional[List[str]] = None,
+    sort: str = "rating",
+    columns: Optional[Sequence[Any]] = None
+) -> Query:
+    """
+    Build the filtered movie list query in one of the ``MOVIE_SORTS`` orders.
+
+    ``genres`` matches movies with any of the named genres, ``genres_all``
+    movies with every one of them. With ``columns`` (see ``movie_columns``)
+    the query returns those columns as rows instead of ``Movie`` objects.
+
+    Each order (its column, then id to break ties) matches an index, so pages
+    are read in index order instead of sorting the whole table. Genres are
+    loaded by a second query for just the page's movies; joining them into the
+    page query makes SQLite materialize all of ``movie_genres`` and sort again.
+    """
+    if columns:
+        query = db.query(*columns)
+    else:
+        query = db.query(Movie).options(selectinload(Movie.genres))
+
+    # Apply filters
+    if title:
+        query = query.filter(title_search_filter(db, title))
+
+    if year_from and year_from == year_to:
+        # Equality reads idx_movies_year_rating already in rating order
+        query = query.filter(Movie.year == year_from)
+    else:
+        if year_from:
+            query = query.filter(Movie.year >= year_from)
+
+        if year_to:
+            query = query.filter(Movie.year <= year_to)
+
+    if rating_from:
+        query = query.filter(Movie.rating >= rating_from)
+
+    if rating_to:
+        query = query.filter(Movie.rating <= rating_to)
+
+    # Filter by genres if provided
+    if genres:
+        query = query.filter(genre_filter(db, genres))
+
+    if genres_all:
+        query = query.filter(genre_filter(db, genres_all, match_all=True))
+
+    key, descending = MOVIE_SORTS[sort]
+    order = [key] if key is Movie.id else [key, Movie.id]
+    return query.order_by(*[column.desc() if descending else column.asc() for column in order])
+
+# Sort orders of the movie list: (column, descending). Ties are broken by id,
+# so every order is total, and each is served by an index on (column, id).
+# IDs only grow, so the newest rows have the highest IDs
+MOVIE_SORTS = {
+    "rating": (Movie.rating, True),
+    "votes": (Movie.votes, True),
+    "year": (Movie.year, True),
+    "title": (Movie.title, False),
+    "added": (Movie.id, True),
+}
+
+def encode_cursor(sort: str, movie: Any) -> str:
+    """Get the opaque cursor pointing just past ``movie`` (a ``Movie`` or a row) in the ``sort`` order."""
+    key, _ = MOVIE_SORTS[sort]
+    value = getattr(movie, key.key)
+    if isinstance(value, (Decimal, float)):
+        # Decoded back to the column's Decimal; the string keeps the exact value
+        value = str(value)
+    data = json.dumps([sort, value, movie.id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+def decode_cursor(sort: str, cursor: str) -> Tuple[Any, int]:
+    """
+    Get the (sort key, id) position a cursor points past.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort order
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        cursor_sort, value, movie_id = data
+        key, _ = MOVIE_SORTS[sort]
+        if cursor_sort != sort or not isinstance(movie_id, int):
+            raise ValueError
+        if value is not None:
+            value = key.type.python_type(value)
+        return value, movie_id
+    except (ValueError, TypeError, ArithmeticError, binascii.Error):
+        raise ValueError(f"Invalid cursor for sort order '{sort}'")
+
+def cursor_ranges(db: Session, sort: str, after: Optional[Tuple[Any, int]]) -> List[List[Any]]:
+    """
+    Get the filter criteria of the rows following ``after`` in the ``sort`` order, as runs to read in turn.
+
+    Each run is a seek in the sort order's index, so any page costs the same
+    as the first: the rest of the cursor's group of tied sort values (by id),
+    then the rows past that value. (A row-value comparison on (value, id)
+    would scan the whole tie group in SQLite.) NULL sort values (rating,
+    votes) form their own run, ordered by id, at the end the database sorts
+    NULLs to.
+    """
+    key, descending = MOVIE_SORTS[sort]
+
+    def past(column, value):
+        return column < value if descending else column > value
+
+    if key is Movie.id:
+        return [[past(Movie.id, after[1])] if after else []]
+
+    if after is None:
+        values_runs = [[key.is_not(None)] if key.nullable else []]
+    elif after[0] is None:
+        values_runs = []
+    else:
+        value, movie_id = after
+        values_runs = [[key == value, past(Movie.id, movie_id)], [past(key, value)]]
+    if not key.nullable:
+        return values_runs
+
+    # SQLite sorts NULLs as the smallest values, PostgreSQL as the largest
+    nulls_first = descending != (db.get_bind().dialect.name == "sqlite")
+    if after is None:
+        nulls_runs = [[key.is_(None)]]
+    elif after[0] is None:
+        nulls_runs = [[key.is_(None), past(Movie.id, after[1])]]
+        values_runs = [[key.is_not(None)]] if nulls_first else []
+    else:
+        nulls_runs = [] if nulls_first else [[key.is_(None)]]
+    return nulls_runs + values_runs if nulls_first else values_runs + nulls_runs
+
+def movie_page(query: Query, sort: str, after: Optional[Tuple[Any, int]], limit: int) -> List[Movie]:
+    """Get the ``limit`` movies of an ordered ``movie_list_query`` that follow ``after``."""
+    movies = []
+    for criteria in cursor_ranges(query.session, sort, after):
+        movies += query.filter(*criteria).limit(limit - len(movies)).all()
+        if len(movies) >= limit:
+            break
+    return movies
+
+# Columns of the movie responses, in the order of the Movie schema's fields.
+# Ratings are read as floats, which is what the responses carry, instead of
+# going through Decimal, and rounded to the column's scale like Decimal
+# results (SQLite stores whatever was written)
+RATING_SCALE = Movie.rating.type.scale
+MOVIE_FIELDS = [name for name in MovieSchema.model_fields if name != "genres"]
+MOVIE_COLUMNS = [
+    type_coerce(Movie.rating, Float).label("rating") if name == "rating" else getattr(Movie, name)
+    for name in MOVIE_FIELDS
+]
+MOVIE_COLUMN_BY_FIELD = dict(zip(MOVIE_FIELDS, MOVIE_COLUMNS))
+
+# Named sets of response fields for ``fields=``: what the frontend's movie
+# cards and detail page show, and everything (the default)
+MOVIE_FIELD_PRESETS = {
+    "card": ["id", "title", "year", "rating", "votes", "language", "poster_path", "genres"],
+    "detail": ["id", "title", "year", "director", "runtime", "rating", "votes", "imdb_id", "language",
+               "poster_path", "backdrop_path", "genres"],
+    "full": MOVIE_FIELDS + ["genres"],
+}
+
+# Movie IDs per genre lookup
+GENRE_LOOKUP_CHUNK_SIZE = 500
+
+def parse_movie_fields(fields: Optional[str]) -> List[str]:
+    """
+    Get the response fields a ``fields`` parameter asks for, in schema order.
+
+    ``fields`` is a comma-separated list of field names and ``MOVIE_FIELD_PRESETS``
+    names, e.g. ``card,director``. ``id`` is always included; no value means
+    every field.
+
+    Raises:
+        ValueError: If a name is neither a field nor a preset
+    """
+    if not fields:
+        return MOVIE_FIELD_PRESETS["full"]
+    requested = {"id"}
+    for name in fields.split(","):
+        name = name.strip()
+        if name in MOVIE_FIELD_PRESETS:
+            requested.update(MOVIE_FIELD_PRESETS[name])
+        elif name in MOVIE_FIELD_PRESETS["full"]:
+            requested.add(name)
+        elif name:
+            raise ValueError(
+                f"Unknown field '{name}'; use {', '.join(MOVIE_FIELD_PRESETS['full'])} "
+                f"or a preset ({', '.join(MOVIE_FIELD_PRESETS)})"
+            )
+    return [name for name in MOVIE_FIELD_PRESETS["full"] if name in requested]
+
+def movie_columns(fields: List[str], extra: Sequence[str] = ()) -> List[Any]:
+    """
+    Get the columns to select for the response ``fields``, in their order.
+
+    ``extra`` fields needed by the caller but not returned (e.g. the sort key
+    of a cursor) are appended after them, so ``movie_responses`` ignores them.
+    """
+    columns = [MOVIE_COLUMN_BY_FIELD[name] for name in fields if name != "genres"]
+    return columns + [MOVIE_COLUMN_BY_FIELD[name] for name in extra if name not in fields]
+
+def movie_responses(db: Session, rows: Sequence[Any], fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Build the JSON-ready ``Movie`` responses of rows selected with ``movie_columns(fields)``.
+
+    The dicts are filled straight from the row tuples, without ORM objects
+    or a reflective ``jsonable_encoder`` pass. If ``genres`` is one of the
+    ``fields`` (the default is all of them), the genres of all the rows are
+    read with one more query; otherwise ``movie_genres`` isn't touched.
+    """
+    fields = fields or MOVIE_FIELD_PRESETS["full"]
+    columns = [name for name in fields if name != "genres"]
+    with_genres = "genres" in fields
+    with_rating = "rating" in fields
+
+    genres: Dict[int, List[Dict[str, Any]]] = {row.id: [] for row in rows} if with_genres else {}
+    ids = list(genres)
+    for i in range(0, len(ids), GENRE_LOOKUP_CHUNK_SIZE):
+        links = db.execute(
+            select(movie_genre.c.movie_id, Genre.id, Genre.name)
+            .join(Genre, Genre.id == movie_genre.c.genre_id)
+            .where(movie_genre.c.movie_id.in_(ids[i:i + GENRE_LOOKUP_CHUNK_SIZE]))
+        )
+        for movie_id, genre_id, name in links:
+            genres[movie_id].append({"name": name, "id": genre_id})
+
+    responses = []
+    for row in rows:
+        movie = dict(zip(columns, row))
+        if with_rating and movie["rating"] is not None:
+            movie["rating"] = round(movie["rating"], RATING_SCALE)
+        if with_genres:
+            movie["genres"] = genres[row.id]
+        responses.append(movie)
+    return responses
+
+def get_movie_response(db: Session, movie_id: int, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Get the JSON-ready ``Movie`` response of a movie (only ``fields``, if given), or None if it doesn't exist.
+    """
+    fields = fields or MOVIE_FIELD_PRESETS["full"]
+    row = db.query(*movie_columns(fields)).filter(Movie.id == movie_id).first()
+    return movie_responses(db, [row], fields)[0] if row is not None else None
+
+def genre_filter(db: Session, names: List[str], match_all: bool = False):
+    """
+    Filter clause matching movies with any (or, with ``match_all``, all) of the named genres.
+
+    Tests bits of ``Movie.genre_mask`` instead of joining ``movie_genres``, so
+    the list query stays on the movies table (and its rating order) and
+    returns each movie once. Genres with IDs beyond the mask fall back to a
+    ``movie_genres`` lookup.
+    """
+    genre_ids = [genre_id for genre_id, in db.query(Genre.id).filter(Genre.name.in_(names))]
+    if not genre_ids or (match_all and len(genre_ids) < len(set(names))):
+        return false()
+
+    mask = genre_mask(genre_ids)
+    clauses = []
+    if mask:
+        masked = Movie.genre_mask.bitwise_and(mask)
+        clauses.append(masked == mask if match_all else masked != 0)
+    clauses += [Movie.genres.any(Genre.id == genre_id) for genre_id in genre_ids if not genre_bit(genre_id)]
+    return and_(*clauses) if match_all else or_(*clauses)
+
 def get_movie_by_id(db: Session, movie_id: int) -> Optional[Movie]:
     """
     Get a specific movie by its ID.
+    
+    Its genres are loaded by a second query; joined into this one, SQLite
+    materializes all of ``movie_genres`` for the single movie.
     """
     return db.query(Movie).options(
-        joinedload(Movie.genres)
+        selectinload(Movie.genres)
     ).filter(Movie.id == movie_id).first()
 
 def add_genre_to_movie(db: Session, movie_id: int, genre_id: int) -> Movie:
@@ -35,5 +321,93 @@ def add_genre_to_movie(db: Session, movie_id: int, genre_id: int) -> Movie:
     
     movie.genres.append(genre)
     db.commit()
+    query_cache.invalidate(MOVIES)
     db.refresh(movie)
-    return movie 
\ No newline at end of file
+    return movie
+
+# Databases known to have (or lack) each search index, by URL and index table
+_search_index_available = {}
+
+# Shortest title filter the trigram index can answer
+MIN_TRIGRAM_LENGTH = 3
+
+def search_terms(query: str) -> List[str]:
+    """Split a search string into lowercase word tokens."""
+    return re.findall(r"\w+", query.lower())
+
+def has_search_index(db: Session, table: str = FTS_TABLE) -> bool:
+    """Whether the session's database has a movie search index (checked once per database)."""
+    bind = db.get_bind()
+    key = (str(bind.url), table)
+    if key not in _search_index_available:
+        if bind.dialect.name == "sqlite":
+            _search_index_available[key] = db.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table}
+            ).first() is not None
+        else:
+            _search_index_available[key] = bind.dialect.name == "postgresql"
+    return _search_index_available[key]
+
+def _search_ranking(db: Session, terms: List[str]):
+    """
+    Select the ids and ranks, best first, of movies matching every term, the last one as a prefix.
+
+    Every match is ranked before the best ``limit`` are kept, so the top
+    results of a broad prefix don't depend on which matches come first.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        # Terms are quoted and implicitly ANDed; only the last one, still being typed, is a prefix.
+        # Whole-word terms read a single doclist instead of merging every word they prefix
+        match = " ".join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+        return text(
+            f"SELECT rowid AS id, bm25({FTS_TABLE}, 10.0, 1.0) AS rank FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH :match ORDER BY rank LIMIT :limit"
+        ).bindparams(match=match)
+
+    vector = literal_column(f"({SEARCH_VECTOR_SQL})")
+    tsquery = func.to_tsquery("simple", " & ".join(terms[:-1] + [f"{terms[-1]}:*"]))
+    rank = func.ts_rank_cd(vector, tsquery).label("rank")
+    return select(Movie.id, rank).where(vector.op("@@")(tsquery)).order_by(rank.desc()).limit(bindparam("limit"))
+
+def title_search_filter(db: Session, title: str):
+    """
+    Filter clause matching movies whose title contains ``title``, ignoring case (``ILIKE '%title%'``).
+
+    On SQLite the substring is looked up in the title trigram index when the
+    database has one and ``title`` is long enough; PostgreSQL answers the
+    ``ILIKE`` from its pg_trgm index itself.
+    """
+    pattern = f"%{title}%"
+    if db.get_bind().dialect.name == "sqlite" and len(title) >= MIN_TRIGRAM_LENGTH and has_search_index(db, TITLE_FTS_TABLE):
+        return Movie.id.in_(
+            text(f"SELECT rowid FROM {TITLE_FTS_TABLE} WHERE title LIKE :title_pattern")
+            .bindparams(title_pattern=pattern)
+            .columns(column("rowid", Integer))
+        )
+    return Movie.title.ilike(pattern)
+
+def search_movies(db: Session, query: str, limit: int = 20, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Search movies by title and director, best matches first, as JSON-ready ``Movie`` responses (only ``fields``, if given).
+
+    The last word of ``query`` matches as a prefix, so partial input like
+    "star wa" already finds "Star Wars". Results are ranked by relevance,
+    with title matches weighing more than director matches.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    fields = fields or MOVIE_FIELD_PRESETS["full"]
+
+    if not has_search_index(db):
+        rows = db.query(*movie_columns(fields)).filter(
+            *[Movie.title.ilike(f"%{term}%") for term in terms]
+        ).order_by(Movie.votes.desc().nullslast(), Movie.id).limit(limit).all()
+        return movie_responses(db, rows, fields)
+
+    ranked = db.execute(_search_ranking(db, terms), {"limit": limit}).all()
+    if not ranked:
+        return []
+    position = {movie_id: index for index, (movie_id, _) in enumerate(ranked)}
+    rows = db.query(*movie_columns(fields)).filter(Movie.id.in_(position)).all()
+    return movie_responses(db, sorted(rows, key=lambda row: position[row.id]), fields)
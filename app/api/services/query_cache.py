@@ -0,0 +1,411 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+from fastapi import Request
+from fastapi.responses import ORJSONResponse, Response
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached response is served. Writes through the import writer and the
+# API invalidate entries right away; the TTL bounds how long changes made any
+# other way (another process, a replica catching up) can stay hidden.
+DEFAULT_TTL = 300
+
+# Namespaces of cached responses, each invalidated by its own generation counter
+MOVIES = "movies"
+GENRES = "genres"
+
+def make_etag(body: bytes) -> str:
+    """Build a strong ETag from a response body."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """Check an ``If-None-Match`` header against an ETag (weak comparison, as RFC 9110 requires for it)."""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    """Build the 304 response to a conditional request, with the validators of the full response."""
+    return Response(status_code=304, headers={
+        name: value for name, value in headers.items() if name in ("ETag", "Cache-Control")
+    })
+
+class QueryCacheBackend:
+    """
+    Storage of cached response bodies and the generation counters that invalidate them.
+
+    Values are opaque bytes, so a backend can keep them in this process or
+    share them with other processes.
+    """
+
+    name = "none"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get an unexpired value, or None."""
+        raise NotImplementedError
+
+    def set(self, key: str, namespace: str, value: bytes, ttl: float):
+        """Store a value for ``ttl`` seconds, evicting least recently used values if over budget."""
+        raise NotImplementedError
+
+    def generation(self, namespace: str) -> int:
+        """Get the current generation of a namespace."""
+        raise NotImplementedError
+
+    def bump(self, namespace: str) -> int:
+        """Start a new generation of a namespace and drop the values stored under older ones."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove all values (generations are kept)."""
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the number and size of stored values."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release the backend's resources."""
+
+class MemoryBackend(QueryCacheBackend):
+    """LRU store in this process's memory, bounded by the size of its keys and values."""
+
+    name = "memory"
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, bytes, float]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self._stats = {"evictions": 0, "expired": 0}
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= time.monotonic():
+                self._remove(key)
+                self._stats["expired"] += 1
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, namespace: str, value: bytes, ttl: float):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (namespace, value, time.monotonic() + ttl)
+            self._total_bytes += len(key) + len(value)
+            while self._total_bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def _remove(self, key: str):
+        _, value, _ = self._entries.pop(key)
+        self._total_bytes -= len(key) + len(value)
+
+    def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    def bump(self, namespace: str) -> int:
+        with self._lock:
+            generation = self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            for key in [key for key, entry in self._entries.items() if entry[0] == namespace]:
+                self._remove(key)
+        return generation
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "size_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes
+        }
+
+class SQLiteBackend(QueryCacheBackend):
+    """
+    LRU store in a local SQLite file, shared by every worker process of the host.
+
+    The generation counters live in the same file, so an import in one
+    process invalidates the responses cached by all of them.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._stats = {"evictions": 0, "expired": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the cache database on first use."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_namespace ON entries (namespace)")
+            conn.execute("CREATE TABLE IF NOT EXISTS generations (namespace TEXT PRIMARY KEY, generation INTEGER NOT NULL)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                conn.commit()
+                self._stats["expired"] += 1
+                return None
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+        return row[0]
+
+    def set(self, key: str, namespace: str, value: bytes, ttl: float):
+        now = time.time()
+        size = len(key) + len(value)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, namespace, value, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, namespace, value, size, now + ttl, now)
+            )
+            conn.commit()
+            if conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0] > self.max_bytes:
+                self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries until the store is under 90% of its budget."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+            if total <= target:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        conn.commit()
+        self._stats["evictions"] += evicted
+
+    def generation(self, namespace: str) -> int:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT generation FROM generations WHERE namespace = ?", (namespace,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, namespace: str) -> int:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO generations (namespace, generation) VALUES (?, 1) "
+                "ON CONFLICT (namespace) DO UPDATE SET generation = generation + 1",
+                (namespace,)
+            )
+            conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+            generation = conn.execute(
+                "SELECT generation FROM generations WHERE namespace = ?", (namespace,)
+            ).fetchone()[0]
+            conn.commit()
+        return generation
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM entries")
+            conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._connect().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {**self._stats, "entries": entries, "size_bytes": size, "max_bytes": self.max_bytes}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+class QueryCache:
+    """
+    Cache of read API responses, invalidated by generation counters.
+
+    Keys combine a namespace's current generation with the route and its
+    normalized parameters. Writers call ``invalidate`` after committing, which
+    bumps the generation: responses computed before the write can no longer
+    be looked up, even if a request that started earlier stores one late.
+    Responses are stored as their encoded JSON body (plus headers), so a hit
+    skips both the queries and the serialization.
+
+    Every response carries a strong ETag, a hash of its body computed once
+    when it is built. A request whose ``If-None-Match`` matches the cached
+    ETag gets a 304 without touching the database. Unlike the generations,
+    the hash stays valid across processes and restarts.
+    """
+
+    def __init__(self, backend: Optional[QueryCacheBackend] = None, ttl: int = DEFAULT_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self._stats = {"hits": 0, "misses": 0, "not_modified": 0, "stores": 0, "invalidations": 0}
+
+    @classmethod
+    def from_env(cls) -> "QueryCache":
+        """Create a cache from environment settings (``QUERY_CACHE_BACKEND=none`` disables it)."""
+        backend_name = os.getenv("QUERY_CACHE_BACKEND", "memory").strip().lower()
+        max_bytes = int(float(os.getenv("QUERY_CACHE_MAX_MB", "64")) * 1024 * 1024)
+        ttl = int(os.getenv("QUERY_CACHE_TTL", str(DEFAULT_TTL)))
+        if backend_name in ("none", "off", "false", "0"):
+            return cls(None, ttl)
+        if backend_name == "memory":
+            return cls(MemoryBackend(max_bytes), ttl)
+        if backend_name == "sqlite":
+            return cls(SQLiteBackend(os.getenv("QUERY_CACHE_PATH", ".cache/query_cache.sqlite3"), max_bytes), ttl)
+        raise ValueError(f"Unknown QUERY_CACHE_BACKEND '{backend_name}' (use memory, sqlite or none)")
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None and self.ttl > 0
+
+    def make_key(self, namespace: str, route: str, params: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Build the key of a response in the namespace's current generation.
+
+        ``params`` should already be normalized by the route; None values are
+        left out. Returns None if the cache is disabled.
+        """
+        if not self.enabled:
+            return None
+        items = sorted((name, str(value)) for name, value in (params or {}).items() if value is not None)
+        return f"{namespace}:{self.backend.generation(namespace)}:{route}?{urlencode(items)}"
+
+    def get(self, key: Optional[str], request: Optional[Request] = None) -> Optional[Response]:
+        """
+        Get the cached response for a key, or None.
+
+        If ``request`` is given and its ``If-None-Match`` matches the cached
+        response's ETag, the response is a 304 without a body.
+        """
+        if key is None:
+            return None
+        value = self.backend.get(key)
+        if value is None:
+            self._stats["misses"] += 1
+            return None
+        self._stats["hits"] += 1
+        headers, body = value.split(b"\n", 1)
+        headers = json.loads(headers)
+        if request is not None and etag_matches(request.headers.get("if-none-match"), headers.get("ETag")):
+            self._stats["not_modified"] += 1
+            return not_modified(headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def respond(
+        self,
+        key: Optional[str],
+        content: Any,
+        headers: Optional[Dict[str, str]] = None,
+        request: Optional[Request] = None,
+        cache_control: Optional[str] = None
+    ) -> Response:
+        """
+        Encode ``content`` as the JSON response of the route and cache it under ``key``.
+
+        ``content`` must already be JSON-ready (dicts, lists, strings, numbers,
+        datetimes); it is encoded by orjson without another conversion pass.
+        The response gets an ETag and the ``cache_control`` header. It is a
+        304 if ``request`` already has this version of it.
+        """
+        response = ORJSONResponse(content=content)
+        headers = {**(headers or {}), "ETag": make_etag(response.body)}
+        if cache_control:
+            headers["Cache-Control"] = cache_control
+        response.headers.update(headers)
+        if key is not None:
+            value = json.dumps(headers).encode("utf-8") + b"\n" + response.body
+            self.backend.set(key, key.split(":", 1)[0], value, self.ttl)
+            self._stats["stores"] += 1
+        if request is not None and etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            self._stats["not_modified"] += 1
+            return not_modified(headers)
+        return response
+
+    def invalidate(self, *namespaces: str):
+        """Start new generations of ``namespaces``; call after committing a change to their data."""
+        if self.backend is None:
+            return
+        for namespace in namespaces:
+            try:
+                generation = self.backend.bump(namespace)
+            except sqlite3.Error as e:
+                # The write itself succeeded; the TTL still bounds how long old responses are served
+                logger.error(f"Failed to invalidate cached {namespace} responses: {e}")
+                continue
+            self._stats["invalidations"] += 1
+            logger.debug(f"Cached {namespace} responses invalidated (generation {generation})")
+
+    def clear(self):
+        """Remove all cached responses."""
+        if self.backend is not None:
+            self.backend.clear()
+
+    def close(self):
+        """Release the backend's resources."""
+        if self.backend is not None:
+            self.backend.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters, the generations and the size of the cached responses."""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        stats = {
+            "backend": self.backend.name if self.backend is not None else "none",
+            "ttl": self.ttl,
+            **self._stats,
+            "hit_ratio": round(self._stats["hits"] / lookups, 3) if lookups else 0.0
+        }
+        if self.backend is not None:
+            stats.update(self.backend.get_stats())
+            stats["generations"] = {namespace: self.backend.generation(namespace) for namespace in (MOVIES, GENRES)}
+        return stats
+
+# Shared cache instance
+query_cache = QueryCache.from_env()
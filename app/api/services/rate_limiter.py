@@ -0,0 +1,254 @@
+import os
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """Token bucket rate limiter.
+
+    With a ``path`` the bucket state lives in a small SQLite file and is updated
+    inside ``BEGIN IMMEDIATE`` transactions, so every process using the same
+    file (the API server and any running scripts) draws from one shared budget.
+    Those transactions run in a worker thread, so waiting for another
+    process's lock never blocks the event loop. Without a path the bucket is
+    kept in memory for the current process only.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, path: Optional[str] = None, name: str = "tmdb"):
+        self.rate = float(rate)
+        self.burst = float(burst or rate)
+        self.path = Path(path) if path else None
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._tokens = self.burst
+        self._updated_at = time.time()
+        self._blocked_until = 0.0
+        self._stats = {"acquired": 0, "waited": 0, "wait_seconds": 0.0}
+
+    @classmethod
+    def from_env(cls) -> "TokenBucket":
+        """Create a bucket from the TMDB_RATE_* environment settings."""
+        rate = float(os.getenv("TMDB_RATE_LIMIT", "40"))
+        burst = float(os.getenv("TMDB_RATE_BURST", str(rate)))
+        path = os.getenv("TMDB_RATE_LIMIT_PATH", ".cache/tmdb_rate_limit.sqlite3")
+        return cls(rate, burst, path or None)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the shared bucket database on first use."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS buckets (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    blocked_until REAL NOT NULL DEFAULT 0
+                )
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    def _refill(self, tokens: float, updated_at: float, now: float) -> float:
+        return min(self.burst, tokens + max(now - updated_at, 0.0) * self.rate)
+
+    def _take(self) -> float:
+        """Try to take one token. Returns 0 on success, otherwise seconds to wait."""
+        with self._lock:
+            now = time.time()
+            if self.path is None:
+                if self._blocked_until > now:
+                    return self._blocked_until - now
+                self._tokens = self._refill(self._tokens, self._updated_at, now)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return 0.0
+                return (1 - self._tokens) / self.rate
+
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT tokens, updated_at, blocked_until FROM buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                tokens, updated_at, blocked_until = row if row else (self.burst, now, 0.0)
+                if blocked_until > now:
+                    wait = blocked_until - now
+                else:
+                    tokens = self._refill(tokens, updated_at, now)
+                    if tokens >= 1:
+                        tokens -= 1
+                        wait = 0.0
+                    else:
+                        wait = (1 - tokens) / self.rate
+                    conn.execute(
+                        "INSERT OR REPLACE INTO buckets (name, tokens, updated_at, blocked_until) VALUES (?, ?, ?, ?)",
+                        (self.name, tokens, now, blocked_until)
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return wait
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        waited = 0.0
+        while True:
+            wait = self._take() if self.path is None else await asyncio.to_thread(self._take)
+            if wait <= 0:
+                break
+            waited += wait
+            await asyncio.sleep(wait)
+        self._stats["acquired"] += 1
+        if waited:
+            self._stats["waited"] += 1
+            self._stats["wait_seconds"] += waited
+
+    async def block_for(self, seconds: float):
+        """Stop handing out tokens for a while, e.g. to honor a Retry-After header."""
+        until = time.time() + seconds
+        if self.path is None:
+            self._block(until)
+        else:
+            await asyncio.to_thread(self._block, until)
+
+    def _block(self, until: float):
+        with self._lock:
+            if self.path is None:
+                self._blocked_until = max(self._blocked_until, until)
+                return
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR IGNORE INTO buckets (name, tokens, updated_at, blocked_until) VALUES (?, 0, ?, 0)",
+                    (self.name, time.time())
+                )
+                conn.execute(
+                    "UPDATE buckets SET blocked_until = MAX(blocked_until, ?) WHERE name = ?", (until, self.name)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        """Close the shared bucket database."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get token acquisition statistics."""
+        return {
+            **self._stats,
+            "wait_seconds": round(self._stats["wait_seconds"], 3),
+            "rate": self.rate,
+            "shared": self.path is not None
+        }
+
+class AdaptiveConcurrency:
+    """Concurrency limit adjusted with AIMD (additive increase, multiplicative decrease).
+
+    Every request that completes under the latency target grows the limit by
+    roughly one slot per window of requests; a slow response shrinks it by a
+    quarter and a 429 halves it. The limit shrinks at most once per round
+    trip: responses to requests sent before the last decrease were already
+    accounted for by it, so a slow period with N requests in flight costs one
+    decrease, not N.
+    """
+
+    def __init__(self, initial: int = 8, minimum: int = 1, maximum: int = 32, latency_target: float = 1.5):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.limit = float(min(max(initial, minimum), maximum))
+
+        self._in_flight = 0
+        self._decreased_at = float("-inf")
+        self._waiters: List[asyncio.Future] = []
+        self._stats = {"increases": 0, "decreases": 0, "throttled": 0, "peak_in_flight": 0}
+
+    @classmethod
+    def from_env(cls) -> "AdaptiveConcurrency":
+        """Create a limiter from the TMDB_CONCURRENCY_* environment settings."""
+        return cls(
+            initial=int(os.getenv("TMDB_CONCURRENCY_INITIAL", "8")),
+            minimum=int(os.getenv("TMDB_CONCURRENCY_MIN", "1")),
+            maximum=int(os.getenv("TMDB_CONCURRENCY_MAX", "32")),
+            latency_target=float(os.getenv("TMDB_LATENCY_TARGET", "1.5"))
+        )
+
+    async def acquire(self):
+        """Wait for a free slot."""
+        while self._in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Pass on the slot this waiter was woken for
+                    self._waiters.remove(waiter)
+                    self._wake()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self._in_flight += 1
+        self._stats["peak_in_flight"] = max(self._stats["peak_in_flight"], self._in_flight)
+
+    def release(self, latency: Optional[float] = None, throttled: bool = False):
+        """
+        Free a slot and adapt the limit to the outcome of the request.
+
+        Args:
+            latency: Seconds the request took (``time.monotonic`` based); None leaves the limit alone
+            throttled: Whether the server answered 429
+        """
+        self._in_flight -= 1
+        now = time.monotonic()
+        # Requests sent before the last decrease don't shrink the limit again
+        fresh = latency is None or now - latency >= self._decreased_at
+        if throttled:
+            self._stats["throttled"] += 1
+            if fresh:
+                self.limit = max(self.minimum, self.limit / 2)
+                self._decreased_at = now
+                self._stats["decreases"] += 1
+        elif latency is not None and latency > self.latency_target:
+            if fresh:
+                self.limit = max(self.minimum, self.limit * 0.75)
+                self._decreased_at = now
+                self._stats["decreases"] += 1
+        elif latency is not None and self.limit < self.maximum:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._stats["increases"] += 1
+        self._wake()
+
+    def _wake(self):
+        free = int(self.limit) - self._in_flight
+        for waiter in list(self._waiters):
+            if free <= 0:
+                break
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the current limit and adjustment counters."""
+        return {**self._stats, "limit": round(self.limit, 2), "in_flight": self._in_flight}
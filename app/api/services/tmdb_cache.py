@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+# Time-to-live per endpoint prefix, in seconds. The first matching prefix wins,
+# so more specific prefixes must come before the generic ones.
+DEFAULT_TTLS: List[Tuple[str, int]] = [
+    ("/genre/", 7 * 24 * 3600),
+    ("/movie/popular", 3600),
+    ("/movie/top_rated", 6 * 3600),
+    ("/discover/movie", 6 * 3600),
+    ("/search/movie", 24 * 3600),
+    ("/movie/", 3 * 24 * 3600),
+]
+DEFAULT_TTL = 3600
+
+# Parameters that must never become part of a cache key
+EXCLUDED_PARAMS = {"api_key"}
+
+class TMDbCache:
+    """Persistent, size-bounded cache of TMDb API responses.
+
+    Entries are stored zlib-compressed in a local SQLite file, keyed by endpoint
+    and query parameters (the API key excluded). Each entry keeps the ETag and
+    Last-Modified validators of its response so expired entries can be
+    revalidated with a conditional request instead of a full download.
+
+    The methods block on disk I/O and are thread-safe; ``TMDbAPI`` calls them
+    from a worker thread.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        ttls: Optional[List[Tuple[str, int]]] = None,
+        cache_only: bool = False
+    ):
+        self.path = Path(path or os.getenv("TMDB_CACHE_PATH", ".cache/tmdb_responses.sqlite3"))
+        self.max_bytes = max_bytes or int(float(os.getenv("TMDB_CACHE_MAX_MB", "512")) * 1024 * 1024)
+        self.ttls = ttls or DEFAULT_TTLS
+        self.cache_only = cache_only
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self._stats = {"hits": 0, "stale": 0, "misses": 0, "revalidated": 0, "stores": 0, "evictions": 0}
+
+    @classmethod
+    def from_env(cls) -> Optional["TMDbCache"]:
+        """Create a cache from environment settings, or None if caching is disabled."""
+        if os.getenv("TMDB_CACHE_ENABLED", "true").strip().lower() in ("0", "false", "no", "off"):
+            return None
+        cache_only = os.getenv("TMDB_CACHE_ONLY", "false").strip().lower() in ("1", "true", "yes", "on")
+        return cls(cache_only=cache_only)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the cache database on first use."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    endpoint TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+            conn.commit()
+            self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Build a cache key from an endpoint and its query parameters."""
+        items = sorted(
+            (str(k), str(v)) for k, v in (params or {}).items() if k not in EXCLUDED_PARAMS
+        )
+        return f"{endpoint}?{urlencode(items)}" if items else endpoint
+
+    def get_ttl(self, endpoint: str) -> int:
+        """Get the time-to-live for responses of an endpoint."""
+        for prefix, ttl in self.ttls:
+            if endpoint.startswith(prefix):
+                return ttl
+        return DEFAULT_TTL
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Returns:
+            Dictionary with the decoded ``data``, its ``etag``/``last_modified``
+            validators and a ``fresh`` flag, or None if the key is not cached
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+            body, etag, last_modified, expires_at = row
+            fresh = expires_at > now
+            self._stats["hits" if fresh else "stale"] += 1
+
+        return {
+            "data": json.loads(zlib.decompress(body)),
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": fresh
+        }
+
+    def set(
+        self,
+        key: str,
+        endpoint: str,
+        data: Dict[str, Any],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ):
+        """Store a response, evicting least recently used entries if over budget."""
+        body = zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            previous = conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO responses
+                    (key, endpoint, body, size, etag, last_modified, fetched_at, expires_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, endpoint, body, len(body), etag, last_modified, now, now + self.get_ttl(endpoint), now)
+            )
+            conn.commit()
+            self._total_bytes += len(body) - (previous[0] if previous else 0)
+            self._stats["stores"] += 1
+            if self._total_bytes > self.max_bytes:
+                self._evict(conn)
+
+    def touch(self, key: str, endpoint: str):
+        """Extend the lifetime of an entry after a successful revalidation (304)."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE responses SET expires_at = ?, last_access = ? WHERE key = ?",
+                (now + self.get_ttl(endpoint), now, key)
+            )
+            conn.commit()
+            self._stats["revalidated"] += 1
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries until the cache is under 90% of its budget."""
+        target = int(self.max_bytes * 0.9)
+        # Re-read the real total, other processes may share the file
+        self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            if self._total_bytes <= target:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_bytes -= size
+            evicted += 1
+        conn.commit()
+        self._stats["evictions"] += evicted
+        logger.info(f"Evicted {evicted} TMDb cache entries ({self._total_bytes} bytes remaining)")
+
+    def clear(self):
+        """Remove all cached responses."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+            self._total_bytes = 0
+
+    def close(self):
+        """Close the cache database."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the current cache size."""
+        lookups = self._stats["hits"] + self._stats["stale"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_ratio": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            "size_bytes": self._total_bytes,
+            "cache_only": self.cache_only
+        }
@@ -1,46 +1,307 @@
 import os
+import time
+import asyncio
 import logging
+from email.utils import parsedate_to_datetime
 from typing import Dict, List, Optional, Any
 import httpx
 from dotenv import load_dotenv
 
+from app.api.services.tmdb_cache import TMDbCache
+from app.api.services.rate_limiter import TokenBucket, AdaptiveConcurrency
+
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+def _env_flag(name: str, default: str = "false") -> bool:
+    """Read a boolean flag from the environment."""
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
 class TMDbAPI:
-    """Client for The Movie Database (TMDb) API."""
+    """Client for The Movie Database (TMDb) API.
+    
+    The instance owns a single pooled ``httpx.AsyncClient`` so that consecutive
+    requests reuse kept-alive connections instead of paying TCP+TLS setup on
+    every call. Call ``startup()``/``shutdown()`` (or use ``async with``) to
+    manage the client explicitly; otherwise it is created on first use.
+    
+    Responses are served from a persistent ``TMDbCache`` when one is configured
+    (see ``TMDB_CACHE_*`` environment variables). Network requests draw from a
+    ``TokenBucket`` requests-per-second budget (shareable across processes) and
+    an ``AdaptiveConcurrency`` limit; 429 responses are retried after the
+    ``Retry-After`` delay. Concurrent calls for the same endpoint and params
+    are coalesced into a single request whose parsed result they all share.
+    
+    ``BASE_URL`` can be overridden with ``TMDB_BASE_URL`` (or ``base_url``),
+    e.g. to point the client at the offline stand-in in ``app.tmdb_standin``.
+    """
     
     BASE_URL = "https://api.themoviedb.org/3"
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+        timeout: Optional[float] = None,
+        cache: Optional[TMDbCache] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        concurrency: Optional[AdaptiveConcurrency] = None,
+        base_url: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.BASE_URL = (base_url or os.getenv("TMDB_BASE_URL") or TMDbAPI.BASE_URL).rstrip("/")
+        self.transport = transport
         self.api_key = os.getenv("TMDB_API_KEY")
         self.access_token = os.getenv("TMDB_ACCESS_TOKEN")
         
         if not self.api_key or not self.access_token:
             logger.warning("TMDb API key or access token not found in environment variables")
+        
+        # Connection pool settings
+        self.max_connections = max_connections or int(os.getenv("TMDB_MAX_CONNECTIONS", "20"))
+        self.max_keepalive_connections = max_keepalive_connections or int(
+            os.getenv("TMDB_MAX_KEEPALIVE_CONNECTIONS", "10")
+        )
+        self.keepalive_expiry = keepalive_expiry or float(os.getenv("TMDB_KEEPALIVE_EXPIRY", "30"))
+        self.http2 = http2 if http2 is not None else _env_flag("TMDB_HTTP2")
+        self.timeout = timeout or float(os.getenv("TMDB_TIMEOUT", "10"))
+        
+        self.cache = cache if cache is not None else TMDbCache.from_env()
+        self.rate_limiter = rate_limiter or TokenBucket.from_env()
+        self.concurrency = concurrency or AdaptiveConcurrency.from_env()
+        self.max_retries = int(os.getenv("TMDB_MAX_RETRIES", "3"))
+        
+        self._client: Optional[httpx.AsyncClient] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+        self._stats = {"requests": 0, "connections_opened": 0, "coalesced": 0}
+    
+    def _create_client(self) -> httpx.AsyncClient:
+        """Create the pooled HTTP client."""
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 requested but the 'h2' package is not installed; falling back to HTTP/1.1")
+                http2 = False
+        
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+        headers = {
+            "Authorization": f"Bearer {self.access_token}",
+            "Content-Type": "application/json;charset=utf-8"
+        }
+        return httpx.AsyncClient(
+            limits=limits, headers=headers, http2=http2, timeout=self.timeout, transport=self.transport
+        )
+    
+    async def startup(self):
+        """Open the pooled HTTP client."""
+        if self._client is None:
+            self._client = self._create_client()
+            logger.info(
+                f"TMDb client started for {self.BASE_URL} (max_connections={self.max_connections}, "
+                f"keepalive={self.max_keepalive_connections}, http2={self.http2})"
+            )
+    
+    async def shutdown(self):
+        """Close the pooled HTTP client and release its connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info(f"TMDb client closed ({self.format_stats()})")
+        if self.cache is not None:
+            self.cache.close()
+        self.rate_limiter.close()
+    
+    async def __aenter__(self):
+        await self.startup()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.shutdown()
+    
+    async def _trace(self, event_name: str, info: Dict[str, Any]):
+        """httpcore trace hook used to count newly opened connections."""
+        if event_name == "connection.connect_tcp.complete":
+            self._stats["connections_opened"] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection reuse and cache statistics."""
+        requests = self._stats["requests"]
+        opened = self._stats["connections_opened"]
+        reused = max(requests - opened, 0)
+        return {
+            "requests": requests,
+            "connections_opened": opened,
+            "connections_reused": reused,
+            "reuse_ratio": round(reused / requests, 3) if requests else 0.0,
+            "coalesced": self._stats["coalesced"],
+            "cache": self.cache.get_stats() if self.cache is not None else None,
+            "rate_limiter": self.rate_limiter.get_stats(),
+            "concurrency": self.concurrency.get_stats()
+        }
+    
+    def format_stats(self) -> str:
+        """Get connection reuse and cache statistics as a single log-friendly line."""
+        stats = self.get_stats()
+        line = (
+            f"{stats['requests']} requests, {stats['connections_opened']} connections opened, "
+            f"{stats['connections_reused']} reused ({stats['reuse_ratio']:.0%}), "
+            f"{stats['coalesced']} coalesced"
+        )
+        if stats["cache"] is not None:
+            cache = stats["cache"]
+            line += (
+                f"; cache: {cache['hits']} hits, {cache['misses']} misses, "
+                f"{cache['stale']} stale, {cache['revalidated']} revalidated"
+            )
+        line += (
+            f"; throttled: {stats['concurrency']['throttled']}, "
+            f"concurrency limit: {stats['concurrency']['limit']}, "
+            f"rate-limit waits: {stats['rate_limiter']['waited']} ({stats['rate_limiter']['wait_seconds']}s)"
+        )
+        return line
+    
+    @staticmethod
+    def _retry_after(response: httpx.Response, attempt: int) -> float:
+        """Get the delay requested by a 429 response, with exponential backoff as fallback."""
+        value = response.headers.get("Retry-After")
+        if value:
+            try:
+                return max(float(value), 0.0)
+            except ValueError:
+                try:
+                    return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+                except (TypeError, ValueError):
+                    pass
+        return float(2 ** attempt)
+    
+    async def _send(self, url: str, params: Dict[str, Any], headers: Dict[str, str]) -> httpx.Response:
+        """Send a GET request under the rate budget, retrying on 429."""
+        if self._client is None:
+            await self.startup()
+        
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire()
+            await self.concurrency.acquire()
+            started = time.monotonic()
+            throttled = False
+            try:
+                response = await self._client.get(
+                    url, params=params, headers=headers, extensions={"trace": self._trace}
+                )
+                self._stats["requests"] += 1
+                throttled = response.status_code == 429
+            except (httpx.RequestError, asyncio.CancelledError):
+                self.concurrency.release()
+                raise
+            self.concurrency.release(time.monotonic() - started, throttled=throttled)
+            
+            if not throttled or attempt == self.max_retries:
+                return response
+            
+            delay = self._retry_after(response, attempt)
+            logger.warning(f"TMDb rate limit hit, retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+            await self.rate_limiter.block_for(delay)
+            await asyncio.sleep(delay)
+        return response
     
     async def _make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Make a request to the TMDb API."""
+        """
+        Make a request to the TMDb API.
+        
+        Callers asking for the same endpoint and params while a request is
+        already in flight wait for that request instead of issuing their own.
+        The returned dictionary is shared between them and must not be mutated.
+        When every caller waiting on a request was cancelled, the request
+        itself is cancelled, so it stops using the rate budget.
+        """
         if params is None:
             params = {}
         
+        key = TMDbCache.make_key(endpoint, params)
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            # Run the request as its own task so that a cancelled caller does not
+            # cancel it for everyone else waiting on it
+            task = asyncio.ensure_future(self._fetch(endpoint, params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    task.cancel()
+    
+    async def _fetch(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fetch a response from the cache or the network.
+        
+        The cache's SQLite reads, writes and evictions run in a worker thread,
+        so a slow or locked cache file doesn't stall the event loop.
+        """
+        # Serve fresh responses straight from the cache
+        cache_key = None
+        cached = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(endpoint, params)
+            if self.BASE_URL != TMDbAPI.BASE_URL:
+                # Keep responses of other servers (e.g. the stand-in) apart from real ones
+                cache_key = f"{self.BASE_URL}{cache_key}"
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None and (cached["fresh"] or self.cache.cache_only):
+                return cached["data"]
+            if self.cache.cache_only:
+                logger.error(f"Cache-only mode: no cached response for {cache_key}")
+                return {"error": f"Not in cache (cache-only mode): {cache_key}"}
+        
         # Add API key to parameters
         if self.api_key:
             params["api_key"] = self.api_key
         
         url = f"{self.BASE_URL}{endpoint}"
-        headers = {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json;charset=utf-8"
-        }
+        
+        # Revalidate stale entries with a conditional request
+        headers = {}
+        if cached is not None:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params, headers=headers)
-                response.raise_for_status()
-                return response.json()
+            response = await self._send(url, params, headers)
+            if response.status_code == 304 and cached is not None:
+                await asyncio.to_thread(self.cache.touch, cache_key, endpoint)
+                return cached["data"]
+            response.raise_for_status()
+            data = response.json()
+            if self.cache is not None:
+                await asyncio.to_thread(
+                    self.cache.set,
+                    cache_key,
+                    endpoint,
+                    data,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified")
+                )
+            return data
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error occurred: {e}")
             return {"error": str(e)}
@@ -58,12 +319,19 @@ class TMDbAPI:
         }
         return await self._make_request(endpoint, params)
     
-    async def get_movie_details(self, movie_id: int) -> Dict[str, Any]:
-        """Get detailed information about a movie."""
+    async def get_movie_details(
+        self,
+        movie_id: int,
+        append_to_response: Optional[str] = "credits,keywords,videos,images,release_dates"
+    ) -> Dict[str, Any]:
+        """
+        Get detailed information about a movie.
+        
+        Pass ``append_to_response=None`` to fetch only the base detail fields,
+        which is a much smaller response.
+        """
         endpoint = f"/movie/{movie_id}"
-        params = {
-            "append_to_response": "credits,keywords,videos,images,release_dates"
-        }
+        params = {"append_to_response": append_to_response} if append_to_response else {}
         return await self._make_request(endpoint, params)
     
     async def get_popular_movies(self, page: int = 1) -> Dict[str, Any]:
@@ -84,4 +352,4 @@ class TMDbAPI:
         return await self._make_request(endpoint)
 
 # Create a singleton instance
-tmdb_api = TMDbAPI() 
\ No newline at end of file
+tmdb_api = TMDbAPI()
\ No newline at end of file
@@ -0,0 +1,157 @@
+import time
+import logging
+from typing import Dict, List, Optional, Any
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.database.models import Movie, MoviePayload, movie_genre, genre_mask
+from app.database.payload_archive import archive_rows, ensure_archive_table
+from app.api.services.query_cache import query_cache, MOVIES
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of bound parameters per IN (...) lookup
+LOOKUP_CHUNK_SIZE = 500
+
+def _dialect_insert(dialect_name: str):
+    """Get the dialect-specific INSERT construct supporting ON CONFLICT."""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Bulk upsert is not supported for the '{dialect_name}' dialect")
+    return insert
+
+class MovieBulkWriter:
+    """
+    Insert-or-update many movies and their genre links per transaction.
+
+    Movies are written with a single executemany ``INSERT ... ON CONFLICT DO
+    UPDATE`` keyed on a unique column, the generated IDs are read back with
+    chunked ``IN`` lookups, and the ``movie_genres`` rows are replaced with one
+    executemany insert (and ``genre_mask`` set to match). Raw detail payloads
+    can be appended to the ``movie_payloads`` archive in the same transaction.
+    No ORM objects are created or refreshed. Each commit invalidates the
+    cached movie responses of the API.
+    """
+
+    # Columns never overwritten when a row already exists
+    IMMUTABLE_COLUMNS = {"id", "identifier", "created_at"}
+
+    def __init__(self, db: Session, key: str = "identifier"):
+        """
+        Args:
+            db: Database session
+            key: Unique column rows are matched on
+        """
+        self.db = db
+        self.key = key
+        self.insert = _dialect_insert(db.get_bind().dialect.name)
+        self.stats = {"rows": 0, "genre_links": 0, "payloads": 0, "batches": 0, "seconds": 0.0}
+
+    def write(
+        self,
+        rows: List[Dict[str, Any]],
+        genre_ids: Optional[Dict[Any, List[int]]] = None,
+        payloads: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[Any, int]:
+        """
+        Upsert movie rows and replace their genre links, then commit.
+
+        Args:
+            rows: Movie column values; every row must have the same keys, including ``key``
+            genre_ids: Genre IDs per key value; movies missing here keep their current genres
+            payloads: Raw TMDb detail payloads to append to the ``movie_payloads`` archive
+
+        Returns:
+            Dictionary mapping each row's key value to its movie ID
+        """
+        if not rows:
+            return {}
+
+        started = time.perf_counter()
+        if payloads:
+            # Before any write, so the DDL doesn't wait on this session's own transaction
+            ensure_archive_table(self.db.get_bind())
+        table = Movie.__table__
+        key_column = table.c[self.key]
+
+        # Later rows win when the same key appears twice in one batch
+        rows = list({row[self.key]: row for row in rows}.values())
+
+        # Movies whose genres are replaced get their genre_mask in the same upsert. Every row needs the
+        # same columns, so a batch only partly covered by genre_ids has its masks updated afterwards
+        masks = {}
+        if genre_ids:
+            masks = {key: genre_mask(ids) for key, ids in genre_ids.items()}
+            if all(row[self.key] in masks for row in rows):
+                rows = [{**row, "genre_mask": masks[row[self.key]]} for row in rows]
+                masks = {}
+
+        stmt = self.insert(table)
+        update_columns = {
+            name: stmt.excluded[name] for name in rows[0] if name not in self.IMMUTABLE_COLUMNS and name != self.key
+        }
+        update_columns["updated_at"] = func.now()
+        stmt = stmt.on_conflict_do_update(index_elements=[key_column], set_=update_columns)
+
+        try:
+            self.db.execute(stmt, rows)
+
+            keys = [row[self.key] for row in rows]
+            movie_ids = {}
+            for i in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+                chunk = keys[i:i + LOOKUP_CHUNK_SIZE]
+                result = self.db.execute(select(key_column, table.c.id).where(key_column.in_(chunk)))
+                movie_ids.update({key: movie_id for key, movie_id in result})
+
+            links = []
+            if genre_ids:
+                replaced = [movie_ids[key] for key in genre_ids if key in movie_ids]
+                for i in range(0, len(replaced), LOOKUP_CHUNK_SIZE):
+                    self.db.execute(
+                        delete(movie_genre).where(movie_genre.c.movie_id.in_(replaced[i:i + LOOKUP_CHUNK_SIZE]))
+                    )
+                links = [
+                    {"movie_id": movie_ids[key], "genre_id": genre_id}
+                    for key, ids in genre_ids.items() if key in movie_ids
+                    for genre_id in set(ids)
+                ]
+                if links:
+                    self.db.execute(self.insert(movie_genre).on_conflict_do_nothing(), links)
+
+            mask_rows = [{"b_id": movie_ids[key], "b_mask": mask} for key, mask in masks.items() if key in movie_ids]
+            if mask_rows:
+                self.db.execute(
+                    update(table).where(table.c.id == bindparam("b_id")).values(genre_mask=bindparam("b_mask")),
+                    mask_rows
+                )
+
+            if payloads:
+                self.db.execute(MoviePayload.__table__.insert(), archive_rows(payloads))
+
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        # Cached list and detail responses may include any of these movies
+        query_cache.invalidate(MOVIES)
+
+        elapsed = time.perf_counter() - started
+        self.stats["rows"] += len(rows)
+        self.stats["genre_links"] += len(links)
+        self.stats["payloads"] += len(payloads or [])
+        self.stats["batches"] += 1
+        self.stats["seconds"] += elapsed
+        logger.debug(f"Upserted {len(rows)} movies and {len(links)} genre links in {elapsed * 1000:.1f}ms")
+        return movie_ids
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get written row counts and throughput."""
+        seconds = self.stats["seconds"]
+        return {
+            **self.stats,
+            "seconds": round(seconds, 3),
+            "rows_per_s": round(self.stats["rows"] / seconds, 1) if seconds else 0.0
+        }
@@ -1,7 +1,11 @@
 import os
-from sqlalchemy import create_engine
+from typing import Dict, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -10,17 +14,128 @@ load_dotenv()
 # Get database URL from environment or use SQLite by default
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./movieseek.db")
 
-# Create SQLAlchemy engine
-if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+# Read-only routes can use a replica; defaults to the main database
+SQLALCHEMY_READ_DATABASE_URL = os.getenv("DATABASE_READ_URL", SQLALCHEMY_DATABASE_URL)
+
+# Connections kept open by the read-only engine
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "10"))
+
+# Apply the SQLite performance profile below to every new connection
+SQLITE_TUNED = os.getenv("SQLITE_TUNED", "true").lower() in ("1", "true", "yes")
+
+def sqlite_pragmas() -> Dict[str, str]:
+    """
+    Get the SQLite performance profile from the environment.
+
+    WAL lets readers run while an import writes, ``synchronous=NORMAL`` is
+    durable across application crashes in WAL mode, and the mmap/cache/temp
+    settings keep hot pages and sort buffers in memory. ``busy_timeout``
+    makes a second writer wait for the lock instead of failing immediately.
+    """
+    return {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+        "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-65536"),  # negative = KiB, i.e. 64 MiB
+        "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+        "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")
+    }
+
+def _is_sqlite_memory(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+def _set_sqlite_pragmas(engine: Engine, url: str, read_only: bool, tuned: Optional[bool]):
+    """Apply the SQLite performance profile to every new connection of ``engine``."""
+    pragmas = sqlite_pragmas() if (SQLITE_TUNED if tuned is None else tuned) else {}
+    if _is_sqlite_memory(url):
+        pragmas.pop("journal_mode", None)
+    if read_only:
+        pragmas["query_only"] = "ON"
+
+    if pragmas:
+        @event.listens_for(engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+def create_db_engine(url: str, read_only: bool = False, tuned: Optional[bool] = None, pool_size: Optional[int] = None) -> Engine:
+    """
+    Create an engine for ``url``.
+
+    SQLite connections get the pragmas from ``sqlite_pragmas`` through a
+    connect event (unless ``tuned`` is false), and read-only engines also set
+    ``query_only`` so a stray write fails instead of taking the write lock.
+
+    Args:
+        url: Database URL
+        read_only: Create an engine for queries only
+        tuned: Apply the SQLite performance profile (default: ``SQLITE_TUNED``)
+        pool_size: Number of pooled connections (default: SQLAlchemy's)
+    """
+    options = {"pool_size": pool_size} if pool_size else {}
+    if not url.startswith("sqlite"):
+        # PostgreSQL or other databases
+        return create_engine(url, **options)
+
     # SQLite specific configuration
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-    )
+    if _is_sqlite_memory(url):
+        options = {}
+    engine = create_engine(url, connect_args={"check_same_thread": False}, **options)
+    _set_sqlite_pragmas(engine, url, read_only, tuned)
+    return engine
+
+def async_database_url(url: str) -> str:
+    """Switch a database URL to its asyncio driver (aiosqlite or asyncpg)."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    if parsed.get_backend_name() == "postgresql":
+        return parsed.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+    return url
+
+def create_async_db_engine(url: str, read_only: bool = False, tuned: Optional[bool] = None,
+                           pool_size: Optional[int] = None) -> AsyncEngine:
+    """
+    Create an asyncio engine for ``url``, configured like ``create_db_engine``.
+
+    Used by ``async def`` routes, so their queries don't block the event loop.
+    """
+    options = {"pool_size": pool_size} if pool_size else {}
+    if not url.startswith("sqlite"):
+        return create_async_engine(async_database_url(url), **options)
+
+    if _is_sqlite_memory(url):
+        options = {}
+    else:
+        # aiosqlite defaults to opening a connection per checkout; keep them pooled like the sync engine
+        options["poolclass"] = AsyncAdaptedQueuePool
+    engine = create_async_engine(async_database_url(url), **options)
+    _set_sqlite_pragmas(engine.sync_engine, url, read_only, tuned)
+    return engine
+
+# Create SQLAlchemy engines: ``engine`` performs all writes (imports, admin
+# changes); ``read_engine`` serves the read-only API routes from its own pool,
+# so reads never queue behind a long import for a connection
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
+if SQLALCHEMY_READ_DATABASE_URL == SQLALCHEMY_DATABASE_URL and _is_sqlite_memory(SQLALCHEMY_DATABASE_URL):
+    # Every connection to an in-memory database sees a different database
+    read_engine = engine
+else:
+    read_engine = create_db_engine(SQLALCHEMY_READ_DATABASE_URL, read_only=True, pool_size=DB_READ_POOL_SIZE)
+
+# The same split for ``async def`` routes
+async_engine = create_async_db_engine(SQLALCHEMY_DATABASE_URL)
+if read_engine is engine:
+    async_read_engine = async_engine
 else:
-    # PostgreSQL or other databases
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+    async_read_engine = create_async_db_engine(SQLALCHEMY_READ_DATABASE_URL, read_only=True, pool_size=DB_READ_POOL_SIZE)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
 
 # Dependency to get DB session
 def get_db():
@@ -28,4 +143,28 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+# Dependency to get a read-only DB session
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Dependency to get an asyncio DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Dependency to get a read-only asyncio DB session
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+async def dispose_async_engines():
+    """Close the asyncio engines' pooled connections (and their driver threads) on shutdown."""
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
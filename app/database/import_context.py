@@ -0,0 +1,132 @@
+import logging
+from typing import Dict, List, Optional, Any, Iterable
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.database.models import Movie, Genre
+from app.database.tmdb_mapping import get_movie_identity
+
+logger = logging.getLogger(__name__)
+
+class ImportContext:
+    """
+    In-memory indexes used to dedupe imports without per-movie queries.
+
+    Loads the known movie identifiers and TMDb IDs and the genre name -> ID
+    map once, and is updated by the importers as rows are written. Lookups
+    are set/dict operations, so checking a candidate costs no database round
+    trip. Rows written or deleted by other processes are not seen until
+    ``load`` runs again, so a context should live for one import run; the
+    pipeline builds a new one for each run.
+    """
+
+    def __init__(self):
+        self.identifiers = set()
+        self.tmdb_ids = set()
+        self.genre_ids: Dict[str, int] = {}
+        self.loaded = False
+        self._unknown_genres = set()
+
+    def load(self, db: Session):
+        """(Re)load the indexes from the database."""
+        self.identifiers = set()
+        self.tmdb_ids = set()
+        for identifier, tmdb_id in db.query(Movie.identifier, Movie.tmdb_id).yield_per(10000):
+            self.identifiers.add(identifier)
+            if tmdb_id is not None:
+                self.tmdb_ids.add(tmdb_id)
+        self.load_genres(db)
+        self.loaded = True
+        logger.info(f"Loaded import context: {len(self.identifiers)} movies, {len(self.genre_ids)} genres")
+
+    def load_genres(self, db: Session):
+        """(Re)load the genre name -> ID map."""
+        self.genre_ids = {name: genre_id for genre_id, name in db.query(Genre.id, Genre.name)}
+        self._unknown_genres = set()
+
+    def load_for(self, db: Session, payloads: Iterable[Dict[str, Any]]) -> "ImportContext":
+        """
+        Load only the movies that can match ``payloads``, for imports of a few movies.
+
+        Costs one indexed query instead of reading every identifier.
+        """
+        tmdb_ids = set()
+        identifiers = set()
+        for movie_data in payloads:
+            if movie_data.get("id"):
+                tmdb_ids.add(movie_data["id"])
+            if movie_data.get("title"):
+                identifiers.add(get_movie_identity(movie_data)[2])
+        self.identifiers = set()
+        self.tmdb_ids = set()
+        if tmdb_ids or identifiers:
+            query = db.query(Movie.identifier, Movie.tmdb_id).filter(
+                or_(Movie.tmdb_id.in_(tmdb_ids), Movie.identifier.in_(identifiers))
+            )
+            for identifier, tmdb_id in query:
+                self.identifiers.add(identifier)
+                if tmdb_id is not None:
+                    self.tmdb_ids.add(tmdb_id)
+        self.load_genres(db)
+        self.loaded = True
+        return self
+
+    def ensure_loaded(self, db: Session) -> "ImportContext":
+        """Load the indexes on first use."""
+        if not self.loaded:
+            self.load(db)
+        return self
+
+    def exists(self, movie_data: Dict[str, Any]) -> bool:
+        """
+        Check whether a candidate is already known by TMDb ID or identifier.
+
+        Bare ``{"id": ...}`` payloads have no title to build an identifier
+        from, so they are only matched on their TMDb ID.
+        """
+        if movie_data.get("id") in self.tmdb_ids:
+            return True
+        return bool(movie_data.get("title")) and get_movie_identity(movie_data)[2] in self.identifiers
+
+    def get_genre_ids(self, db: Session, names: Iterable[str]) -> List[int]:
+        """Map genre names to IDs, reloading the genres once for names not seen before."""
+        names = list(names)
+        missing = [name for name in names if name not in self.genre_ids and name not in self._unknown_genres]
+        if missing:
+            self.load_genres(db)
+            self._unknown_genres.update(name for name in missing if name not in self.genre_ids)
+        return [self.genre_ids[name] for name in names if name in self.genre_ids]
+
+    def record(self, rows: List[Dict[str, Any]]):
+        """Add written movie rows to the indexes."""
+        for row in rows:
+            self.identifiers.add(row["identifier"])
+            if row.get("tmdb_id") is not None:
+                self.tmdb_ids.add(row["tmdb_id"])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the index sizes."""
+        return {"movies": len(self.identifiers), "tmdb_ids": len(self.tmdb_ids), "genres": len(self.genre_ids)}
+
+# Process-level contexts, one per database URL
+_contexts: Dict[str, ImportContext] = {}
+
+def get_import_context(db: Session) -> ImportContext:
+    """
+    Get the process-level import context for the session's database, loading it on first use.
+
+    Meant for scripts that run one import and exit; long-lived processes
+    should build an ``ImportContext`` per run instead, as it is never reloaded.
+    """
+    key = str(db.get_bind().url)
+    context = _contexts.get(key)
+    if context is None:
+        context = _contexts[key] = ImportContext()
+    return context.ensure_loaded(db)
+
+def reset_import_context(db: Optional[Session] = None):
+    """Drop cached contexts, e.g. after the tables were cleared or recreated."""
+    if db is None:
+        _contexts.clear()
+    else:
+        _contexts.pop(str(db.get_bind().url), None)
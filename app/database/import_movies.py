@@ -1,12 +1,21 @@
 import asyncio
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Optional, Tuple, Any
 from sqlalchemy.orm import Session
-from decimal import Decimal
 
 from app.database.models import Movie, Genre, Base
 from app.database.config import engine, get_db
+from app.database.bulk_writer import MovieBulkWriter
+from app.database.import_context import ImportContext
+from app.database.payload_archive import archive_enabled
+from app.database.tmdb_mapping import (
+    has_full_details,
+    get_movie_identity,
+    movie_row_from_details,
+    get_genre_names
+)
 from app.api.services.tmdb_service import tmdb_api
+from app.api.services.query_cache import query_cache, GENRES
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -35,164 +44,189 @@ async def fetch_and_store_genres(db: Session):
     
     if genres_added > 0:
         db.commit()
+        query_cache.invalidate(GENRES)
         logger.info(f"Added {genres_added} new genres to the database.")
     else:
         logger.info("No new genres to add.")
 
-async def import_movie(db: Session, movie_data: Dict[str, Any]):
-    """Import a single movie into the database."""
-    # Generate identifier in the format "Title (Year)"
-    title = movie_data.get("title", "Unknown")
-    year = movie_data.get("release_date", "")[:4]  # Extract year from release_date
+async def resolve_movie_details(movie_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return the full detail payload, fetching it from TMDb only if ``movie_data`` is a summary."""
+    if has_full_details(movie_data):
+        return movie_data
     
-    if not year or not year.isdigit():
-        year = 0
-    else:
-        year = int(year)
+    movie_details = await tmdb_api.get_movie_details(movie_data["id"])
+    
+    if "error" in movie_details:
+        logger.error(f"Error fetching movie details: {movie_details['error']}")
+        return None
     
-    identifier = f"{title} ({year})"
+    return movie_details
+
+async def import_movie(db: Session, movie_data: Dict[str, Any], context: Optional[ImportContext] = None):
+    """
+    Import a single movie into the database.
+    
+    ``movie_data`` may be either a list summary (from search, popular, top
+    rated or discover results) or a full detail payload from
+    ``get_movie_details``; details are only fetched when they are missing.
+    Without a ``context``, only the rows that can match this movie are loaded.
+    """
+    write_context = context
+    context = context or ImportContext().load_for(db, [movie_data])
+    
+    # Generate identifier in the format "Title (Year)"
+    title, year, identifier = get_movie_identity(movie_data)
     
     # Check if movie already exists in database
-    existing_movie = db.query(Movie).filter(Movie.identifier == identifier).first()
-    if existing_movie:
+    if context.exists(movie_data):
         logger.info(f"Movie already exists: {identifier}")
         return None
     
-    # Fetch detailed movie information
+    # Fetch detailed movie information if the caller doesn't already have it
     movie_id = movie_data.get("id")
     if not movie_id:
         logger.warning(f"Missing movie ID for {title}")
         return None
     
-    movie_details = await tmdb_api.get_movie_details(movie_id)
+    movie_details = await resolve_movie_details(movie_data)
     
-    if "error" in movie_details:
-        logger.error(f"Error fetching movie details: {movie_details['error']}")
+    if movie_details is None:
         return None
     
-    # Extract director from credits
-    director = None
-    if "credits" in movie_details and "crew" in movie_details["credits"]:
-        directors = [
-            crew["name"] for crew in movie_details["credits"]["crew"]
-            if crew["job"] == "Director"
-        ]
-        director = ", ".join(directors) if directors else None
-    
-    # Extract IMDb info
-    imdb_id = movie_details.get("imdb_id")
-    
-    # Get original language
-    language = movie_details.get("original_language")
-    
-    # Get poster and backdrop paths
-    poster_path = movie_details.get("poster_path")
-    backdrop_path = movie_details.get("backdrop_path")
-    
-    # Create new movie
-    new_movie = Movie(
-        identifier=identifier,
-        title=title,
-        year=year,
-        director=director,
-        runtime=movie_details.get("runtime"),
-        rating=movie_details.get("vote_average"),  # TMDB rating
-        votes=movie_details.get("vote_count"),    # TMDB vote count
-        tmdb_id=movie_id,                        # TMDB ID
-        imdb_id=imdb_id,                         # IMDb ID
-        language=language,                       # Original language
-        poster_path=poster_path,                 # Poster image path
-        backdrop_path=backdrop_path              # Backdrop image path
-    )
-    
-    db.add(new_movie)
-    db.commit()
-    db.refresh(new_movie)
-    
-    # Add genres
-    if "genres" in movie_details:
-        genre_map = {genre.name: genre for genre in db.query(Genre).all()}
-        
-        for genre_data in movie_details["genres"]:
-            genre_name = genre_data["name"]
-            if genre_name in genre_map:
-                new_movie.genres.append(genre_map[genre_name])
-        
-        db.commit()
+    # Write the movie and its genres in one transaction
+    movie_ids = write_movies(db, [(movie_data, movie_details)], context=write_context)
+    if not movie_ids:
+        return None
+    new_movie = db.get(Movie, next(iter(movie_ids.values())))
     
     logger.info(f"Imported movie: {identifier}")
     return new_movie
 
-async def import_popular_movies(db: Session, page_count: int = 5):
+async def import_movies_batch(
+    db: Session,
+    payloads: List[Dict[str, Any]],
+    context: Optional[ImportContext] = None
+) -> Dict[str, int]:
+    """
+    Import many movies at once.
+    
+    Accepts any mix of list summaries and full detail payloads. Existing
+    movies are skipped using the import context, missing details are fetched
+    concurrently, and all new movies are written in one transaction.
+    Without a ``context``, only the rows that can match the payloads are loaded.
+    
+    Returns:
+        Dictionary mapping each imported identifier to its new movie ID
+    """
+    write_context = context
+    context = context or ImportContext().load_for(db, payloads)
+    
+    # Skip payloads without an ID and duplicates within the batch
+    # (identifiers are checked again once details are known, as bare IDs have no title)
+    candidates = {}
+    for movie_data in payloads:
+        if not movie_data.get("id"):
+            logger.warning(f"Missing movie ID for {get_movie_identity(movie_data)[0]}")
+            continue
+        candidates.setdefault(movie_data["id"], movie_data)
+    
+    if not candidates:
+        return {}
+    
+    # Skip movies that are already in the database
+    for movie_id, movie_data in list(candidates.items()):
+        if context.exists(movie_data):
+            logger.info(f"Movie already exists: {get_movie_identity(movie_data)[2]}")
+            del candidates[movie_id]
+    
+    # Fetch missing details concurrently (TMDbAPI enforces the rate budget)
+    movie_data_list = list(candidates.values())
+    details_list = await asyncio.gather(*[resolve_movie_details(m) for m in movie_data_list])
+    
+    return write_movies(db, [
+        (movie_data, movie_details)
+        for movie_data, movie_details in zip(movie_data_list, details_list)
+        if movie_details is not None
+    ], context=write_context)
+
+def write_movies(
+    db: Session,
+    items: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+    writer: Optional[MovieBulkWriter] = None,
+    context: Optional[ImportContext] = None
+) -> Dict[str, int]:
+    """
+    Write new movies and their genre links with the bulk writer.
+    
+    Movies whose identifier is already known are skipped; this catches
+    candidates that only had a TMDb ID until their details were fetched.
+    
+    Args:
+        db: Database session
+        items: (payload, full detail payload) pairs
+        writer: Bulk writer to use, e.g. to accumulate its stats across calls
+        context: Import context to dedupe against and update; defaults to one
+            loaded for just these movies
+        
+    Returns:
+        Dictionary mapping each written identifier to its movie ID
+    """
+    context = context or ImportContext().load_for(db, [payload for item in items for payload in item])
+    rows = []
+    genre_ids = {}
+    payloads = []
+    for movie_data, movie_details in items:
+        row = movie_row_from_details(movie_data, movie_details)
+        if row["identifier"] in context.identifiers or row["identifier"] in genre_ids:
+            logger.info(f"Movie already exists: {row['identifier']}")
+            continue
+        rows.append(row)
+        genre_ids[row["identifier"]] = context.get_genre_ids(db, get_genre_names(movie_details))
+        if has_full_details(movie_details):
+            payloads.append(movie_details)
+    
+    # Keep the raw payloads so new columns can be derived later without refetching
+    movie_ids = (writer or MovieBulkWriter(db)).write(rows, genre_ids, payloads if archive_enabled() else None)
+    context.record(rows)
+    if movie_ids:
+        logger.info(f"Imported {len(movie_ids)} movies")
+    return movie_ids
+
+async def import_popular_movies(db: Session, page_count: int = 5, **pipeline_options) -> int:
     """Import popular movies from TMDb."""
-    logger.info(f"Importing popular movies (pages: {page_count})...")
+    from app.database.import_pipeline import ImportPipeline
     
-    movies_added = 0
+    logger.info(f"Importing popular movies (pages: {page_count})...")
     
-    for page in range(1, page_count + 1):
-        logger.info(f"Fetching popular movies page {page}...")
-        popular_movies = await tmdb_api.get_popular_movies(page)
-        
-        if "error" in popular_movies:
-            logger.error(f"Error fetching popular movies: {popular_movies['error']}")
-            continue
-        
-        for movie_data in popular_movies.get("results", []):
-            movie = await import_movie(db, movie_data)
-            if movie:
-                movies_added += 1
-        
-        # Add a small delay to avoid rate limiting
-        await asyncio.sleep(1)
+    stats = await ImportPipeline(db, **pipeline_options).import_pages(tmdb_api.get_popular_movies, page_count)
     
-    logger.info(f"Finished importing popular movies. Added {movies_added} new movies.")
+    logger.info(f"Finished importing popular movies. Added {stats['imported']} new movies.")
+    return stats["imported"]
 
-async def import_top_rated_movies(db: Session, page_count: int = 5):
+async def import_top_rated_movies(db: Session, page_count: int = 5, **pipeline_options) -> int:
     """Import top rated movies from TMDb."""
+    from app.database.import_pipeline import ImportPipeline
+    
     logger.info(f"Importing top rated movies (pages: {page_count})...")
     
-    movies_added = 0
+    stats = await ImportPipeline(db, **pipeline_options).import_pages(tmdb_api.get_top_rated_movies, page_count)
     
-    for page in range(1, page_count + 1):
-        logger.info(f"Fetching top rated movies page {page}...")
-        top_rated_movies = await tmdb_api.get_top_rated_movies(page)
-        
-        if "error" in top_rated_movies:
-            logger.error(f"Error fetching top rated movies: {top_rated_movies['error']}")
-            continue
-        
-        for movie_data in top_rated_movies.get("results", []):
-            movie = await import_movie(db, movie_data)
-            if movie:
-                movies_added += 1
-        
-        # Add a small delay to avoid rate limiting
-        await asyncio.sleep(1)
-    
-    logger.info(f"Finished importing top rated movies. Added {movies_added} new movies.")
+    logger.info(f"Finished importing top rated movies. Added {stats['imported']} new movies.")
+    return stats["imported"]
 
-async def search_and_import_movies(db: Session, query: str, page_count: int = 1):
+async def search_and_import_movies(db: Session, query: str, page_count: int = 1, **pipeline_options) -> int:
     """Search for movies by title and import them."""
+    from app.database.import_pipeline import ImportPipeline
+    
     logger.info(f"Searching for movies: '{query}' (pages: {page_count})...")
     
-    movies_added = 0
+    async def fetch_page(page: int) -> Dict[str, Any]:
+        return await tmdb_api.search_movies(query, page)
     
-    for page in range(1, page_count + 1):
-        search_results = await tmdb_api.search_movies(query, page)
-        
-        if "error" in search_results:
-            logger.error(f"Error searching for movies: {search_results['error']}")
-            continue
-        
-        for movie_data in search_results.get("results", []):
-            movie = await import_movie(db, movie_data)
-            if movie:
-                movies_added += 1
-        
-        # Add a small delay to avoid rate limiting
-        await asyncio.sleep(1)
+    stats = await ImportPipeline(db, **pipeline_options).import_pages(fetch_page, page_count)
     
-    logger.info(f"Finished importing search results. Added {movies_added} new movies.")
+    logger.info(f"Finished importing search results. Added {stats['imported']} new movies.")
+    return stats["imported"]
 
 async def main():
     """Main function to import movie data."""
@@ -202,15 +236,18 @@ async def main():
     # Get a database session
     db = next(get_db())
     try:
-        # First, fetch and store genres
-        await fetch_and_store_genres(db)
-        
-        # Import popular and top rated movies
-        await import_popular_movies(db, page_count=2)
-        await import_top_rated_movies(db, page_count=2)
-        
-        # Optional: Search and import specific movies
-        # await search_and_import_movies(db, "Matrix", page_count=1)
+        async with tmdb_api:
+            # First, fetch and store genres
+            await fetch_and_store_genres(db)
+            
+            # Import popular and top rated movies
+            await import_popular_movies(db, page_count=2)
+            await import_top_rated_movies(db, page_count=2)
+            
+            # Optional: Search and import specific movies
+            # await search_and_import_movies(db, "Matrix", page_count=1)
+            
+            logger.info(f"TMDb connection stats: {tmdb_api.format_stats()}")
     finally:
         db.close()
 
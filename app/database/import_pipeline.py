@@ -0,0 +1,344 @@
+import os
+import time
+import asyncio
+import inspect
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Callable, Awaitable, Iterable, AsyncIterable, Union, Tuple
+from sqlalchemy.orm import Session
+
+from app.database.bulk_writer import MovieBulkWriter
+from app.database.import_context import ImportContext
+from app.database.import_movies import get_movie_identity, resolve_movie_details, write_movies
+
+logger = logging.getLogger(__name__)
+
+# Sentinel passed down the queues when an upstream stage is done
+_DONE = object()
+
+class StageStats:
+    """Throughput and latency counters for one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def record(self, seconds: float, count: int = 1):
+        """Record ``count`` items processed in ``seconds``."""
+        self.items += count
+        self.busy_seconds += seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the counters with derived throughput and average latency."""
+        wall = 0.0
+        if self.started_at is not None:
+            wall = (self.finished_at or time.perf_counter()) - self.started_at
+        return {
+            "items": self.items,
+            "errors": self.errors,
+            "throughput_per_s": round(self.items / wall, 2) if wall else 0.0,
+            "avg_latency_ms": round(self.busy_seconds / self.items * 1000, 2) if self.items else 0.0
+        }
+
+class ImportPipeline:
+    """
+    Staged asyncio import pipeline.
+
+    List-page fetchers feed a dedupe stage, which feeds N detail fetchers,
+    which feed a single batching DB writer. Stages are connected by bounded
+    queues, so a slow stage applies backpressure to the ones before it and the
+    overall rate is bounded by the TMDb rate budget rather than by serial
+    round-trips.
+
+    The database work of a run (loading the import context, writing batches)
+    is done on a thread of its own, which the session is used from, so the
+    event loop keeps serving other tasks (e.g. API requests) while a large
+    import writes.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        page_workers: Optional[int] = None,
+        detail_workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        flush_interval: float = 1.0,
+        max_candidates: Optional[int] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        on_result: Optional[Callable[[str, List[int]], None]] = None,
+        context: Optional[ImportContext] = None
+    ):
+        """
+        Args:
+            db: Database session used by the dedupe and writer stages
+            page_workers: Number of concurrent list-page fetchers
+            detail_workers: Number of concurrent detail fetchers
+            batch_size: Maximum number of movies written per transaction
+            queue_size: Capacity of each inter-stage queue
+            flush_interval: Seconds the writer waits before flushing a partial batch
+            max_candidates: Stop after this many distinct candidate movies
+            on_progress: Called with the current stats after every written batch; awaited if it returns an awaitable
+            on_result: Called with an outcome ("imported", "skipped" or "failed") and the TMDb IDs it applies to
+            context: Import context to dedupe against; defaults to a new one loaded at the start of every run
+        """
+        self.db = db
+        self.page_workers = page_workers or int(os.getenv("IMPORT_PAGE_WORKERS", "4"))
+        self.detail_workers = detail_workers or int(os.getenv("IMPORT_DETAIL_WORKERS", "8"))
+        self.batch_size = batch_size or int(os.getenv("IMPORT_BATCH_SIZE", "50"))
+        self.queue_size = queue_size or int(os.getenv("IMPORT_QUEUE_SIZE", "100"))
+        self.flush_interval = flush_interval
+        self.max_candidates = max_candidates
+        self.on_progress = on_progress
+        self.on_result = on_result
+        self.writer = MovieBulkWriter(db)
+        self.context = context
+        self._own_context = context is None
+
+        self.stages = {name: StageStats(name) for name in ("pages", "dedupe", "details", "writer")}
+        self.imported = 0
+        self.skipped = 0
+        self.failed = 0
+        self._seen_tmdb_ids = set()
+        self._seen_identifiers = set()
+        self._stop = asyncio.Event()
+        self._db_executor: Optional[ThreadPoolExecutor] = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get overall counters and per-stage throughput/latency."""
+        return {
+            "imported": self.imported,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "stages": {name: stats.as_dict() for name, stats in self.stages.items()},
+            "writer": self.writer.get_stats()
+        }
+
+    async def import_pages(self, fetch_page: Callable[[int], Awaitable[Dict[str, Any]]], page_count: int) -> Dict[str, Any]:
+        """
+        Import all movies listed on pages ``1..page_count`` of a TMDb list endpoint.
+
+        Args:
+            fetch_page: Coroutine function returning the TMDb response for a page number
+            page_count: Number of pages to fetch
+        """
+        next_page = iter(range(1, page_count + 1))
+        # Lowered to TMDb's total_pages by the first page, which the other pages wait for,
+        # so no worker asks for pages past the end
+        last_page = page_count
+        first_page_done = asyncio.Event()
+
+        async def page_worker(candidates: asyncio.Queue):
+            nonlocal last_page
+            stats = self.stages["pages"]
+            for page in next_page:
+                if page > 1:
+                    await first_page_done.wait()
+                if self._stop.is_set() or page > last_page:
+                    break
+                started = time.perf_counter()
+                try:
+                    response = await fetch_page(page)
+                finally:
+                    if page == 1:
+                        first_page_done.set()
+                if "error" in response:
+                    stats.errors += 1
+                    logger.error(f"Error fetching page {page}: {response['error']}")
+                    continue
+                stats.record(time.perf_counter() - started)
+                last_page = min(last_page, response.get("total_pages", last_page))
+                if page > last_page:
+                    continue
+                for movie_data in response.get("results", []):
+                    await candidates.put(movie_data)
+
+        return await self._run([page_worker] * self.page_workers)
+
+    async def import_payloads(self, payloads: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Import movies from summaries or detail payloads.
+
+        ``payloads`` may be an async iterable (e.g. a generator streaming list
+        pages as they arrive); it is closed early once ``max_candidates`` is
+        reached.
+        """
+        async def payload_source(candidates: asyncio.Queue):
+            stats = self.stages["pages"]
+            if hasattr(payloads, "__aiter__"):
+                try:
+                    async for movie_data in payloads:
+                        if self._stop.is_set():
+                            break
+                        await candidates.put(movie_data)
+                        stats.record(0.0)
+                finally:
+                    if hasattr(payloads, "aclose"):
+                        await payloads.aclose()
+            else:
+                for movie_data in payloads:
+                    if self._stop.is_set():
+                        break
+                    await candidates.put(movie_data)
+                    stats.record(0.0)
+
+        return await self._run([payload_source])
+
+    async def _run(self, sources: List[Callable[[asyncio.Queue], Awaitable[None]]]) -> Dict[str, Any]:
+        """Wire the stages together and run them to completion."""
+        candidates: asyncio.Queue = asyncio.Queue(self.queue_size)
+        to_fetch: asyncio.Queue = asyncio.Queue(self.queue_size)
+        to_write: asyncio.Queue = asyncio.Queue(self.queue_size)
+
+        async def run_sources():
+            self.stages["pages"].started_at = time.perf_counter()
+            try:
+                await asyncio.gather(*[source(candidates) for source in sources])
+            finally:
+                self.stages["pages"].finished_at = time.perf_counter()
+                await candidates.put(_DONE)
+
+        self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="import-db")
+        tasks = [
+            asyncio.ensure_future(run_sources()),
+            asyncio.ensure_future(self._dedupe(candidates, to_fetch)),
+            *[asyncio.ensure_future(self._fetch_details(to_fetch, to_write)) for _ in range(self.detail_workers)],
+            asyncio.ensure_future(self._write(to_write))
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            # A cancelled run may still be writing; the session is only handed back once it's done
+            await asyncio.to_thread(self._db_executor.shutdown)
+        return self.get_stats()
+
+    async def _in_db_thread(self, func: Callable[..., Any], *args) -> Any:
+        """Run ``func(*args)`` on the run's database thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._db_executor, func, *args)
+
+    async def _dedupe(self, candidates: asyncio.Queue, to_fetch: asyncio.Queue):
+        """Drop candidates already seen in this run or already in the database."""
+        stats = self.stages["dedupe"]
+        stats.started_at = time.perf_counter()
+        if self._own_context:
+            # Loaded per run, so movies added or deleted since the last run are seen
+            self.context = ImportContext()
+            await self._in_db_thread(self.context.load, self.db)
+        else:
+            await self._in_db_thread(self.context.ensure_loaded, self.db)
+        distinct = 0
+        while True:
+            movie_data = await candidates.get()
+            if movie_data is _DONE:
+                break
+            started = time.perf_counter()
+            movie_id = movie_data.get("id")
+            # Bare {"id": ...} payloads have no title to build an identifier from yet
+            identifier = get_movie_identity(movie_data)[2] if movie_data.get("title") else None
+            if not movie_id or movie_id in self._seen_tmdb_ids or identifier in self._seen_identifiers:
+                continue
+            if self.max_candidates is not None and distinct >= self.max_candidates:
+                # Enough candidates; let the sources wind down
+                self._stop.set()
+                continue
+            self._seen_tmdb_ids.add(movie_id)
+            if identifier:
+                self._seen_identifiers.add(identifier)
+            distinct += 1
+            if self.context.exists(movie_data):
+                self.skipped += 1
+                self._report("skipped", [movie_id])
+            else:
+                await to_fetch.put(movie_data)
+            stats.record(time.perf_counter() - started)
+        stats.finished_at = time.perf_counter()
+        for _ in range(self.detail_workers):
+            await to_fetch.put(_DONE)
+
+    async def _fetch_details(self, to_fetch: asyncio.Queue, to_write: asyncio.Queue):
+        """Resolve full detail payloads for new candidates."""
+        stats = self.stages["details"]
+        if stats.started_at is None:
+            stats.started_at = time.perf_counter()
+        while True:
+            movie_data = await to_fetch.get()
+            if movie_data is _DONE:
+                break
+            started = time.perf_counter()
+            try:
+                movie_details = await resolve_movie_details(movie_data)
+            except Exception as e:
+                logger.error(f"Error fetching details for movie {movie_data.get('id')}: {e}")
+                movie_details = None
+            if movie_details is None:
+                stats.errors += 1
+                self.failed += 1
+                self._report("failed", [movie_data.get("id")])
+                continue
+            stats.record(time.perf_counter() - started)
+            await to_write.put((movie_data, movie_details))
+        stats.finished_at = time.perf_counter()
+        await to_write.put(_DONE)
+
+    async def _write(self, to_write: asyncio.Queue):
+        """Write movies in batches of up to ``batch_size`` per transaction."""
+        stats = self.stages["writer"]
+        stats.started_at = time.perf_counter()
+        pending_workers = self.detail_workers
+        batch: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+        while pending_workers:
+            try:
+                item = await asyncio.wait_for(to_write.get(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                item = None
+            if item is _DONE:
+                pending_workers -= 1
+            elif item is not None:
+                batch.append(item)
+            if batch and (len(batch) >= self.batch_size or item is None or not pending_workers):
+                await self._flush(batch)
+                batch = []
+        if batch:
+            await self._flush(batch)
+        stats.finished_at = time.perf_counter()
+
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], Dict[str, Any]]]):
+        """Write one batch and report progress."""
+        stats = self.stages["writer"]
+        started = time.perf_counter()
+        try:
+            written = await self._in_db_thread(write_movies, self.db, batch, self.writer, self.context)
+        except Exception as e:
+            await self._in_db_thread(self.db.rollback)
+            stats.errors += 1
+            self.failed += len(batch)
+            logger.error(f"Error writing batch of {len(batch)} movies: {e}")
+            self._report("failed", [movie_data.get("id") for movie_data, _ in batch])
+            return
+        stats.record(time.perf_counter() - started, len(written))
+        self.imported += len(written)
+        self.skipped += len(batch) - len(written)
+        if self.on_result is not None:
+            outcomes = {"imported": [], "skipped": []}
+            for movie_data, movie_details in batch:
+                identifier = get_movie_identity(movie_data if movie_data.get("title") else movie_details)[2]
+                outcomes["imported" if identifier in written else "skipped"].append(movie_data.get("id"))
+            for outcome, movie_ids in outcomes.items():
+                self._report(outcome, movie_ids)
+        if self.on_progress is not None:
+            progress = self.on_progress(self.get_stats())
+            if inspect.isawaitable(progress):
+                await progress
+
+    def _report(self, outcome: str, movie_ids: List[int]):
+        """Pass per-movie outcomes to ``on_result``."""
+        if self.on_result is not None and movie_ids:
+            self.on_result(outcome, movie_ids)
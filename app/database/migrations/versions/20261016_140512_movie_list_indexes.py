@@ -0,0 +1,53 @@
+"""Add composite indexes for the movie list query and a unique tmdb_id index
+
+Revision ID: 0e2f9f368ed7
+Revises:
+Create Date: 2026-10-16 14:05:12.000000
+
+The movie list orders by rating (id breaks ties) and filters on year,
+rating and genre; genre filters look up movie_genres by genre_id, and
+imports deduplicate on tmdb_id. (year, rating) replaces the single-column
+year index, which is its prefix.
+
+Databases created with ``create_all`` already have these indexes, so every
+step is skipped when its index exists.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0e2f9f368ed7'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def check_unique_tmdb_ids():
+    """Refuse to continue if movies share a TMDb ID; the unique index would fail on them."""
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT tmdb_id, COUNT(*) FROM movies WHERE tmdb_id IS NOT NULL "
+        "GROUP BY tmdb_id HAVING COUNT(*) > 1 ORDER BY tmdb_id LIMIT 20"
+    )).all()
+    if duplicates:
+        listed = ", ".join(f"{tmdb_id} ({count} movies)" for tmdb_id, count in duplicates)
+        raise RuntimeError(
+            f"Movies share a TMDb ID: {listed}. Remove the duplicates, then run the migration again."
+        )
+
+
+def upgrade():
+    check_unique_tmdb_ids()
+    op.create_index('idx_movies_rating_id', 'movies', ['rating', 'id'], if_not_exists=True)
+    op.create_index('idx_movies_year_rating', 'movies', ['year', 'rating'], if_not_exists=True)
+    op.drop_index('idx_movies_year', table_name='movies', if_exists=True)
+    op.create_index('idx_movies_tmdb_id', 'movies', ['tmdb_id'], unique=True, if_not_exists=True)
+    op.create_index('idx_movie_genres_genre_movie', 'movie_genres', ['genre_id', 'movie_id'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('idx_movie_genres_genre_movie', table_name='movie_genres', if_exists=True)
+    op.drop_index('idx_movies_tmdb_id', table_name='movies', if_exists=True)
+    op.create_index('idx_movies_year', 'movies', ['year'], if_not_exists=True)
+    op.drop_index('idx_movies_year_rating', table_name='movies', if_exists=True)
+    op.drop_index('idx_movies_rating_id', table_name='movies', if_exists=True)
@@ -0,0 +1,34 @@
+"""Add an index per sort order of the movie list
+
+Revision ID: 975b0058d6bf
+Revises: 12f2066f92ab
+Create Date: 2026-10-16 18:10:47.000000
+
+Cursor pages seek to a (sort column, id) position, so every sort order
+needs an index on exactly those columns; genre_mask is appended like on the
+rating index. "Recently added" uses the primary key. (title, id, genre_mask)
+replaces the single-column title index, which is its prefix.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '975b0058d6bf'
+down_revision = '12f2066f92ab'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('idx_movies_votes_id', 'movies', ['votes', 'id', 'genre_mask'], if_not_exists=True)
+    op.create_index('idx_movies_year_id', 'movies', ['year', 'id', 'genre_mask'], if_not_exists=True)
+    op.create_index('idx_movies_title_id', 'movies', ['title', 'id', 'genre_mask'], if_not_exists=True)
+    op.drop_index('idx_movies_title', table_name='movies', if_exists=True)
+
+
+def downgrade():
+    op.create_index('idx_movies_title', 'movies', ['title'], if_not_exists=True)
+    op.drop_index('idx_movies_title_id', table_name='movies', if_exists=True)
+    op.drop_index('idx_movies_year_id', table_name='movies', if_exists=True)
+    op.drop_index('idx_movies_votes_id', table_name='movies', if_exists=True)
@@ -0,0 +1,79 @@
+"""Create the import_jobs and movie_payloads tables
+
+Revision ID: adbc3d114417
+Revises: 975b0058d6bf
+Create Date: 2026-10-17 09:34:18.000000
+
+Both tables used to be created only at runtime (by the import job queue on
+startup and by the bulk writer on its first archived payload), so migrated
+databases lacked them until then. import_jobs tables created that way
+before jobs were leased to their worker get the lease columns.
+
+Databases created with ``create_all`` already have these tables, so every
+step is skipped when its table, column or index exists.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'adbc3d114417'
+down_revision = '975b0058d6bf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables = sa.inspect(op.get_bind()).get_table_names()
+
+    if "import_jobs" not in tables:
+        op.create_table(
+            'import_jobs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('kind', sa.String(length=50), nullable=False),
+            sa.Column('params', sa.JSON(), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('total', sa.Integer(), nullable=True),
+            sa.Column('imported', sa.Integer(), nullable=False),
+            sa.Column('skipped', sa.Integer(), nullable=False),
+            sa.Column('failed', sa.Integer(), nullable=False),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('worker_id', sa.String(length=100), nullable=True),
+            sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('cancel_requested', sa.Boolean(), server_default=sa.false(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+    else:
+        columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("import_jobs")}
+        if "worker_id" not in columns:
+            op.add_column('import_jobs', sa.Column('worker_id', sa.String(length=100), nullable=True))
+        if "heartbeat_at" not in columns:
+            op.add_column('import_jobs', sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True))
+        if "cancel_requested" not in columns:
+            op.add_column('import_jobs', sa.Column('cancel_requested', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.create_index('ix_import_jobs_id', 'import_jobs', ['id'], if_not_exists=True)
+    op.create_index('idx_import_jobs_status', 'import_jobs', ['status'], if_not_exists=True)
+
+    if "movie_payloads" not in tables:
+        op.create_table(
+            'movie_payloads',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('tmdb_id', sa.Integer(), nullable=False),
+            sa.Column('fetched_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column('payload', sa.LargeBinary(), nullable=False),
+            sa.Column('size', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+    op.create_index('idx_movie_payloads_tmdb_id_fetched_at', 'movie_payloads', ['tmdb_id', 'fetched_at'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('idx_movie_payloads_tmdb_id_fetched_at', table_name='movie_payloads', if_exists=True)
+    op.drop_table('movie_payloads')
+    op.drop_index('idx_import_jobs_status', table_name='import_jobs', if_exists=True)
+    op.drop_index('ix_import_jobs_id', table_name='import_jobs', if_exists=True)
+    op.drop_table('import_jobs')
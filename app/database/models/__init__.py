@@ -1,2 +1,5 @@
 from app.database.models.base import Base, TimestampMixin
-from app.database.models.movie import Movie, Genre, movie_genre 
\ No newline at end of file
+from app.database.models.movie import Movie, Genre, movie_genre, genre_bit, genre_mask, MAX_MASK_GENRE_ID
+from app.database.models.import_job import ImportJob
+from app.database.models.movie_payload import MoviePayload
+from app.database.models.movie_search import ensure_search_index, rebuild_search_index
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Boolean, Index, false
+
+from app.database.models.base import Base, TimestampMixin
+
+class ImportJob(Base, TimestampMixin):
+    """Background TMDb import job and its progress."""
+    __tablename__ = "import_jobs"
+    
+    # Job states
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)  # e.g. 'popular', 'top_rated', 'search'
+    params = Column(JSON, nullable=False, default=dict)
+    status = Column(String(20), nullable=False, default=QUEUED)
+    total = Column(Integer, nullable=True)  # expected number of candidate movies
+    imported = Column(Integer, nullable=False, default=0)
+    skipped = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    worker_id = Column(String(100), nullable=True)  # queue instance running the job
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # renewed while the job runs; its lease
+    cancel_requested = Column(Boolean, nullable=False, default=False, server_default=false())  # polled by the worker running the job
+    
+    __table_args__ = (
+        Index('idx_import_jobs_status', status),
+    )
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Table, JSON, Index, DECIMAL, PrimaryKeyConstraint
+from typing import Iterable
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Date, ForeignKey, Table, JSON, Index, DECIMAL, PrimaryKeyConstraint, event
 from sqlalchemy.orm import relationship
 
 from app.database.models.base import Base, TimestampMixin
@@ -9,7 +10,9 @@ movie_genre = Table(
     Base.metadata,
     Column('movie_id', Integer, ForeignKey('movies.id')),
     Column('genre_id', Integer, ForeignKey('genres.id')),
-    PrimaryKeyConstraint('movie_id', 'genre_id')
+    PrimaryKeyConstraint('movie_id', 'genre_id'),
+    # Reverse lookup (movies of a genre); the primary key only serves movie_id lookups
+    Index('idx_movie_genres_genre_movie', 'genre_id', 'movie_id')
 )
 
 class Movie(Base, TimestampMixin):
@@ -29,15 +32,24 @@ class Movie(Base, TimestampMixin):
     language = Column(String(10), nullable=True)  # Original language (e.g. 'en', 'ko', 'fr')
     poster_path = Column(String(255), nullable=True)  # TMDb poster image path
     backdrop_path = Column(String(255), nullable=True)  # TMDb backdrop image path
+    genre_mask = Column(BigInteger, nullable=False, default=0, server_default="0")  # OR of genre_bit() of the movie's genres
     
     # Relationships
     genres = relationship("Genre", secondary=movie_genre, back_populates="movies")
     
-    # Create indexes
+    # Create indexes. The composite ones serve the movie list query, which
+    # orders by a sort column (id breaks ties) and filters on year, rating and genre;
+    # they are added to existing databases by the migrations in
+    # app/database/migrations/versions
     __table_args__ = (
         Index('idx_movies_identifier', identifier),
-        Index('idx_movies_title', title),
-        Index('idx_movies_year', year),
+        Index('idx_movies_year_rating', year, rating),
+        # One per sort order of the list (see MOVIE_SORTS); genre filters are tested in the index
+        Index('idx_movies_rating_id', rating, id, genre_mask),
+        Index('idx_movies_votes_id', votes, id, genre_mask),
+        Index('idx_movies_year_id', year, id, genre_mask),
+        Index('idx_movies_title_id', title, id, genre_mask),
+        Index('idx_movies_tmdb_id', tmdb_id, unique=True),
         Index('idx_movies_language', language),
     )
 
@@ -49,4 +61,32 @@ class Genre(Base):
     name = Column(String(100), unique=True, nullable=False)
     
     # Relationships
-    movies = relationship("Movie", secondary=movie_genre, back_populates="genres") 
\ No newline at end of file
+    movies = relationship("Movie", secondary=movie_genre, back_populates="genres")
+
+# Movie.genre_mask has one bit per genre ID, so genre filters are bitwise
+# predicates on the movies table instead of joins. IDs above this don't fit in
+# a signed 64-bit integer and are only found through movie_genres.
+MAX_MASK_GENRE_ID = 63
+
+def genre_bit(genre_id: int) -> int:
+    """Get the ``genre_mask`` bit of a genre (0 for IDs without a bit)."""
+    if genre_id is None or not 1 <= genre_id <= MAX_MASK_GENRE_ID:
+        return 0
+    return 1 << (genre_id - 1)
+
+def genre_mask(genre_ids: Iterable[int]) -> int:
+    """Get the ``genre_mask`` of a movie with the given genres."""
+    mask = 0
+    for genre_id in genre_ids:
+        mask |= genre_bit(genre_id)
+    return mask
+
+# Keep the mask in step with ORM changes to Movie.genres (add_genre_to_movie,
+# genre.movies, ...); the bulk writer sets it directly
+@event.listens_for(Movie.genres, "append")
+def _add_genre_bit(movie, genre, initiator):
+    movie.genre_mask = (movie.genre_mask or 0) | genre_bit(genre.id)
+
+@event.listens_for(Movie.genres, "remove")
+def _remove_genre_bit(movie, genre, initiator):
+    movie.genre_mask = (movie.genre_mask or 0) & ~genre_bit(genre.id) 
\ No newline at end of file
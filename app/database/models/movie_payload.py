@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, DateTime, LargeBinary, Index
+from sqlalchemy.sql import func
+
+from app.database.models.base import Base
+
+class MoviePayload(Base):
+    """Append-only archive of raw TMDb movie detail payloads (zlib-compressed JSON)."""
+    __tablename__ = "movie_payloads"
+    
+    id = Column(Integer, primary_key=True)
+    tmdb_id = Column(Integer, nullable=False)
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    payload = Column(LargeBinary, nullable=False)  # zlib-compressed JSON
+    size = Column(Integer, nullable=False)  # uncompressed size in bytes
+    
+    __table_args__ = (
+        Index('idx_movie_payloads_tmdb_id_fetched_at', tmdb_id, fetched_at),
+    )
@@ -0,0 +1,138 @@
+import logging
+from sqlalchemy import DDL, event, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.database.models.movie import Movie
+
+logger = logging.getLogger(__name__)
+
+# Full-text index over the movie title and director.
+#
+# SQLite: an external-content FTS5 table keyed on movies.id, kept in sync by
+# triggers (so the bulk writer's upserts and any other writes are covered),
+# with prefix indexes for 2 to 4 character prefixes.
+# PostgreSQL: a GIN expression index over a 'simple' tsvector of the same text.
+FTS_TABLE = "movies_fts"
+
+# Trigram index over the title alone, serving the substring (ILIKE '%...%')
+# semantics of the movie list's title filter.
+#
+# SQLite: an FTS5 table with the trigram tokenizer (SQLite 3.34+), which
+# answers LIKE patterns of 3 or more characters from its index.
+# PostgreSQL: a pg_trgm GIN index on movies.title, used by ILIKE directly.
+TITLE_FTS_TABLE = "movies_fts_title"
+
+SQLITE_SEARCH_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, director,
+        content='movies', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3 4'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS movies_fts_insert AFTER INSERT ON movies BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, director) VALUES (new.id, new.title, new.director);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS movies_fts_delete AFTER DELETE ON movies BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, director) VALUES ('delete', old.id, old.title, old.director);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS movies_fts_update AFTER UPDATE OF title, director ON movies BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, director) VALUES ('delete', old.id, old.title, old.director);
+        INSERT INTO {FTS_TABLE}(rowid, title, director) VALUES (new.id, new.title, new.director);
+    END"""
+]
+
+SQLITE_TITLE_INDEX_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {TITLE_FTS_TABLE} USING fts5(
+        title, content='movies', content_rowid='id', tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS movies_fts_title_insert AFTER INSERT ON movies BEGIN
+        INSERT INTO {TITLE_FTS_TABLE}(rowid, title) VALUES (new.id, new.title);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS movies_fts_title_delete AFTER DELETE ON movies BEGIN
+        INSERT INTO {TITLE_FTS_TABLE}({TITLE_FTS_TABLE}, rowid, title) VALUES ('delete', old.id, old.title);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS movies_fts_title_update AFTER UPDATE OF title ON movies BEGIN
+        INSERT INTO {TITLE_FTS_TABLE}({TITLE_FTS_TABLE}, rowid, title) VALUES ('delete', old.id, old.title);
+        INSERT INTO {TITLE_FTS_TABLE}(rowid, title) VALUES (new.id, new.title);
+    END"""
+]
+
+# Weighted like the SQLite ranking: title matches count more than director matches
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(director, '')), 'B')"
+)
+
+POSTGRESQL_SEARCH_DDL = [
+    f"CREATE INDEX IF NOT EXISTS idx_movies_search ON movies USING GIN (({SEARCH_VECTOR_SQL}))",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS idx_movies_title_trgm ON movies USING GIN (title gin_trgm_ops)"
+]
+
+def sqlite_has_fts5(bind) -> bool:
+    """Whether the SQLite library was built with FTS5."""
+    options = {row[0] for row in bind.exec_driver_sql("PRAGMA compile_options")}
+    return "ENABLE_FTS5" in options
+
+def sqlite_has_trigram(bind) -> bool:
+    """Whether the SQLite library has FTS5's trigram tokenizer (3.34+)."""
+    version = bind.exec_driver_sql("SELECT sqlite_version()").scalar()
+    return tuple(int(part) for part in version.split(".")[:2]) >= (3, 34)
+
+def search_index_supported(bind) -> bool:
+    """Whether the database gets a full-text index (SQLite with FTS5, or PostgreSQL)."""
+    if bind.dialect.name == "sqlite":
+        return sqlite_has_fts5(bind)
+    return bind.dialect.name == "postgresql"
+
+def _create_on(dialect: str, trigram: bool = False):
+    def should_create(ddl, target, bind, **kw):
+        return (bind is not None and bind.dialect.name == dialect and search_index_supported(bind)
+                and (not trigram or sqlite_has_trigram(bind)))
+    return should_create
+
+# Create the indexes with the movies table, and drop the FTS tables with it
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(Movie.__table__, "after_create", DDL(statement).execute_if(callable_=_create_on("sqlite")))
+for statement in SQLITE_TITLE_INDEX_DDL:
+    event.listen(Movie.__table__, "after_create", DDL(statement).execute_if(callable_=_create_on("sqlite", trigram=True)))
+for statement in POSTGRESQL_SEARCH_DDL:
+    event.listen(Movie.__table__, "after_create", DDL(statement).execute_if(callable_=_create_on("postgresql")))
+for table in (FTS_TABLE, TITLE_FTS_TABLE):
+    event.listen(Movie.__table__, "before_drop", DDL(f"DROP TABLE IF EXISTS {table}").execute_if(dialect="sqlite"))
+
+def rebuild_search_index(connection: Connection, tables=(FTS_TABLE, TITLE_FTS_TABLE)):
+    """Re-index every movie (SQLite only; PostgreSQL maintains its indexes itself)."""
+    if connection.dialect.name == "sqlite":
+        existing = inspect(connection).get_table_names()
+        for table in tables:
+            if table in existing:
+                connection.execute(text(f"INSERT INTO {table}({table}) VALUES ('rebuild')"))
+
+def ensure_search_index(bind: Engine) -> bool:
+    """
+    Add the full-text and title trigram indexes to a database whose movies table predates them.
+
+    New databases get them from ``create_all``. Returns whether the database
+    has a search index.
+    """
+    with bind.begin() as connection:
+        if not search_index_supported(connection):
+            return False
+        tables = inspect(connection).get_table_names()
+        if "movies" not in tables:
+            return False
+        if connection.dialect.name == "sqlite":
+            missing = {}
+            if FTS_TABLE not in tables:
+                missing[FTS_TABLE] = SQLITE_SEARCH_DDL
+            if TITLE_FTS_TABLE not in tables and sqlite_has_trigram(connection):
+                missing[TITLE_FTS_TABLE] = SQLITE_TITLE_INDEX_DDL
+            for table, statements in missing.items():
+                for statement in statements:
+                    connection.exec_driver_sql(statement)
+                rebuild_search_index(connection, [table])
+                logger.info(f"Created and populated the {table} index")
+        else:
+            for statement in POSTGRESQL_SEARCH_DDL:
+                connection.exec_driver_sql(statement)
+    return True
@@ -0,0 +1,91 @@
+import os
+import json
+import zlib
+import logging
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.database.models import MoviePayload
+from app.database.tmdb_mapping import movie_row_from_details
+
+logger = logging.getLogger(__name__)
+
+# Movie columns rebuilt by default; identifier, title and year are left alone
+# because changing them can collide with the unique identifier of another movie
+DERIVED_COLUMNS = [
+    "director", "runtime", "rating", "votes", "imdb_id", "language", "poster_path", "backdrop_path"
+]
+
+# Columns rebuilt when none are named; rating and votes are left out because
+# scripts/add_custom_movie.py sets custom values the payloads don't have
+DEFAULT_REDERIVED_COLUMNS = [column for column in DERIVED_COLUMNS if column not in ("rating", "votes")]
+
+_checked_binds = set()
+
+def archive_enabled() -> bool:
+    """Whether imports archive raw detail payloads (``TMDB_PAYLOAD_ARCHIVE``, default on)."""
+    return os.getenv("TMDB_PAYLOAD_ARCHIVE", "true").lower() in ("1", "true", "yes")
+
+def ensure_archive_table(bind: Engine):
+    """Create the ``movie_payloads`` table on first use in databases created before it existed."""
+    key = str(bind.url)
+    if key not in _checked_binds:
+        MoviePayload.__table__.create(bind=bind, checkfirst=True)
+        _checked_binds.add(key)
+
+def archive_rows(payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Build ``movie_payloads`` rows (compact, zlib-compressed JSON) for full detail payloads."""
+    rows = []
+    for payload in payloads:
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        rows.append({"tmdb_id": payload["id"], "payload": zlib.compress(raw), "size": len(raw)})
+    return rows
+
+def iter_latest_payloads(db: Session, chunk_size: int = 1000, after_tmdb_id: int = 0) -> Iterator[List[Tuple[int, bytes]]]:
+    """
+    Yield chunks of (tmdb_id, compressed payload) for the latest payload of each movie.
+
+    Chunks are keyset queries ordered by ``tmdb_id``, so memory stays bounded
+    and no cursor is held open between chunks.
+    """
+    while True:
+        latest = (
+            select(MoviePayload.tmdb_id, func.max(MoviePayload.id).label("id"))
+            .where(MoviePayload.tmdb_id > after_tmdb_id)
+            .group_by(MoviePayload.tmdb_id)
+            .order_by(MoviePayload.tmdb_id)
+            .limit(chunk_size)
+            .subquery()
+        )
+        chunk = db.execute(
+            select(MoviePayload.tmdb_id, MoviePayload.payload)
+            .join(latest, MoviePayload.id == latest.c.id)
+            .order_by(MoviePayload.tmdb_id)
+        ).all()
+        if not chunk:
+            return
+        yield [(tmdb_id, payload) for tmdb_id, payload in chunk]
+        after_tmdb_id = chunk[-1][0]
+
+def decompress_payload(blob: bytes) -> Dict[str, Any]:
+    """Decode an archived payload."""
+    return json.loads(zlib.decompress(blob))
+
+def derive_rows(chunk: List[Tuple[int, bytes]], columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Rebuild movie column values from archived payloads.
+
+    Runs in worker processes, so it only takes and returns plain data.
+
+    Returns:
+        One dictionary per payload with ``tmdb_id`` and the requested columns
+    """
+    columns = columns or DERIVED_COLUMNS
+    rows = []
+    for tmdb_id, blob in chunk:
+        details = decompress_payload(blob)
+        row = movie_row_from_details(details, details)
+        rows.append({"tmdb_id": tmdb_id, **{column: row[column] for column in columns}})
+    return rows
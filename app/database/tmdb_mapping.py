@@ -0,0 +1,64 @@
+from typing import Dict, List, Tuple, Any
+
+def has_full_details(movie_data: Dict[str, Any]) -> bool:
+    """
+    Check whether a payload is a full TMDb detail payload.
+    
+    List endpoints (search, popular, top rated, discover) return summaries with
+    ``genre_ids`` only, while ``get_movie_details`` also returns ``genres`` and
+    the appended ``credits``.
+    """
+    return "credits" in movie_data and "genres" in movie_data
+
+def get_movie_identity(movie_data: Dict[str, Any]) -> Tuple[str, int, str]:
+    """Get the title, year and "Title (Year)" identifier of a TMDb payload."""
+    title = movie_data.get("title", "Unknown")
+    year = (movie_data.get("release_date") or "")[:4]  # Extract year from release_date
+    
+    if not year or not year.isdigit():
+        year = 0
+    else:
+        year = int(year)
+    
+    return title, year, f"{title} ({year})"
+
+def movie_row_from_details(movie_data: Dict[str, Any], movie_details: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map a TMDb payload and its full details to ``movies`` column values.
+    
+    Args:
+        movie_data: Summary or detail payload the movie was discovered with
+        movie_details: Full detail payload
+        
+    Returns:
+        Dictionary of Movie column values
+    """
+    title, year, identifier = get_movie_identity(movie_data if movie_data.get("title") else movie_details)
+    
+    # Extract director from credits
+    director = None
+    if "credits" in movie_details and "crew" in movie_details["credits"]:
+        directors = [
+            crew["name"] for crew in movie_details["credits"]["crew"]
+            if crew["job"] == "Director"
+        ]
+        director = ", ".join(directors) if directors else None
+    
+    return {
+        "identifier": identifier,
+        "title": title,
+        "year": year,
+        "director": director,
+        "runtime": movie_details.get("runtime"),
+        "rating": movie_details.get("vote_average"),          # TMDB rating
+        "votes": movie_details.get("vote_count"),             # TMDB vote count
+        "tmdb_id": movie_data.get("id") or movie_details.get("id"),
+        "imdb_id": movie_details.get("imdb_id"),              # IMDb ID
+        "language": movie_details.get("original_language"),   # Original language
+        "poster_path": movie_details.get("poster_path"),      # Poster image path
+        "backdrop_path": movie_details.get("backdrop_path")   # Backdrop image path
+    }
+
+def get_genre_names(movie_details: Dict[str, Any]) -> List[str]:
+    """Get the genre names of a full detail payload."""
+    return [genre["name"] for genre in movie_details.get("genres", [])]
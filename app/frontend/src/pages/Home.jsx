@@ -14,8 +14,8 @@ const Home = () => {
     const fetchMovies = async () => {
       try {
         setLoading(true)
-        // Fetch real data from API
-        const response = await axios.get('/api/movies?limit=24')
+        // Fetch real data from API, only the fields the cards and the featured banner show
+        const response = await axios.get('/api/movies?limit=24&fields=card,backdrop_path')
         
         // Map any necessary transformations
         const processedMovies = response.data.map(movie => ({
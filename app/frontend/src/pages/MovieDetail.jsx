@@ -14,7 +14,7 @@ const MovieDetail = () => {
       try {
         setLoading(true)
         // Fetch real data from API
-        const response = await axios.get(`/api/movies/${id}`)
+        const response = await axios.get(`/api/movies/${id}?fields=detail`)
         setMovie(response.data)
         setError(null)
       } catch (err) {
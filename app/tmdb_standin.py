@@ -0,0 +1,270 @@
+"""
+Offline stand-in for the TMDb API.
+
+Serves the subset of TMDb endpoints used by MovieSeek (search, details,
+popular, top rated, discover and the genre list) from recorded or synthetic
+fixtures, with configurable latency, jitter, error and 429 injection. Point
+``TMDbAPI`` at it through ``TMDB_BASE_URL`` (or an in-process
+``httpx.ASGITransport``) to benchmark imports without network or quota.
+"""
+
+import gzip
+import json
+import math
+import random
+import asyncio
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 20
+MAX_PAGES = 500  # TMDb never serves pages beyond 500
+
+# Official TMDb movie genres
+TMDB_GENRES = [
+    {"id": 28, "name": "Action"},
+    {"id": 12, "name": "Adventure"},
+    {"id": 16, "name": "Animation"},
+    {"id": 35, "name": "Comedy"},
+    {"id": 80, "name": "Crime"},
+    {"id": 99, "name": "Documentary"},
+    {"id": 18, "name": "Drama"},
+    {"id": 10751, "name": "Family"},
+    {"id": 14, "name": "Fantasy"},
+    {"id": 36, "name": "History"},
+    {"id": 27, "name": "Horror"},
+    {"id": 10402, "name": "Music"},
+    {"id": 9648, "name": "Mystery"},
+    {"id": 10749, "name": "Romance"},
+    {"id": 878, "name": "Science Fiction"},
+    {"id": 10770, "name": "TV Movie"},
+    {"id": 53, "name": "Thriller"},
+    {"id": 10752, "name": "War"},
+    {"id": 37, "name": "Western"},
+]
+
+# Fields of a detail payload that TMDb also returns in list results
+SUMMARY_FIELDS = [
+    "id", "title", "original_title", "original_language", "overview", "release_date",
+    "popularity", "vote_average", "vote_count", "poster_path", "backdrop_path", "adult", "video"
+]
+
+_TITLE_WORDS = [
+    "Silent", "Harbor", "Crimson", "Empire", "Last", "Winter", "Broken", "Arrow", "Hidden", "Garden",
+    "Midnight", "Express", "Golden", "River", "Iron", "Shadow", "Distant", "Shore", "Wild", "Heart",
+    "Lost", "City", "Burning", "Sky", "Glass", "Tower", "Forgotten", "Kingdom", "Electric", "Dream",
+    "Northern", "Light", "Savage", "Road", "Velvet", "Storm", "Paper", "Moon", "Black", "Orchid"
+]
+_FIRST_NAMES = ["Ana", "Ben", "Chloe", "David", "Elena", "Farid", "Grace", "Hiro", "Ines", "Jonas", "Kemi", "Luca"]
+_LAST_NAMES = ["Almeida", "Brooks", "Chen", "Dubois", "Eriksen", "Fischer", "Garcia", "Haddad", "Ivanova", "Jensen"]
+_LANGUAGES = ["en", "en", "en", "en", "fr", "es", "de", "ja", "ko", "it", "hi"]
+
+class FixtureStore:
+    """In-memory set of TMDb detail payloads and genres served by the stand-in."""
+    
+    def __init__(self, movies: Optional[List[Dict[str, Any]]] = None, genres: Optional[List[Dict[str, Any]]] = None):
+        self.movies: Dict[int, Dict[str, Any]] = {}
+        self.genres = genres or TMDB_GENRES
+        self._sorted_cache: Dict[str, List[Dict[str, Any]]] = {}
+        for movie in movies or []:
+            self.add(movie)
+    
+    def add(self, details: Dict[str, Any]):
+        """Add (or replace) a movie detail payload."""
+        self.movies[details["id"]] = details
+        self._sorted_cache = {}
+    
+    @staticmethod
+    def summarize(details: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the list-result representation of a detail payload."""
+        summary = {field: details.get(field) for field in SUMMARY_FIELDS}
+        summary["genre_ids"] = [genre["id"] for genre in details.get("genres", [])]
+        return summary
+    
+    def sorted_by(self, key: str) -> List[Dict[str, Any]]:
+        """Get all movies sorted descending by a field, memoized per field."""
+        if key not in self._sorted_cache:
+            self._sorted_cache[key] = sorted(
+                self.movies.values(), key=lambda m: (m.get(key) or 0, m["id"]), reverse=True
+            )
+        return self._sorted_cache[key]
+    
+    @classmethod
+    def generate(cls, count: int, seed: int = 42) -> "FixtureStore":
+        """Generate a deterministic synthetic catalog of ``count`` movies."""
+        rng = random.Random(seed)
+        movies = []
+        for i in range(count):
+            movie_id = 100000 + i
+            words = rng.sample(_TITLE_WORDS, rng.randint(1, 3))
+            title = " ".join(["The"] + words if rng.random() < 0.3 else words)
+            year = rng.randint(1950, 2024)
+            # Vote counts follow a long tail like the real catalog
+            vote_count = int(50 * (1 / (1 - rng.random() * 0.999)) ** 1.3)
+            directors = [f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}"]
+            movies.append({
+                "id": movie_id,
+                "imdb_id": f"tt{9000000 + i:07d}",
+                "title": title,
+                "original_title": title,
+                "original_language": rng.choice(_LANGUAGES),
+                "overview": f"A synthetic film about {' and '.join(w.lower() for w in words)}.",
+                "release_date": f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "runtime": rng.randint(75, 190),
+                "popularity": round(rng.random() * math.log10(vote_count + 10) * 40, 3),
+                "vote_average": round(rng.uniform(4.0, 9.0), 1),
+                "vote_count": vote_count,
+                "poster_path": f"/synthetic_poster_{movie_id}.jpg",
+                "backdrop_path": f"/synthetic_backdrop_{movie_id}.jpg",
+                "adult": False,
+                "video": False,
+                "genres": rng.sample(TMDB_GENRES, rng.randint(1, 3)),
+                "credits": {
+                    "cast": [
+                        {"name": f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}", "character": f"Role {n}"}
+                        for n in range(1, 6)
+                    ],
+                    "crew": [{"name": name, "job": "Director"} for name in directors]
+                },
+                "keywords": {"keywords": [{"id": n, "name": w.lower()} for n, w in enumerate(words)]},
+                "videos": {"results": []},
+                "images": {"backdrops": [], "posters": []},
+                "release_dates": {"results": []}
+            })
+        return cls(movies)
+    
+    @classmethod
+    def load(cls, path: str) -> "FixtureStore":
+        """Load fixtures from a JSON (optionally gzipped) file."""
+        opener = gzip.open if str(path).endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("movies", []), data.get("genres"))
+    
+    def save(self, path: str):
+        """Write fixtures to a JSON (optionally gzipped) file."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        opener = gzip.open if str(path).endswith(".gz") else open
+        with opener(path, "wt", encoding="utf-8") as f:
+            json.dump({"genres": self.genres, "movies": list(self.movies.values())}, f)
+
+def _paginate(results: List[Dict[str, Any]], page: int) -> Dict[str, Any]:
+    """Slice a result list into a TMDb-style page."""
+    total_pages = min(math.ceil(len(results) / PAGE_SIZE), MAX_PAGES)
+    start = (page - 1) * PAGE_SIZE
+    return {
+        "page": page,
+        "results": [FixtureStore.summarize(m) for m in results[start:start + PAGE_SIZE]] if page <= MAX_PAGES else [],
+        "total_pages": total_pages,
+        "total_results": len(results)
+    }
+
+def _error(status_code: int, message: str, tmdb_code: int) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"success": False, "status_code": tmdb_code, "status_message": message}
+    )
+
+def create_app(
+    store: FixtureStore,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    throttle_rate: float = 0.0,
+    retry_after: int = 1,
+    seed: Optional[int] = None
+) -> FastAPI:
+    """
+    Create the stand-in ASGI application.
+    
+    Args:
+        store: Fixtures to serve
+        latency: Base response latency in seconds
+        jitter: Maximum random latency added on top of ``latency``, in seconds
+        error_rate: Fraction of requests answered with a 500 error
+        throttle_rate: Fraction of requests answered with a 429 and ``Retry-After``
+        retry_after: Value of the ``Retry-After`` header on injected 429s
+        seed: Seed for the fault injection random generator
+    """
+    app = FastAPI(title="TMDb stand-in", docs_url=None, redoc_url=None)
+    rng = random.Random(seed)
+    app.state.stats = {"requests": 0, "errors": 0, "throttled": 0, "not_modified": 0}
+    
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        app.state.stats["requests"] += 1
+        delay = latency + (rng.random() * jitter if jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        roll = rng.random()
+        if roll < throttle_rate:
+            app.state.stats["throttled"] += 1
+            response = _error(429, "Your request count is over the allowed limit.", 25)
+            response.headers["Retry-After"] = str(retry_after)
+            return response
+        if roll < throttle_rate + error_rate:
+            app.state.stats["errors"] += 1
+            return _error(500, "Internal error: Something went wrong, contact TMDb.", 11)
+        return await call_next(request)
+    
+    def respond(request: Request, payload: Dict[str, Any]) -> Response:
+        """Serialize a payload with an ETag, answering 304 to matching conditional requests."""
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if request.headers.get("if-none-match") == etag:
+            app.state.stats["not_modified"] += 1
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
+    
+    @app.get("/genre/movie/list")
+    async def genre_list(request: Request):
+        return respond(request, {"genres": store.genres})
+    
+    @app.get("/movie/popular")
+    async def popular(request: Request, page: int = 1):
+        return respond(request, _paginate(store.sorted_by("popularity"), page))
+    
+    @app.get("/movie/top_rated")
+    async def top_rated(request: Request, page: int = 1):
+        results = [m for m in store.sorted_by("vote_average") if (m.get("vote_count") or 0) >= 300]
+        return respond(request, _paginate(results, page))
+    
+    @app.get("/search/movie")
+    async def search(request: Request, query: str = "", page: int = 1, include_adult: str = "false"):
+        needle = query.lower()
+        results = [
+            m for m in store.sorted_by("popularity")
+            if needle in (m.get("title") or "").lower() and (include_adult == "true" or not m.get("adult"))
+        ]
+        return respond(request, _paginate(results, page))
+    
+    @app.get("/discover/movie")
+    async def discover(request: Request, page: int = 1, sort_by: str = "popularity.desc", include_adult: str = "false"):
+        field = sort_by.rsplit(".", 1)[0]
+        min_votes = int(request.query_params.get("vote_count.gte", 0))
+        results = [
+            m for m in store.sorted_by(field)
+            if (m.get("vote_count") or 0) >= min_votes and (include_adult == "true" or not m.get("adult"))
+        ]
+        if sort_by.endswith(".asc"):
+            results = results[::-1]
+        return respond(request, _paginate(results, page))
+    
+    @app.get("/movie/{movie_id}")
+    async def movie_details(request: Request, movie_id: int):
+        details = store.movies.get(movie_id)
+        if details is None:
+            return _error(404, "The resource you requested could not be found.", 34)
+        return respond(request, details)
+    
+    @app.get("/_standin/stats")
+    async def standin_stats():
+        return {**app.state.stats, "movies": len(store.movies)}
+    
+    return app
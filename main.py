@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -6,11 +7,29 @@ import uvicorn
 from app.api.routes import api_router
 from app.admin import admin_router
 from app.database.init_db import init_db
+from app.database.config import engine, dispose_async_engines
+from app.database.models import ensure_search_index
+from app.api.services.tmdb_service import tmdb_api
+from app.api.services.import_jobs import import_jobs
+from app.api.services.query_cache import query_cache
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared resources on startup and release them on shutdown."""
+    ensure_search_index(engine)
+    await tmdb_api.startup()
+    await import_jobs.startup()
+    yield
+    await import_jobs.shutdown()
+    await tmdb_api.shutdown()
+    await dispose_async_engines()
+    query_cache.close()
 
 app = FastAPI(
     title="MovieSeek API",
     description="Movie recommendation system API",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -20,6 +39,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include API router
@@ -119,9 +119,13 @@ async def add_custom_movie(tmdb_id, custom_rating=None, custom_votes=None):
 if __name__ == "__main__":
     print("=== Adding Custom Movie ===")
     
-    # New Kids Turbo with custom rating and votes
-    asyncio.run(add_custom_movie(
-        tmdb_id=46523,      # New Kids Turbo
-        custom_rating=9.5,  # Custom rating
-        custom_votes=18051856  # Custom votes
-    )) 
\ No newline at end of file
+    async def main():
+        async with tmdb_api:
+            # New Kids Turbo with custom rating and votes
+            await add_custom_movie(
+                tmdb_id=46523,      # New Kids Turbo
+                custom_rating=9.5,  # Custom rating
+                custom_votes=18051856  # Custom votes
+            )
+    
+    asyncio.run(main()) 
\ No newline at end of file
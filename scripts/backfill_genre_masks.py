@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Recompute movies.genre_mask from the movie_genres links.
+
+Imports and genre changes through the API keep the mask up to date; this
+fills it in for rows written before the column existed, or repairs it after
+movie_genres was edited directly. Movies are updated in ID ranges, one
+transaction per range, and only rows whose mask changes are written.
+
+Usage:
+    python scripts/backfill_genre_masks.py
+    python scripts/backfill_genre_masks.py --chunk-size 50000
+"""
+
+import os
+import sys
+import time
+import argparse
+
+from sqlalchemy import BigInteger, cast, func, literal, select, update
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database.models import Movie, movie_genre, MAX_MASK_GENRE_ID
+from app.database.config import SessionLocal
+
+def genre_mask_subquery(movies):
+    """The OR of the genre bits of each movie, from movie_genres (one row per genre, so SUM equals OR)."""
+    bits = cast(literal(1), BigInteger).op("<<")(movie_genre.c.genre_id - 1)
+    return select(func.coalesce(func.sum(bits), 0)).where(
+        movie_genre.c.movie_id == movies.c.id,
+        movie_genre.c.genre_id.between(1, MAX_MASK_GENRE_ID)
+    ).scalar_subquery()
+
+def backfill_genre_masks(chunk_size: int = 10000):
+    """
+    Recompute the genre mask of every movie.
+
+    Returns:
+        Tuple of (movies checked, masks changed)
+    """
+    movies = Movie.__table__
+    mask = genre_mask_subquery(movies)
+    db = SessionLocal()
+    checked = changed = 0
+    try:
+        max_id = db.query(func.max(Movie.id)).scalar() or 0
+        for start in range(0, max_id, chunk_size):
+            in_range = (movies.c.id > start, movies.c.id <= start + chunk_size)
+            checked += db.query(func.count(Movie.id)).filter(*in_range).scalar()
+            result = db.execute(update(movies).where(*in_range, movies.c.genre_mask != mask).values(genre_mask=mask))
+            changed += result.rowcount
+            db.commit()
+            print(f"Checked {checked} movies up to ID {min(start + chunk_size, max_id)}, {changed} masks changed")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return checked, changed
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute movies.genre_mask from movie_genres")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Movie IDs per transaction (default: 10000)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    checked, changed = backfill_genre_masks(args.chunk_size)
+    print(f"Done: {changed} of {checked} genre masks updated in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Benchmark request latency of the admin JSON routes under concurrent mixed load.
+
+Serves two apps with uvicorn on a seeded benchmark database: "blocking" has
+the previous handlers (``async def`` routes running synchronous
+``Session.query`` calls on the event loop) and "async" has the current
+admin router (AsyncSession queries). Concurrent clients request a mix of
+the heavy ``/admin/api/movies``, the light ``/admin/api/genres`` and a
+``/ping`` route that touches no database, and the latency percentiles per
+route are reported.
+
+Usage:
+    python scripts/bench_async_routes.py --movies 1000 --clients 10 --duration 10
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import multiprocessing
+from contextlib import asynccontextmanager
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+parser = argparse.ArgumentParser(description="Benchmark admin route latency with blocking vs async database access")
+parser.add_argument("--movies", type=int, default=1000, help="Number of synthetic movies (default: 1000)")
+parser.add_argument("--clients", type=int, default=10, help="Concurrent clients (default: 10)")
+parser.add_argument("--duration", type=float, default=10.0, help="Seconds per app (default: 10)")
+parser.add_argument("--heavy-share", type=float, default=0.1, help="Share of requests to /admin/api/movies (default: 0.1)")
+parser.add_argument("--port", type=int, default=8091, help="Port to serve the apps on (default: 8091)")
+parser.add_argument("--database", default="sqlite:///./bench_async_routes.db",
+                    help="Database URL; its tables are dropped first (default: sqlite:///./bench_async_routes.db)")
+args = parser.parse_args()
+
+# The app reads the database URL at import time
+os.environ["DATABASE_URL"] = args.database
+
+import httpx
+import uvicorn
+from fastapi import APIRouter, Depends, FastAPI
+from sqlalchemy.orm import Session
+
+from app.database.models import Base, Movie, Genre
+from app.database.config import engine, SessionLocal, get_db, dispose_async_engines
+from app.database.bulk_writer import MovieBulkWriter
+from app.database.tmdb_mapping import movie_row_from_details, get_genre_names
+from app.tmdb_standin import FixtureStore, TMDB_GENRES
+
+def seed_database(count):
+    """Recreate the tables and write ``count`` synthetic movies with their genres."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.add_all([Genre(name=genre["name"]) for genre in TMDB_GENRES])
+        db.commit()
+        genre_map = {genre.name: genre.id for genre in db.query(Genre)}
+        unique = {}
+        for details in FixtureStore.generate(count).movies.values():
+            unique.setdefault(movie_row_from_details(details, details)["identifier"], details)
+        rows = [movie_row_from_details(details, details) for details in unique.values()]
+        genre_ids = {
+            row["identifier"]: [genre_map[name] for name in get_genre_names(details) if name in genre_map]
+            for row, details in zip(rows, unique.values())
+        }
+        MovieBulkWriter(db).write(rows, genre_ids)
+    # Don't hand pooled connections to the forked server processes
+    engine.dispose()
+    return len(rows)
+
+def blocking_router():
+    """The admin JSON routes as they were: synchronous queries inside ``async def`` handlers."""
+    router = APIRouter(prefix="/admin")
+
+    @router.get("/api/movies")
+    async def get_movies(db: Session = Depends(get_db)):
+        movies = db.query(Movie).all()
+        return [
+            {
+                "id": movie.id,
+                "identifier": movie.identifier,
+                "title": movie.title,
+                "year": movie.year,
+                "director": movie.director,
+                "runtime": movie.runtime,
+                "rating": float(movie.rating) if movie.rating else None,
+                "votes": movie.votes,
+                "tmdb_id": movie.tmdb_id,
+                "imdb_id": movie.imdb_id,
+                "language": movie.language,
+                "genres": [genre.name for genre in movie.genres],
+                "created_at": movie.created_at.isoformat() if movie.created_at else None,
+                "updated_at": movie.updated_at.isoformat() if movie.updated_at else None,
+            }
+            for movie in movies
+        ]
+
+    @router.get("/api/genres")
+    async def get_genres(db: Session = Depends(get_db)):
+        return [{"id": genre.id, "name": genre.name} for genre in db.query(Genre).all()]
+
+    return router
+
+def serve(mode, port):
+    """Run one variant of the app with uvicorn (in a child process)."""
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await dispose_async_engines()
+
+    app = FastAPI(lifespan=lifespan)
+    if mode == "blocking":
+        app.include_router(blocking_router())
+    else:
+        from app.admin import admin_router
+        app.include_router(admin_router)
+
+    @app.get("/ping")
+    async def ping():
+        return {}
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+async def wait_until_up(base_url):
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(100):
+            try:
+                await client.get("/ping")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+async def run_load(base_url, clients, duration, heavy_share):
+    """Send mixed requests from ``clients`` concurrent clients; returns latencies per route."""
+    routes = ["/admin/api/movies", "/admin/api/genres", "/ping"]
+    light_share = (1 - heavy_share) / 2
+    latencies = {route: [] for route in routes}
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client_loop(client):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            route = random.choices(routes, weights=[heavy_share, light_share, light_share])[0]
+            started = time.perf_counter()
+            response = await client.get(route)
+            if response.status_code != 200:
+                errors += 1
+                continue
+            latencies[route].append(time.perf_counter() - started)
+
+    limits = httpx.Limits(max_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await asyncio.gather(*[client_loop(client) for _ in range(clients)])
+    return latencies, errors
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+def main():
+    movies = seed_database(args.movies)
+    print(f"Movies: {movies}, clients: {args.clients}, {args.duration:.0f}s per app, "
+          f"{args.heavy_share:.0%} of requests to /admin/api/movies")
+
+    for mode in ("blocking", "async"):
+        server = multiprocessing.Process(target=serve, args=(mode, args.port))
+        server.start()
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            asyncio.run(wait_until_up(base_url))
+            latencies, errors = asyncio.run(run_load(base_url, args.clients, args.duration, args.heavy_share))
+        finally:
+            server.terminate()
+            server.join()
+
+        total = sum(len(values) for values in latencies.values())
+        print(f"{mode}: {total / args.duration:,.0f} requests/s, {errors} errors")
+        for route, values in latencies.items():
+            print(f"  {route:<18} n={len(values):<6} p50 {percentile(values, 0.50) * 1000:7.1f}ms  "
+                  f"p99 {percentile(values, 0.99) * 1000:7.1f}ms")
+
+if __name__ == "__main__":
+    main()
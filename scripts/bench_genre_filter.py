@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark genre filters on the movie list: genre_mask bit tests vs joins.
+
+Fills a benchmark database with synthetic movies that have 1-3 of the TMDb
+genres (common ones like Drama far more often than Western), then times a
+page of the movie list filtered by genre through ``movie_list_query`` (bit
+tests on ``movies.genre_mask``) and through the previous join of
+``movie_genres`` and ``genres``, for any-of and all-of filters.
+
+Usage:
+    python scripts/bench_genre_filter.py --movies 200000
+    python scripts/bench_genre_filter.py --movies 200000 --reuse   # skip seeding an existing benchmark database
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+parser = argparse.ArgumentParser(description="Benchmark genre bitmask filters against joins")
+parser.add_argument("--movies", type=int, default=200000, help="Number of synthetic movies (default: 200000)")
+parser.add_argument("--queries", type=int, default=50, help="Queries per filter and method (default: 50)")
+parser.add_argument("--max-offset", type=int, default=500, help="Pages start at a random offset up to this (default: 500)")
+parser.add_argument("--reuse", action="store_true", help="Reuse the movies already in the benchmark database")
+parser.add_argument("--database", default="sqlite:///./bench_genre_filter.db",
+                    help="Database URL; its tables are dropped first unless --reuse (default: sqlite:///./bench_genre_filter.db)")
+args = parser.parse_args()
+
+# The app reads the database URL at import time
+os.environ["DATABASE_URL"] = args.database
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import joinedload
+
+from app.database.models import Base, Movie, Genre, movie_genre, genre_mask
+from app.database.config import engine, SessionLocal
+from app.api.services.movie_service import movie_list_query
+from app.tmdb_standin import TMDB_GENRES
+
+# Relative frequency of each genre in the synthetic catalog
+GENRE_WEIGHTS = {"Drama": 30, "Comedy": 20, "Thriller": 12, "Action": 12, "Romance": 8, "Horror": 6,
+                 "Crime": 6, "Documentary": 5, "Adventure": 5, "Science Fiction": 4, "Family": 3, "Mystery": 3,
+                 "Fantasy": 3, "Animation": 3, "Music": 2, "History": 2, "TV Movie": 2, "War": 1, "Western": 1}
+
+FILTERS = [
+    ("any", ["Drama"]),
+    ("any", ["War", "Western"]),
+    ("all", ["Action", "Comedy"]),
+    ("all", ["Horror", "Western"]),
+]
+
+def seed_database(count, rng):
+    """Recreate the tables and insert ``count`` synthetic movies with their genre links and masks."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        connection.execute(insert(Genre.__table__), [{"name": genre["name"]} for genre in TMDB_GENRES])
+        genre_ids = {name: genre_id for genre_id, name in connection.execute(Genre.__table__.select())}
+        names = list(GENRE_WEIGHTS)
+        weights = list(GENRE_WEIGHTS.values())
+        for start in range(0, count, 10000):
+            movies, links = [], []
+            for i in range(start + 1, min(start + 10000, count) + 1):
+                ids = {genre_ids[name] for name in rng.choices(names, weights, k=rng.randint(1, 3))}
+                movies.append({
+                    "id": i,
+                    "identifier": f"Movie {i}",
+                    "title": f"Movie {i}",
+                    "year": rng.randint(1920, 2025),
+                    "rating": round(rng.uniform(1, 10), 1),
+                    "votes": rng.randint(0, 20000),
+                    "tmdb_id": i,
+                    "genre_mask": genre_mask(ids)
+                })
+                links += [{"movie_id": i, "genre_id": genre_id} for genre_id in ids]
+            connection.execute(insert(Movie.__table__), movies)
+            connection.execute(insert(movie_genre), links)
+    print(f"Seeded {count} movies in {time.perf_counter() - started:.1f}s")
+
+def join_query(db, match, names):
+    """The genre filter as it was: a join on movie_genres and genres."""
+    query = db.query(Movie).options(joinedload(Movie.genres))
+    if match == "any":
+        return query.join(Movie.genres).filter(Genre.name.in_(names)).order_by(Movie.rating.desc(), Movie.id.desc())
+    # All-of needs a grouped subquery per page
+    having_all = db.query(movie_genre.c.movie_id).join(Genre, Genre.id == movie_genre.c.genre_id).filter(
+        Genre.name.in_(names)
+    ).group_by(movie_genre.c.movie_id).having(func.count() == len(names))
+    return query.filter(Movie.id.in_(having_all)).order_by(Movie.rating.desc(), Movie.id.desc())
+
+def mask_query(db, match, names):
+    if match == "any":
+        return movie_list_query(db, genres=names)
+    return movie_list_query(db, genres_all=names)
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+def main():
+    rng = random.Random(42)
+    if not args.reuse:
+        seed_database(args.movies, rng)
+
+    db = SessionLocal()
+    try:
+        movies = db.query(func.count(Movie.id)).scalar()
+        print(f"Movies: {movies}, {args.queries} pages of 20 per filter, offsets 0-{args.max_offset}")
+        offsets = [rng.randint(0, args.max_offset) for _ in range(args.queries)]
+        for match, names in FILTERS:
+            results = {}
+            for name, build in (("join", join_query), ("bitmask", mask_query)):
+                build(db, match, names).limit(20).all()  # warm up
+                latencies = []
+                for offset in offsets:
+                    started = time.perf_counter()
+                    page = build(db, match, names).offset(offset).limit(20).all()
+                    latencies.append(time.perf_counter() - started)
+                    db.expunge_all()
+                results[name] = latencies
+            print(f"{match}-of {', '.join(names):<17} "
+                  + "  ".join(f"{name}: p50 {percentile(values, 0.5) * 1000:7.2f}ms p95 {percentile(values, 0.95) * 1000:7.2f}ms"
+                              for name, values in results.items()))
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark movie import throughput end-to-end against the offline TMDb stand-in.
+
+By default the stand-in runs in-process through an ASGI transport, so the
+benchmark needs neither network access nor TMDb credentials. Each run starts
+from an empty benchmark database and the TMDb response cache is disabled.
+
+Usage:
+    python scripts/bench_import.py --mode popular --pages 10 --latency-ms 50 --jitter-ms 30
+    python scripts/bench_import.py --mode top_voted --count 1000 --throttle-rate 0.01
+    python scripts/bench_import.py --base-url http://127.0.0.1:8001  # external stand-in
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark imports against the offline TMDb stand-in")
+    parser.add_argument("--mode", choices=["popular", "top_rated", "search", "top_voted"], default="popular",
+                        help="Import entry point to benchmark (default: popular)")
+    parser.add_argument("--pages", type=int, default=10, help="List pages to import (default: 10)")
+    parser.add_argument("--count", type=int, default=1000, help="Movies to import in top_voted mode (default: 1000)")
+    parser.add_argument("--query", default="the", help="Search query in search mode (default: 'the')")
+    parser.add_argument("--movies", type=int, default=5000, help="Size of the synthetic catalog (default: 5000)")
+    parser.add_argument("--fixtures", help="Fixture file to serve instead of a synthetic catalog")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for synthetic data and fault injection")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Stand-in base latency in ms")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Stand-in random extra latency in ms")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of stand-in responses failing with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0, help="Fraction of stand-in responses failing with 429")
+    parser.add_argument("--rate", type=float, default=1000, help="TMDb client requests/second budget (default: 1000)")
+    parser.add_argument("--base-url", help="Use an already running stand-in at this URL instead of in-process")
+    parser.add_argument("--database", default="sqlite:///./bench_import.db",
+                        help="Database URL to import into; it is emptied first (default: sqlite:///./bench_import.db)")
+    return parser.parse_args()
+
+args = parse_args()
+
+# The app reads these settings at import time
+os.environ["DATABASE_URL"] = args.database
+os.environ["TMDB_CACHE_ENABLED"] = "false"
+os.environ["TMDB_RATE_LIMIT"] = str(args.rate)
+os.environ["TMDB_RATE_LIMIT_PATH"] = ""
+os.environ.setdefault("TMDB_API_KEY", "standin")
+os.environ.setdefault("TMDB_ACCESS_TOKEN", "standin")
+
+import httpx
+
+from app.database.models import Base, Movie
+from app.database.config import engine, get_db
+from app.database.import_movies import (
+    fetch_and_store_genres,
+    import_popular_movies,
+    import_top_rated_movies,
+    search_and_import_movies
+)
+from app.api.services.tmdb_service import tmdb_api
+from app.tmdb_standin import FixtureStore, create_app
+
+# Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+async def run_benchmark():
+    standin = None
+    if args.base_url:
+        tmdb_api.BASE_URL = args.base_url.rstrip("/")
+    else:
+        store = FixtureStore.load(args.fixtures) if args.fixtures else FixtureStore.generate(args.movies, args.seed)
+        standin = create_app(
+            store,
+            latency=args.latency_ms / 1000,
+            jitter=args.jitter_ms / 1000,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            seed=args.seed
+        )
+        tmdb_api.BASE_URL = "http://tmdb-standin"
+        tmdb_api.transport = httpx.ASGITransport(app=standin)
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    db = next(get_db())
+    try:
+        async with tmdb_api:
+            await fetch_and_store_genres(db)
+
+            start = time.perf_counter()
+            if args.mode == "popular":
+                await import_popular_movies(db, page_count=args.pages)
+            elif args.mode == "top_rated":
+                await import_top_rated_movies(db, page_count=args.pages)
+            elif args.mode == "search":
+                await search_and_import_movies(db, args.query, page_count=args.pages)
+            else:
+                from import_top_voted import import_top_voted_movies
+                await import_top_voted_movies(db, count=args.count)
+            elapsed = time.perf_counter() - start
+
+            imported = db.query(Movie).count()
+            print(f"Mode:          {args.mode}")
+            print(f"Imported:      {imported} movies in {elapsed:.2f}s")
+            print(f"Throughput:    {imported / elapsed if elapsed else 0:.1f} movies/s")
+            print(f"TMDb client:   {tmdb_api.format_stats()}")
+            if standin is not None:
+                print(f"Stand-in:      {standin.state.stats}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
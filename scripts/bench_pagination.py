@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark movie list pages: cursor (keyset) pagination vs offset pagination.
+
+Fills a benchmark database with synthetic movies (ratings and vote counts
+with many ties, some missing), then times page 1 and a deep page (page
+5,000 by default) of ``/api/movies`` in every sort order; the deep page is
+fetched with ``offset`` and with the cursor the previous page returns.
+
+Usage:
+    python scripts/bench_pagination.py --movies 200000
+    python scripts/bench_pagination.py --movies 200000 --reuse   # skip seeding an existing benchmark database
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+parser = argparse.ArgumentParser(description="Benchmark cursor vs offset pagination of the movie list")
+parser.add_argument("--movies", type=int, default=200000, help="Number of synthetic movies (default: 200000)")
+parser.add_argument("--page", type=int, default=5000, help="Deep page to time (default: 5000)")
+parser.add_argument("--page-size", type=int, default=20, help="Movies per page (default: 20)")
+parser.add_argument("--repeat", type=int, default=20, help="Timed fetches per page (default: 20)")
+parser.add_argument("--reuse", action="store_true", help="Reuse the movies already in the benchmark database")
+parser.add_argument("--database", default="sqlite:///./bench_pagination.db",
+                    help="Database URL; its tables are dropped first unless --reuse (default: sqlite:///./bench_pagination.db)")
+args = parser.parse_args()
+
+# The app reads the database URL at import time
+os.environ["DATABASE_URL"] = args.database
+
+from sqlalchemy import func, insert
+
+from app.database.models import Base, Movie
+from app.database.config import engine, SessionLocal
+from app.api.services.movie_service import MOVIE_SORTS, movie_list_query, movie_page, encode_cursor, decode_cursor
+
+def seed_database(count, rng):
+    """Recreate the tables and insert ``count`` synthetic movies in chunks."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    words = ["Night", "City", "Love", "Last", "Dark", "Summer", "Road", "House", "Blue", "King", "Star", "River"]
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        for start in range(0, count, 10000):
+            rows = []
+            for i in range(start + 1, min(start + 10000, count) + 1):
+                rows.append({
+                    "identifier": f"Movie {i}",
+                    "title": f"{rng.choice(words)} {rng.choice(words)} {i}",
+                    "year": rng.randint(1920, 2025),
+                    "rating": None if rng.random() < 0.05 else round(rng.uniform(1, 10), 1),
+                    "votes": None if rng.random() < 0.05 else int(rng.paretovariate(1.2) * 10),
+                    "tmdb_id": i
+                })
+            connection.execute(insert(Movie.__table__), rows)
+    print(f"Seeded {count} movies in {time.perf_counter() - started:.1f}s")
+
+def median_ms(fetch, repeat):
+    fetch()  # warm up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fetch()
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)[len(timings) // 2] * 1000
+
+def main():
+    rng = random.Random(42)
+    if not args.reuse:
+        seed_database(args.movies, rng)
+
+    size = args.page_size
+    db = SessionLocal()
+    try:
+        movies = db.query(func.count(Movie.id)).scalar()
+        deep_offset = (args.page - 1) * size
+        if deep_offset >= movies:
+            print(f"Page {args.page} needs more than {movies} movies; use --movies {deep_offset + size} or more")
+            return
+        print(f"Movies: {movies}, {size} per page, page 1 vs page {args.page} (offset {deep_offset}), median of {args.repeat}")
+
+        for sort in MOVIE_SORTS:
+            query = movie_list_query(db, sort=sort)
+            # The cursor a client holds after reading the page before: the position of its last movie
+            previous = query.offset(deep_offset - 1).limit(1).one()
+            after = decode_cursor(sort, encode_cursor(sort, previous))
+            assert [m.id for m in movie_page(query, sort, after, size)] == [m.id for m in query.offset(deep_offset).limit(size)]
+
+            first = median_ms(lambda: query.limit(size).all(), args.repeat)
+            offset_deep = median_ms(lambda: query.offset(deep_offset).limit(size).all(), args.repeat)
+            cursor_deep = median_ms(lambda: movie_page(query, sort, after, size), args.repeat)
+            print(f"{sort:>7}  page 1 {first:5.2f}ms   page {args.page}: by cursor {cursor_deep:5.2f}ms, "
+                  f"by offset {offset_deep:7.2f}ms")
+            db.expunge_all()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark the movie list's serialization: ORM objects + jsonable_encoder vs row tuples + orjson.
+
+Fills a benchmark database with synthetic movies (1-3 genres each), then
+builds pages of the movie list response body both ways and reports the cost
+per movie: loading the page (query, rows or ORM objects and their genres)
+and encoding it to JSON, separately and together. "before" is how the route
+used to respond (``Movie`` objects through ``jsonable_encoder`` and
+``JSONResponse``), "after" is ``movie_responses`` and ``ORJSONResponse``,
+optionally with only some fields (``--fields card``).
+
+Usage:
+    python scripts/bench_serialization.py --movies 50000
+    python scripts/bench_serialization.py --movies 50000 --reuse   # skip seeding an existing benchmark database
+    python scripts/bench_serialization.py --reuse --fields card
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+parser = argparse.ArgumentParser(description="Benchmark movie list serialization, ORM + jsonable_encoder vs rows + orjson")
+parser.add_argument("--movies", type=int, default=50000, help="Number of synthetic movies (default: 50000)")
+parser.add_argument("--page-size", type=int, default=100, help="Movies per page (default: 100)")
+parser.add_argument("--pages", type=int, default=50, help="Pages built per method (default: 50)")
+parser.add_argument("--fields", help="Response fields of the new path, e.g. card (default: all)")
+parser.add_argument("--reuse", action="store_true", help="Reuse the movies already in the benchmark database")
+parser.add_argument("--database", default="sqlite:///./bench_serialization.db",
+                    help="Database URL; its tables are dropped first unless --reuse (default: sqlite:///./bench_serialization.db)")
+args = parser.parse_args()
+
+# The app reads the database URL at import time
+os.environ["DATABASE_URL"] = args.database
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import func, insert
+
+from app.database.models import Base, Movie, Genre, movie_genre, genre_mask
+from app.database.config import engine, SessionLocal
+from app.api.services.movie_service import movie_list_query, movie_responses, movie_columns, parse_movie_fields
+from app.tmdb_standin import TMDB_GENRES
+
+def seed_database(count, rng):
+    """Recreate the tables and insert ``count`` synthetic movies with their genre links."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        connection.execute(insert(Genre.__table__), [{"name": genre["name"]} for genre in TMDB_GENRES])
+        genre_ids = [genre_id for genre_id, _ in connection.execute(Genre.__table__.select())]
+        for start in range(0, count, 10000):
+            movies, links = [], []
+            for i in range(start + 1, min(start + 10000, count) + 1):
+                ids = rng.sample(genre_ids, rng.randint(1, 3))
+                movies.append({
+                    "id": i,
+                    "identifier": f"Movie {i} ({1920 + i % 100})",
+                    "title": f"Movie {i}",
+                    "year": 1920 + i % 100,
+                    "director": f"Director {i % 5000}",
+                    "runtime": rng.randint(70, 200),
+                    "rating": round(rng.uniform(1, 10), 1),
+                    "votes": rng.randint(0, 20000),
+                    "tmdb_id": i,
+                    "imdb_id": f"tt{i:07d}",
+                    "language": rng.choice(["en", "fr", "ko", "ja"]),
+                    "poster_path": f"/poster{i}.jpg",
+                    "backdrop_path": f"/backdrop{i}.jpg",
+                    "genre_mask": genre_mask(ids)
+                })
+                links += [{"movie_id": i, "genre_id": genre_id} for genre_id in ids]
+            connection.execute(insert(Movie.__table__), movies)
+            connection.execute(insert(movie_genre), links)
+    print(f"Seeded {count} movies in {time.perf_counter() - started:.1f}s")
+
+def load_before(db, offset):
+    return movie_list_query(db).offset(offset).limit(args.page_size).all()
+
+def encode_before(movies):
+    return JSONResponse(content=jsonable_encoder(movies)).body
+
+FIELDS = parse_movie_fields(args.fields)
+
+def load_after(db, offset):
+    rows = movie_list_query(db, columns=movie_columns(FIELDS, extra=["rating"])).offset(offset).limit(args.page_size).all()
+    return movie_responses(db, rows, FIELDS)
+
+def encode_after(movies):
+    return ORJSONResponse(content=movies).body
+
+def main():
+    rng = random.Random(42)
+    if not args.reuse:
+        seed_database(args.movies, rng)
+
+    db = SessionLocal()
+    try:
+        movies = db.query(func.count(Movie.id)).scalar()
+        # Consecutive pages from the start; deep offsets would time the OFFSET scan, the same for both
+        offsets = [page * args.page_size for page in range(args.pages) if page * args.page_size < movies]
+        print(f"Movies: {movies}, {args.pages} pages of {args.page_size}; microseconds per movie (median page)")
+
+        results = {}
+        for name, load, encode in (("before", load_before, encode_before), ("after", load_after, encode_after)):
+            encode(load(db, 0))  # warm up
+            db.expunge_all()
+            timings = {"load": [], "encode": [], "total": []}
+            size = 0
+            for offset in offsets:
+                started = time.perf_counter()
+                page = load(db, offset)
+                loaded = time.perf_counter()
+                body = encode(page)
+                done = time.perf_counter()
+                timings["load"].append(loaded - started)
+                timings["encode"].append(done - loaded)
+                timings["total"].append(done - started)
+                size += len(body)
+                db.expunge_all()
+            results[name] = {
+                part: sorted(values)[len(values) // 2] * 1e6 / args.page_size for part, values in timings.items()
+            }
+            print(f"{name:>6}: load {results[name]['load']:6.1f}us  encode {results[name]['encode']:6.1f}us  "
+                  f"total {results[name]['total']:6.1f}us  ({size / len(offsets) / 1024:.1f} KiB per page)")
+
+        before, after = results["before"], results["after"]
+        print(f"speedup: load {before['load'] / after['load']:.1f}x, encode {before['encode'] / after['encode']:.1f}x, "
+              f"total {before['total'] / after['total']:.1f}x")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/movies style reads while an import writes to the same SQLite database.
+
+Runs the same workload twice on a fresh database file: once with SQLite's
+defaults (rollback journal, no mmap) and once with the tuned profile from
+``app.database.config`` (WAL, synchronous=NORMAL, mmap, cache, busy_timeout)
+and split read/write engines. A writer process upserts batches of movies
+through MovieBulkWriter while reader processes run the movie list query, and
+the reader latency percentiles and writer rows/second are reported.
+
+Usage:
+    python scripts/bench_sqlite_contention.py --movies 20000 --readers 4 --duration 10
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import multiprocessing
+
+from sqlalchemy.orm import Session, joinedload
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database.models import Base, Movie, Genre
+from app.database.config import create_db_engine, sqlite_pragmas
+from app.database.bulk_writer import MovieBulkWriter
+from app.database.tmdb_mapping import movie_row_from_details, get_genre_names
+from app.tmdb_standin import FixtureStore, TMDB_GENRES
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+def remove_database(path):
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+def build_batches(payloads, batch_size, genre_map):
+    """Precompute the writer's rows so the benchmark measures the database, not the mapping."""
+    batches = []
+    for i in range(0, len(payloads), batch_size):
+        batch = payloads[i:i + batch_size]
+        rows = [movie_row_from_details(details, details) for details in batch]
+        genre_ids = {
+            row["identifier"]: [genre_map[name] for name in get_genre_names(details) if name in genre_map]
+            for row, details in zip(rows, batch)
+        }
+        batches.append((rows, genre_ids))
+    return batches
+
+def write_loop(url, tuned, batches, stop, results):
+    """Upsert the batches over and over with new ratings until stopped."""
+    engine = create_db_engine(url, tuned=tuned)
+    rows_written = errors = 0
+    with Session(engine) as db:
+        writer = MovieBulkWriter(db)
+        while not stop.is_set():
+            for rows, genre_ids in batches:
+                if stop.is_set():
+                    break
+                for row in rows:
+                    row["rating"] = round(random.uniform(1, 10), 1)
+                try:
+                    writer.write(rows, genre_ids)
+                    rows_written += len(rows)
+                except Exception:
+                    errors += 1
+    engine.dispose()
+    results.put(("writer", rows_written, errors))
+
+def read_loop(url, tuned, stop, results):
+    """Run the movie list query until stopped, recording each latency."""
+    engine = create_db_engine(url, read_only=True, tuned=tuned, pool_size=1)
+    latencies = []
+    errors = 0
+    with Session(engine) as db:
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                db.query(Movie).options(joinedload(Movie.genres)).filter(
+                    Movie.rating >= random.choice([0, 5, 7])
+                ).order_by(Movie.rating.desc()).offset(random.randint(0, 500)).limit(20).all()
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                errors += 1
+            db.rollback()
+    engine.dispose()
+    results.put(("reader", latencies, errors))
+
+def run_profile(path, tuned, payloads, readers, duration, batch_size):
+    """Seed a fresh database, then run the writer and reader processes for ``duration`` seconds."""
+    remove_database(path)
+    url = f"sqlite:///{path}"
+    engine = create_db_engine(url, tuned=tuned)
+
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.add_all([Genre(name=genre["name"]) for genre in TMDB_GENRES])
+        db.commit()
+        genre_map = {genre.name: genre.id for genre in db.query(Genre)}
+        batches = build_batches(payloads, batch_size, genre_map)
+        writer = MovieBulkWriter(db)
+        for rows, genre_ids in batches:
+            writer.write(rows, genre_ids)
+        journal_mode = db.connection().exec_driver_sql("PRAGMA journal_mode").scalar()
+    engine.dispose()
+
+    # Separate processes, so the GIL doesn't serialize the readers behind the writer
+    stop = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=write_loop, args=(url, tuned, batches, stop, results))]
+    processes += [multiprocessing.Process(target=read_loop, args=(url, tuned, stop, results)) for _ in range(readers)]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    time.sleep(duration)
+    stop.set()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = []
+    read_errors = 0
+    write_rows = write_errors = 0
+    for role, values, errors in collected:
+        if role == "writer":
+            write_rows, write_errors = values, errors
+        else:
+            latencies.extend(values)
+            read_errors += errors
+
+    remove_database(path)
+    return {
+        "journal_mode": journal_mode,
+        "reads": len(latencies),
+        "reads_per_s": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+        "read_errors": read_errors,
+        "write_rows_per_s": write_rows / elapsed,
+        "write_errors": write_errors
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite read latency under a concurrent import")
+    parser.add_argument("--movies", type=int, default=20000, help="Number of synthetic movies (default: 20000)")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent reader processes (default: 4)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per profile (default: 10)")
+    parser.add_argument("--batch-size", type=int, default=200, help="Movies per write transaction (default: 200)")
+    parser.add_argument("--database", default="./bench_sqlite_contention.db",
+                        help="Database file; it is deleted before and after each run (default: ./bench_sqlite_contention.db)")
+    args = parser.parse_args()
+
+    # Synthetic titles can repeat; keep one payload per identifier
+    unique = {}
+    for details in FixtureStore.generate(args.movies).movies.values():
+        unique.setdefault(movie_row_from_details(details, details)["identifier"], details)
+    payloads = list(unique.values())
+
+    print(f"Movies: {len(payloads)}, readers: {args.readers}, {args.duration:.0f}s per profile")
+    print(f"Tuned pragmas: {sqlite_pragmas()}")
+    for name, tuned in (("default", False), ("tuned", True)):
+        result = run_profile(args.database, tuned, payloads, args.readers, args.duration, args.batch_size)
+        print(f"{name:>8} ({result['journal_mode']}): {result['reads_per_s']:,.0f} reads/s, "
+              f"p50 {result['p50_ms']:.1f}ms, p95 {result['p95_ms']:.1f}ms, p99 {result['p99_ms']:.1f}ms, "
+              f"max {result['max_ms']:.0f}ms, {result['read_errors']} read errors; "
+              f"writer {result['write_rows_per_s']:,.0f} rows/s, {result['write_errors']} write errors")
+
+if __name__ == "__main__":
+    main()
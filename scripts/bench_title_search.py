@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark movie title search: full-text index vs ILIKE substring scans.
+
+Fills a benchmark database with a synthetic catalog (titles drawn from a
+Zipf-distributed vocabulary, so a few words are very common and most are
+rare, like real titles), then times keystroke-style prefix queries such as
+"silver dra" through ``search_movies`` and through the previous
+``title ILIKE '%term%'`` filter.
+
+Usage:
+    python scripts/bench_title_search.py --movies 500000
+    python scripts/bench_title_search.py --movies 500000 --reuse   # skip seeding an existing benchmark database
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import itertools
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+parser = argparse.ArgumentParser(description="Benchmark full-text title search")
+parser.add_argument("--movies", type=int, default=500000, help="Number of synthetic movies (default: 500000)")
+parser.add_argument("--queries", type=int, default=500, help="Number of search queries per method (default: 500)")
+parser.add_argument("--vocabulary", type=int, default=20000, help="Distinct title words (default: 20000)")
+parser.add_argument("--reuse", action="store_true", help="Reuse the movies already in the benchmark database")
+parser.add_argument("--database", default="sqlite:///./bench_title_search.db",
+                    help="Database URL; its tables are dropped first unless --reuse (default: sqlite:///./bench_title_search.db)")
+args = parser.parse_args()
+
+# The app reads the database URL at import time
+os.environ["DATABASE_URL"] = args.database
+
+from sqlalchemy import func, insert
+
+from app.database.models import Base, Movie
+from app.database.config import engine, SessionLocal
+from app.api.services.movie_service import search_movies
+
+SYLLABLES = ["ka", "ri", "mo", "sen", "ta", "lo", "vi", "dra", "nor", "el", "zu", "pha", "gor", "an", "tes",
+             "mi", "ron", "sil", "ver", "qua", "bel", "do", "rin", "ash", "tor", "ven", "yu", "lee", "ca", "sto"]
+
+def make_vocabulary(rng, size):
+    """Distinct pseudo-words of 2-4 syllables, most common first."""
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize())
+    return sorted(words, key=lambda word: rng.random())
+
+def seed_database(count, vocabulary_size, rng):
+    """Recreate the tables and insert ``count`` synthetic movies in chunks."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    vocabulary = make_vocabulary(rng, vocabulary_size)
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    directors = [f"{rng.choice(vocabulary)} {rng.choice(vocabulary)}" for _ in range(5000)]
+
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        for start in range(0, count, 10000):
+            rows = []
+            for i in range(start, min(start + 10000, count)):
+                title = " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(1, 4)))
+                year = rng.randint(1920, 2025)
+                rows.append({
+                    "identifier": f"{title} ({year}) #{i}",
+                    "title": title,
+                    "year": year,
+                    "director": rng.choice(directors),
+                    "votes": int(rng.paretovariate(1.2) * 10),
+                    "tmdb_id": i + 1
+                })
+            connection.execute(insert(Movie.__table__), rows)
+    print(f"Seeded {count} movies in {time.perf_counter() - started:.1f}s (full-text index maintained by triggers)")
+
+def make_queries(db, count, rng):
+    """Keystroke-style queries: the leading words of real titles, the last one cut short."""
+    max_id = db.query(func.max(Movie.id)).scalar()
+    queries = []
+    while len(queries) < count:
+        movie = db.get(Movie, rng.randint(1, max_id))
+        if movie is None:
+            continue
+        words = movie.title.split()[:rng.randint(1, 2)]
+        words[-1] = words[-1][:rng.randint(3, max(3, len(words[-1])))]
+        queries.append(" ".join(words))
+        db.expunge(movie)
+    return queries
+
+def time_queries(run, queries):
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        run(query)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return {
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p95": latencies[int(len(latencies) * 0.95)] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99)] * 1000
+    }
+
+def main():
+    rng = random.Random(42)
+    if not args.reuse:
+        seed_database(args.movies, args.vocabulary, rng)
+
+    db = SessionLocal()
+    try:
+        queries = make_queries(db, args.queries, rng)
+        movies = db.query(func.count(Movie.id)).scalar()
+        print(f"Movies: {movies}, queries: {len(queries)} (e.g. {', '.join(repr(q) for q in queries[:4])})")
+
+        def ilike_search(query):
+            return db.query(Movie).filter(Movie.title.ilike(f"%{query}%")).order_by(Movie.votes.desc()).limit(20).all()
+
+        for name, run in (("ILIKE scan", ilike_search), ("full-text", lambda query: search_movies(db, query, 20))):
+            run(queries[0])  # warm up
+            stats = time_queries(run, queries)
+            print(f"{name:>11}: p50 {stats['p50']:.2f}ms, p95 {stats['p95']:.2f}ms, p99 {stats['p99']:.2f}ms")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Check that the hot movie queries are served by an index.
+
+Builds each query the way the API does, asks the database for its plan
+(``EXPLAIN QUERY PLAN`` on SQLite, ``EXPLAIN`` on PostgreSQL) and checks
+that the plan reads the expected index. Exits non-zero if any query would
+scan instead, e.g. on a database that is missing the index migrations
+(``alembic -c app/database/migrations/alembic.ini upgrade head``).
+
+Usage:
+    python scripts/check_query_plans.py
+    python scripts/check_query_plans.py --database sqlite:///./movieseek.db --verbose
+"""
+
+import os
+import sys
+import argparse
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+parser = argparse.ArgumentParser(description="Check that the hot movie queries use an index")
+parser.add_argument("--database", help="Database URL (default: DATABASE_URL)")
+parser.add_argument("--verbose", action="store_true", help="Print every query plan")
+args = parser.parse_args()
+
+# The app reads the database URL at import time
+if args.database:
+    os.environ["DATABASE_URL"] = args.database
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app.database.models import Movie, movie_genre
+from app.database.config import SessionLocal
+from app.api.services.movie_service import movie_list_query, cursor_ranges
+
+# (description, query builder, index the plan must use, or a tuple of acceptable ones)
+CHECKS = [
+    ("movie list, best rated first",
+     lambda db: movie_list_query(db).offset(100).limit(20), "idx_movies_rating_id"),
+    ("movie list, minimum rating",
+     lambda db: movie_list_query(db, rating_from=7.5).limit(20), "idx_movies_rating_id"),
+    ("movie list, one year",
+     lambda db: movie_list_query(db, year_from=1994, year_to=1994).limit(20), "idx_movies_year_rating"),
+    ("movie list, year range",
+     lambda db: movie_list_query(db, year_from=1990, year_to=1999).limit(20), ("idx_movies_year_rating", "idx_movies_year_id")),
+    ("movie list, title filter",
+     lambda db: movie_list_query(db, title="star").limit(20), ("movies_fts_title", "idx_movies_title_trgm")),
+    # Genre filters test movies.genre_mask bits while reading in rating order
+    ("movie list, any of two genres",
+     lambda db: movie_list_query(db, genres=["Drama", "Comedy"]).limit(20), "idx_movies_rating_id"),
+    ("movie list, all of two genres",
+     lambda db: movie_list_query(db, genres_all=["Drama", "Comedy"]).limit(20), "idx_movies_rating_id"),
+    ("movies of a genre",
+     lambda db: db.query(movie_genre.c.movie_id).filter(movie_genre.c.genre_id == 18), "idx_movie_genres_genre_movie"),
+    # Cursor pages seek to their position in the sort order's index: the rest of the tie group, then past it
+    *[(f"cursor page, sorted by {sort}{' (past ties)' if run else ''}",
+       lambda db, sort=sort, after=after, run=run: movie_list_query(db, sort=sort).filter(
+           *cursor_ranges(db, sort, after)[run]).limit(20),
+       index)
+      for sort, after, index in (("rating", (7.5, 5000), "idx_movies_rating_id"), ("votes", (1000, 5000), "idx_movies_votes_id"),
+                                 ("year", (1994, 5000), "idx_movies_year_id"), ("title", ("M", 5000), "idx_movies_title_id"))
+      for run in (0, 1)],
+    ("cursor page, sorted by added",
+     lambda db: movie_list_query(db, sort="added").filter(*cursor_ranges(db, "added", (5000, 5000))[0]).limit(20),
+     ("INTEGER PRIMARY KEY", "movies_pkey")),
+    ("lookup by TMDb ID",
+     lambda db: db.query(Movie).filter(Movie.tmdb_id == 550), "idx_movies_tmdb_id"),
+]
+
+def explain(db: Session, query) -> str:
+    """Get the database's plan for ``query`` as text."""
+    dialect = db.get_bind().dialect
+    sql = str(query.statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    if dialect.name == "sqlite":
+        return "\n".join(row[3] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+    if dialect.name == "postgresql":
+        # Small tables are cheaper to scan; this checks the index can serve the query at all
+        db.connection().exec_driver_sql("SET LOCAL enable_seqscan = off")
+        return "\n".join(row[0] for row in db.connection().exec_driver_sql(f"EXPLAIN {sql}"))
+    raise NotImplementedError(f"Query plans are not supported for the '{dialect.name}' dialect")
+
+def main():
+    db = SessionLocal()
+    try:
+        if "movies" not in inspect(db.connection()).get_table_names():
+            print("The database has no movies table; create it first (scripts/recreate_database.py)")
+            return 1
+
+        failures = 0
+        for description, build, index in CHECKS:
+            plan = explain(db, build(db))
+            indexes = index if isinstance(index, tuple) else (index,)
+            used = next((name for name in indexes if name in plan), None)
+            failures += used is None
+            print(f"{'ok  ' if used else 'FAIL'} {description}: {'uses ' + used if used else 'does not use ' + ' or '.join(indexes)}")
+            if args.verbose or not used:
+                print("     " + plan.replace("\n", "\n     "))
+        db.rollback()
+    finally:
+        db.close()
+
+    if failures:
+        print(f"{failures} of {len(CHECKS)} queries don't use their index")
+        return 1
+    print(f"All {len(CHECKS)} queries use their index")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,6 +15,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from app.database.models import Movie, Genre, movie_genre, Base
 from app.database.config import engine, get_db
+from app.database.import_context import reset_import_context
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -41,6 +42,8 @@ def clear_database():
         
         # Commit changes
         db.commit()
+        # Cached import indexes would still list the deleted movies
+        reset_import_context(db)
         logger.info("Database cleared successfully.")
     except Exception as e:
         db.rollback()
@@ -117,11 +117,12 @@ async def main():
     print("TMDb API Explorer")
     print("==================")
     
-    # Find movies with most ratings
-    await explore_top_movies()
-    
-    # Example search
-    await search_movie("Inception")
+    async with tmdb_api:
+        # Find movies with most ratings
+        await explore_top_movies()
+        
+        # Example search
+        await search_movie("Inception")
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
@@ -43,9 +43,6 @@ async def get_movies_from_multiple_pages(method, page_count=5):
         
         results = data.get("results", [])
         all_results.extend(results)
-        
-        # Small delay to avoid rate limiting
-        await asyncio.sleep(0.5)
     
     return all_results
 
@@ -171,18 +168,19 @@ async def main():
     print("TMDb Movie Explorer")
     print("==================")
     
-    if args.command == "list" or args.command is None:
-        # Default to list command if none provided
-        await find_most_rated_movies(
-            method=getattr(args, "method", "top_rated"),
-            sort_by=getattr(args, "sort", "vote_count"),
-            page_count=getattr(args, "pages", 5),
-            limit=getattr(args, "limit", 50)
-        )
-    elif args.command == "details":
-        await get_movie_details(args.movie_id)
-    else:
-        parser.print_help()
+    async with tmdb_api:
+        if args.command == "list" or args.command is None:
+            # Default to list command if none provided
+            await find_most_rated_movies(
+                method=getattr(args, "method", "top_rated"),
+                sort_by=getattr(args, "sort", "vote_count"),
+                page_count=getattr(args, "pages", 5),
+                limit=getattr(args, "limit", 50)
+            )
+        elif args.command == "details":
+            await get_movie_details(args.movie_id)
+        else:
+            parser.print_help()
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
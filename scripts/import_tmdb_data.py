@@ -59,22 +59,25 @@ async def main():
     # Get a database session
     db = next(get_db())
     try:
-        # First, fetch and store genres
-        await fetch_and_store_genres(db)
-        
-        # Import popular movies if requested
-        if args.popular > 0:
-            await import_popular_movies(db, page_count=args.popular)
-        
-        # Import top rated movies if requested
-        if args.top_rated > 0:
-            await import_top_rated_movies(db, page_count=args.top_rated)
-        
-        # Import search results if requested
-        if args.search:
-            query = args.search[0]
-            pages = int(args.search[1])
-            await search_and_import_movies(db, query, page_count=pages)
+        async with tmdb_api:
+            # First, fetch and store genres
+            await fetch_and_store_genres(db)
+            
+            # Import popular movies if requested
+            if args.popular > 0:
+                await import_popular_movies(db, page_count=args.popular)
+            
+            # Import top rated movies if requested
+            if args.top_rated > 0:
+                await import_top_rated_movies(db, page_count=args.top_rated)
+            
+            # Import search results if requested
+            if args.search:
+                query = args.search[0]
+                pages = int(args.search[1])
+                await search_and_import_movies(db, query, page_count=pages)
+            
+            logger.info(f"TMDb connection stats: {tmdb_api.format_stats()}")
         
     finally:
         db.close()
@@ -5,17 +5,20 @@ Import top 1000 movies by vote count from TMDb.
 This script fetches movies with the highest number of votes from TMDb
 and imports them into the database. It includes movies in all languages
 with the highest vote counts globally.
+
+Progress is checkpointed to a JSON file, so an interrupted import can be
+continued with --resume and failed movies retried with --retry-failed.
 """
 
 import os
 import sys
+import json
 import asyncio
 import logging
 import argparse
 import math
 import time
 from tqdm import tqdm
-from concurrent.futures import ThreadPoolExecutor
 
 # Add the parent directory to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -23,7 +26,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from app.database.models import Base, Movie
 from app.database.config import engine, get_db
 from app.api.services.tmdb_service import tmdb_api
-from app.database.import_movies import fetch_and_store_genres, import_movie
+from app.database.import_movies import fetch_and_store_genres
+from app.database.import_pipeline import ImportPipeline
 
 # Configure logging
 logging.basicConfig(
@@ -32,169 +36,346 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-async def fetch_top_voted_movies(page_count=50, min_votes=1000):
+DEFAULT_CHECKPOINT_PATH = ".cache/import_top_voted.checkpoint.json"
+
+class ImportCheckpoint:
     """
-    Fetch movies sorted by vote count from TMDb.
-    
-    Args:
-        page_count: Number of pages to fetch (20 movies per page)
-        min_votes: Minimum number of votes required
+    Progress of a top-voted import, persisted as JSON.
     
-    Returns:
-        List of movie details sorted by vote count
+    Records which discover pages were fetched, the candidate TMDb IDs they
+    listed (in order) and which candidates were completed (imported or
+    already present) or failed.
     """
-    all_movies = []
-    
-    # Create a progress bar
-    progress = tqdm(total=page_count, desc="Fetching pages", unit="page")
-    
-    # TMDb returns 20 movies per page, so 50 pages = 1000 movies
-    for page in range(1, page_count + 1):
-        # Use discover API to sort by vote_count.desc
-        endpoint = "/discover/movie"
-        params = {
-            "language": "en-US",
-            "sort_by": "vote_count.desc",
-            "include_adult": "false",
-            "include_video": "false",
-            "page": page,
-            "vote_count.gte": min_votes,  # Only include movies with at least the specified votes
-        }
-        
-        response = await tmdb_api._make_request(endpoint, params)
-        
-        if "error" in response:
-            logger.error(f"Error fetching movies: {response['error']}")
-            await asyncio.sleep(2)  # Longer delay on error
-            continue
-            
-        if "results" in response:
-            all_movies.extend(response["results"])
-            
-        progress.update(1)
+    
+    # Minimum seconds between periodic saves
+    SAVE_INTERVAL = 1.0
+    
+    def __init__(self, path, count, min_votes):
+        self.path = path
+        self.count = count
+        self.min_votes = min_votes
+        self.total_pages = None
+        self.fetched_pages = set()
+        self.candidates = {}  # TMDb ID -> None, in discover order
+        self.completed = set()
+        self.failed = set()
+        self._saved_at = 0.0
+    
+    @classmethod
+    def load(cls, path):
+        """Load a checkpoint, or return None if there is none."""
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        checkpoint = cls(path, data["count"], data["min_votes"])
+        checkpoint.total_pages = data.get("total_pages")
+        checkpoint.fetched_pages = set(data.get("fetched_pages", []))
+        checkpoint.candidates = dict.fromkeys(data.get("candidates", []))
+        checkpoint.completed = set(data.get("completed", []))
+        checkpoint.failed = set(data.get("failed", []))
+        return checkpoint
+    
+    @property
+    def next_page(self):
+        """First discover page that has not been fetched yet."""
+        page = 1
+        while page in self.fetched_pages:
+            page += 1
+        return page
+    
+    def save(self, force=False):
+        """Write the checkpoint atomically, at most every ``SAVE_INTERVAL`` seconds unless forced."""
+        now = time.monotonic()
+        if not force and now - self._saved_at < self.SAVE_INTERVAL:
+            return
+        self._saved_at = now
         
-        # Add a small delay to avoid rate limiting
-        await asyncio.sleep(0.3)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {
+            "count": self.count,
+            "min_votes": self.min_votes,
+            "next_page": self.next_page,
+            "total_pages": self.total_pages,
+            "fetched_pages": sorted(self.fetched_pages),
+            "candidates": list(self.candidates),
+            "completed": sorted(self.completed),
+            "failed": sorted(self.failed),
+            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
     
-    progress.close()
+    def record_page(self, page, response, movies):
+        """Record a fetched discover page and its candidates ``movies``, the results above the vote cutoff."""
+        self.fetched_pages.add(page)
+        self.total_pages = response.get("total_pages", self.total_pages)
+        for movie in movies:
+            self.candidates.setdefault(movie["id"])
+        self.save()
+    
+    def record_result(self, outcome, movie_ids):
+        """Record pipeline outcomes ("imported", "skipped" or "failed")."""
+        for movie_id in movie_ids:
+            if outcome == "failed":
+                if movie_id not in self.completed:
+                    self.failed.add(movie_id)
+            else:
+                self.completed.add(movie_id)
+                self.failed.discard(movie_id)
     
-    # Sort by vote count (descending) just to be sure
-    all_movies.sort(key=lambda x: x.get("vote_count", 0), reverse=True)
+    def pending(self):
+        """Candidates that were fetched but neither completed nor failed, in discover order."""
+        return [
+            movie_id for movie_id in self.candidates
+            if movie_id not in self.completed and movie_id not in self.failed
+        ]
     
-    logger.info(f"Fetched {len(all_movies)} movies sorted by vote count")
-    return all_movies
+    def remaining_pages(self, page_count):
+        """Pages in ``1..page_count`` (capped at ``total_pages``) that were not fetched yet."""
+        if self.total_pages is not None:
+            page_count = min(page_count, self.total_pages)
+        return [page for page in range(1, page_count + 1) if page not in self.fetched_pages]
 
-async def get_movie_details_batch(movie_ids, max_concurrent=5):
+async def fetch_top_voted_page(page, min_votes=1000):
     """
-    Fetch detailed information for a batch of movies concurrently.
+    Fetch one page of movies sorted by vote count from TMDb.
     
     Args:
-        movie_ids: List of TMDb movie IDs
-        max_concurrent: Maximum number of concurrent requests
+        page: Page number (20 movies per page)
+        min_votes: Minimum number of votes required
     
     Returns:
-        Dictionary mapping movie IDs to their details
+        TMDb discover response for the page
     """
-    semaphore = asyncio.Semaphore(max_concurrent)
-    movie_details = {}
-    
-    async def get_movie_detail(movie_id):
-        async with semaphore:
-            details = await tmdb_api.get_movie_details(movie_id)
-            if "error" not in details:
-                return movie_id, details
-            else:
-                logger.error(f"Error fetching details for movie {movie_id}: {details['error']}")
-                return movie_id, None
-            
-    # Create tasks for all movie IDs
-    tasks = [get_movie_detail(movie_id) for movie_id in movie_ids]
+    # Use discover API to sort by vote_count.desc
+    endpoint = "/discover/movie"
+    params = {
+        "language": "en-US",
+        "sort_by": "vote_count.desc",
+        "include_adult": "false",
+        "include_video": "false",
+        "page": page,
+        "vote_count.gte": min_votes,  # Only include movies with at least the specified votes
+    }
+    
+    return await tmdb_api._make_request(endpoint, params)
+
+async def fetch_top_voted_movies(page_count=50, min_votes=1000, pages=None, concurrency=None, on_page=None):
+    """
+    Stream movies sorted by vote count from TMDb as discover pages arrive.
+    
+    Up to ``concurrency`` pages are in flight at once (the TMDb client
+    enforces the shared rate budget). Movies are yielded in page order, so
+    the first N are the top N by votes and a consumer may stop after as many
+    as it needs; a page that arrives before the ones above it waits in a
+    buffer of at most ``concurrency`` pages. No pages past ``total_pages`` or
+    past the first page that reaches the ``min_votes`` cutoff are requested,
+    and closing the generator cancels the requests still in flight.
+    
+    Args:
+        page_count: Number of pages to fetch (20 movies per page)
+        min_votes: Minimum number of votes required
+        pages: Page numbers to fetch, in ascending order, instead of ``1..page_count``
+        concurrency: Maximum number of pages fetched at once
+        on_page: Called with the page number, response and movies kept (those above the cutoff) of every fetched page
     
-    # Execute tasks and gather results
-    results = await asyncio.gather(*tasks)
+    Yields:
+        Movie summaries from the discover results
+    """
+    concurrency = concurrency or int(os.getenv("IMPORT_PAGE_WORKERS", "4"))
+    order = list(pages if pages is not None else range(1, page_count + 1))
+    next_index = 0  # position in ``order`` of the next page to yield
+    scheduled = 0  # number of pages of ``order`` scheduled so far
+    last_page = page_count
+    in_flight = {}
+    arrived = {}  # page -> movies, for pages waiting for the ones above them
     
-    # Process results
-    for movie_id, details in results:
-        if details:
-            movie_details[movie_id] = details
+    def schedule():
+        nonlocal scheduled
+        while len(in_flight) + len(arrived) < concurrency * 2 and len(in_flight) < concurrency and scheduled < len(order):
+            page = order[scheduled]
+            scheduled += 1
+            if page <= last_page:
+                in_flight[asyncio.ensure_future(fetch_top_voted_page(page, min_votes))] = page
     
-    return movie_details
+    try:
+        schedule()
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                page = in_flight.pop(task)
+                response = task.result()
+                arrived[page] = []
+                if "error" in response:
+                    logger.error(f"Error fetching discover page {page}: {response['error']}")
+                    continue
+                if page > last_page:
+                    continue
+                
+                results = response.get("results", [])
+                last_page = min(last_page, response.get("total_pages", last_page))
+                if not results or (results[-1].get("vote_count") or 0) < min_votes:
+                    # Results are sorted by vote count, so later pages are all below the cutoff
+                    last_page = min(last_page, page)
+                arrived[page] = [movie for movie in results if (movie.get("vote_count") or 0) >= min_votes]
+                if on_page is not None:
+                    on_page(page, response, arrived[page])
+            
+            # Pages past the last one are never fetched (or their results are dropped)
+            while next_index < scheduled and (order[next_index] in arrived or order[next_index] > last_page):
+                for movie in arrived.pop(order[next_index], []):
+                    yield movie
+                next_index += 1
+            schedule()
+    finally:
+        for task in in_flight:
+            task.cancel()
 
-async def import_top_voted_movies(db, count=1000, batch_size=20, min_votes=1000):
+async def import_top_voted_movies(db, count=1000, batch_size=20, min_votes=1000, checkpoint=None, **pipeline_options):
     """
     Import the top voted movies into the database.
     
+    Discover pages are fetched concurrently by ``fetch_top_voted_movies`` and
+    streamed through the import pipeline, which skips movies already in the
+    database, fetches details concurrently and writes them in batches.
+    
     Args:
         db: Database session
         count: Number of movies to import
-        batch_size: Number of movies to process in each batch
+        batch_size: Number of movies written per transaction
         min_votes: Minimum number of votes required
+        checkpoint: ImportCheckpoint to record progress in and continue from
     """
     start_time = time.time()
     
     # Calculate number of pages needed (TMDb returns 20 movies per page)
     pages_needed = math.ceil(count / 20)
+    pages = None
+    pending = []
+    max_candidates = count
+    
+    if checkpoint is not None:
+        # Continue with candidates a previous run fetched but didn't finish, then the unfetched pages
+        pending = checkpoint.pending()
+        max_candidates = count - len(checkpoint.completed) - len(checkpoint.failed)
+        if max_candidates <= 0:
+            logger.info(f"Checkpoint already covers {count} movies; nothing to do")
+            return 0
+        pages = checkpoint.remaining_pages(pages_needed) if len(pending) < max_candidates else []
+        if checkpoint.fetched_pages:
+            logger.info(f"Resuming at discover page {checkpoint.next_page} with {len(pending)} pending candidates "
+                        f"({len(checkpoint.completed)} completed, {len(checkpoint.failed)} failed)")
     
-    # Fetch top voted movies
     logger.info(f"Fetching up to {count} movies with at least {min_votes} votes")
-    movies = await fetch_top_voted_movies(pages_needed, min_votes)
+    progress_bar = tqdm(desc="Importing movies", unit="movie")
     
-    # Limit to the requested count
-    movies = movies[:count]
+    def update_progress(stats):
+        progress_bar.update(stats["imported"] - progress_bar.n)
+        if checkpoint is not None:
+            checkpoint.save()
     
-    if not movies:
-        logger.warning("No movies found matching the criteria")
-        return 0
+    async def candidates():
+        for movie_id in pending:
+            yield {"id": movie_id}
+        movies = fetch_top_voted_movies(
+            pages_needed,
+            min_votes,
+            pages=pages,
+            concurrency=pipeline_options.get("page_workers"),
+            on_page=checkpoint.record_page if checkpoint is not None else None
+        )
+        try:
+            async for movie in movies:
+                yield movie
+        finally:
+            await movies.aclose()
     
-    # Get existing TMDb IDs to avoid duplicates
-    existing_tmdb_ids = {m.tmdb_id for m in db.query(Movie.tmdb_id).filter(Movie.tmdb_id != None).all()}
+    pipeline = ImportPipeline(
+        db,
+        batch_size=batch_size,
+        max_candidates=max_candidates,
+        on_progress=update_progress,
+        on_result=checkpoint.record_result if checkpoint is not None else None,
+        **pipeline_options
+    )
+    try:
+        stats = await pipeline.import_payloads(candidates())
+    finally:
+        progress_bar.close()
+        if checkpoint is not None:
+            checkpoint.save(force=True)
     
-    # Filter out movies that are already in the database
-    new_movies = [m for m in movies if m["id"] not in existing_tmdb_ids]
+    elapsed_time = time.time() - start_time
+    logger.info(f"Skipped {stats['skipped']} movies already in the database, {stats['failed']} failed")
+    logger.info(f"Pipeline stages: {stats['stages']}")
+    logger.info(f"Imported {stats['imported']} new movies with highest vote counts in {elapsed_time:.2f} seconds")
+    return stats["imported"]
+
+async def retry_failed_movies(db, checkpoint, batch_size=20, **pipeline_options):
+    """
+    Reprocess only the movies a checkpointed import failed to import.
     
-    if not new_movies:
-        logger.info("All movies are already in the database")
+    Args:
+        db: Database session
+        checkpoint: ImportCheckpoint whose failed movies are retried
+        batch_size: Number of movies written per transaction
+    """
+    failed = sorted(checkpoint.failed)
+    if not failed:
+        logger.info("No failed movies to retry")
         return 0
     
-    logger.info(f"Found {len(new_movies)} new movies to import out of {len(movies)} total")
-    
-    # Process in batches for better performance
-    total_imported = 0
-    progress_bar = tqdm(total=len(new_movies), desc="Importing movies", unit="movie")
-    
-    for i in range(0, len(new_movies), batch_size):
-        batch = new_movies[i:i+batch_size]
-        
-        # Import each movie in the batch
-        for movie_data in batch:
-            # Import the movie
-            movie = await import_movie(db, movie_data)
-            
-            if movie:
-                total_imported += 1
-                progress_bar.update(1)
-            
-        # Commit after each batch
-        db.commit()
-        
-        # Add a small delay between batches
-        await asyncio.sleep(0.2)
-    
-    progress_bar.close()
+    logger.info(f"Retrying {len(failed)} failed movies")
+    # Failures are recorded again if they fail again
+    checkpoint.failed = set()
+    pipeline = ImportPipeline(
+        db,
+        batch_size=batch_size,
+        on_progress=lambda stats: checkpoint.save(),
+        on_result=checkpoint.record_result,
+        **pipeline_options
+    )
+    try:
+        stats = await pipeline.import_payloads([{"id": movie_id} for movie_id in failed])
+    finally:
+        checkpoint.save(force=True)
     
-    elapsed_time = time.time() - start_time
-    logger.info(f"Imported {total_imported} new movies with highest vote counts in {elapsed_time:.2f} seconds")
-    return total_imported
+    logger.info(f"Retried {len(failed)} movies: {stats['imported']} imported, {stats['skipped']} skipped, "
+                f"{len(checkpoint.failed)} still failing")
+    return stats["imported"]
 
 async def main():
     parser = argparse.ArgumentParser(description="Import top voted movies from TMDb")
     parser.add_argument("--count", type=int, default=1000, help="Number of top voted movies to import (default: 1000)")
     parser.add_argument("--min-votes", type=int, default=1000, help="Minimum number of votes required (default: 1000)")
-    parser.add_argument("--batch-size", type=int, default=20, help="Number of movies to process in each batch (default: 20)")
+    parser.add_argument("--batch-size", type=int, default=20, help="Number of movies written per transaction (default: 20)")
     parser.add_argument("--recreate", action="store_true", help="Recreate database tables before import")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT_PATH,
+                        help=f"Checkpoint file recording progress (default: {DEFAULT_CHECKPOINT_PATH})")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--resume", action="store_true", help="Continue an interrupted import from the checkpoint")
+    mode.add_argument("--retry-failed", action="store_true", help="Only reprocess movies that failed in the checkpoint")
     
     args = parser.parse_args()
     
+    if args.resume or args.retry_failed:
+        checkpoint = ImportCheckpoint.load(args.checkpoint)
+        if checkpoint is None:
+            if args.retry_failed:
+                parser.error(f"No checkpoint found at {args.checkpoint}")
+            logger.warning(f"No checkpoint found at {args.checkpoint}; starting a new import")
+            checkpoint = ImportCheckpoint(args.checkpoint, args.count, args.min_votes)
+        elif checkpoint.min_votes != args.min_votes:
+            parser.error(f"Checkpoint was created with --min-votes {checkpoint.min_votes}")
+        checkpoint.count = args.count
+    else:
+        checkpoint = ImportCheckpoint(args.checkpoint, args.count, args.min_votes)
+    
     # Recreate database if requested
     if args.recreate:
         logger.info("Recreating database tables...")
@@ -209,11 +390,17 @@ async def main():
     db = next(get_db())
     
     try:
-        # First, fetch and store genres
-        await fetch_and_store_genres(db)
-        
-        # Import top voted movies
-        await import_top_voted_movies(db, args.count, args.batch_size, args.min_votes)
+        async with tmdb_api:
+            # First, fetch and store genres
+            await fetch_and_store_genres(db)
+            
+            if args.retry_failed:
+                await retry_failed_movies(db, checkpoint, args.batch_size)
+            else:
+                # Import top voted movies
+                await import_top_voted_movies(db, args.count, args.batch_size, args.min_votes, checkpoint)
+            
+            logger.info(f"TMDb connection stats: {tmdb_api.format_stats()}")
         
     finally:
         db.close()
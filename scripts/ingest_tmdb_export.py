@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Import the movies listed in a TMDb daily ID export that are not in the database yet.
+
+TMDb publishes daily gzipped NDJSON files with one line per movie, e.g.
+``{"adult":false,"id":3924,"original_title":"Blondie","popularity":2.8,"video":false}``
+(https://developer.themoviedb.org/docs/daily-id-exports). The file is read
+line by line, filtered by popularity and adult flag, and every ID that is
+not in the ``movies`` table is queued into the import pipeline, which
+fetches the details and writes the movies in batches. Only the set of known
+TMDb IDs is held in memory, so files of several hundred MB are streamed in
+bounded memory. Rerunning the same file skips the movies imported so far.
+
+Usage:
+    python scripts/ingest_tmdb_export.py movie_ids_10_16_2026.json.gz --min-popularity 5
+    python scripts/ingest_tmdb_export.py movie_ids_10_16_2026.json.gz --limit 10000
+    python scripts/ingest_tmdb_export.py movie_ids_10_16_2026.json.gz --dry-run
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import asyncio
+import logging
+import argparse
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database.models import Base
+from app.database.config import engine, get_db
+from app.api.services.tmdb_service import tmdb_api
+from app.database.import_context import get_import_context
+from app.database.import_movies import fetch_and_store_genres
+from app.database.import_pipeline import ImportPipeline
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Lines read between progress reports and between yields to the event loop
+PROGRESS_INTERVAL = 100000
+YIELD_INTERVAL = 1000
+
+class ExportStats:
+    """Counters for one pass over an export file."""
+
+    def __init__(self):
+        self.lines = 0
+        self.malformed = 0
+        self.filtered = 0
+        self.present = 0
+        self.queued = 0
+        self.started = time.perf_counter()
+
+    def as_dict(self):
+        elapsed = time.perf_counter() - self.started
+        return {
+            "lines": self.lines,
+            "malformed": self.malformed,
+            "filtered": self.filtered,
+            "already_present": self.present,
+            "queued": self.queued,
+            "lines_per_s": round(self.lines / elapsed) if elapsed else 0
+        }
+
+def open_export(path):
+    """Open an export file as text, decompressing ``.gz`` files on the fly."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+def iter_export_ids(path, stats, min_popularity=0.0, include_adult=False):
+    """
+    Yield the TMDb ID of every line of an export file, or None for lines that are malformed or filtered out.
+
+    Every line yields, so a consumer can act on line counts (e.g. hand control
+    back to the event loop) however long a run of filtered lines is.
+
+    Args:
+        path: Export file (NDJSON, optionally gzipped)
+        stats: ExportStats to count lines in
+        min_popularity: Skip movies less popular than this
+        include_adult: Also yield movies flagged as adult
+    """
+    with open_export(path) as f:
+        for line in f:
+            stats.lines += 1
+            if stats.lines % PROGRESS_INTERVAL == 0:
+                logger.info(f"Read {stats.lines} export lines: {stats.as_dict()}")
+            try:
+                entry = json.loads(line)
+                movie_id = int(entry["id"])
+            except (ValueError, KeyError, TypeError):
+                stats.malformed += 1
+                yield None
+                continue
+            if (entry.get("adult") and not include_adult) or (entry.get("popularity") or 0) < min_popularity:
+                stats.filtered += 1
+                yield None
+                continue
+            yield movie_id
+
+async def missing_movies(path, known_ids, stats, **filters):
+    """
+    Stream ``{"id": ...}`` payloads for exported movies that aren't in ``known_ids``.
+
+    Control goes back to the event loop every ``YIELD_INTERVAL`` lines, so
+    long runs of filtered or known IDs don't stall the detail fetchers.
+    """
+    for movie_id in iter_export_ids(path, stats, **filters):
+        if stats.lines % YIELD_INTERVAL == 0:
+            await asyncio.sleep(0)
+        if movie_id is None:
+            continue
+        if movie_id in known_ids:
+            stats.present += 1
+            continue
+        stats.queued += 1
+        yield {"id": movie_id}
+
+async def ingest_export(db, path, min_popularity=0.0, include_adult=False, limit=None, batch_size=50,
+                        dry_run=False, **pipeline_options):
+    """
+    Import the movies of an export file that are missing from the database.
+
+    Args:
+        db: Database session
+        path: Export file (NDJSON, optionally gzipped)
+        min_popularity: Skip movies less popular than this
+        include_adult: Also import movies flagged as adult
+        limit: Stop after queuing this many missing movies
+        batch_size: Number of movies written per transaction
+        dry_run: Only count the missing movies, without fetching anything
+
+    Returns:
+        Export counters, plus the pipeline stats unless ``dry_run`` is set
+    """
+    context = get_import_context(db)
+    stats = ExportStats()
+    filters = {"min_popularity": min_popularity, "include_adult": include_adult}
+    logger.info(f"Streaming {path} against {len(context.tmdb_ids)} known TMDb IDs")
+
+    if dry_run:
+        async for _ in missing_movies(path, context.tmdb_ids, stats, **filters):
+            if limit is not None and stats.queued >= limit:
+                break
+        result = stats.as_dict()
+        logger.info(f"Dry run: {result}")
+        return result
+
+    pipeline = ImportPipeline(db, batch_size=batch_size, max_candidates=limit, context=context, **pipeline_options)
+    pipeline_stats = await pipeline.import_payloads(missing_movies(path, context.tmdb_ids, stats, **filters))
+
+    result = {**stats.as_dict(), "pipeline": pipeline_stats}
+    logger.info(f"Export: {stats.as_dict()}")
+    logger.info(f"Pipeline stages: {pipeline_stats['stages']}")
+    logger.info(f"Imported {pipeline_stats['imported']} movies, {pipeline_stats['failed']} failed")
+    return result
+
+async def main():
+    parser = argparse.ArgumentParser(description="Import the movies of a TMDb daily ID export that are not in the database")
+    parser.add_argument("path", help="Export file (NDJSON, optionally gzipped)")
+    parser.add_argument("--min-popularity", type=float, default=0.0, help="Skip movies less popular than this (default: 0)")
+    parser.add_argument("--include-adult", action="store_true", help="Also import movies flagged as adult")
+    parser.add_argument("--limit", type=int, help="Stop after this many missing movies")
+    parser.add_argument("--batch-size", type=int, default=50, help="Number of movies written per transaction (default: 50)")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the missing movies, without fetching them")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        parser.error(f"Export file not found: {args.path}")
+
+    # Ensure tables exist
+    Base.metadata.create_all(bind=engine)
+    db = next(get_db())
+
+    try:
+        if args.dry_run:
+            await ingest_export(db, args.path, args.min_popularity, args.include_adult, args.limit, dry_run=True)
+            return
+
+        async with tmdb_api:
+            await fetch_and_store_genres(db)
+            await ingest_export(db, args.path, args.min_popularity, args.include_adult, args.limit, args.batch_size)
+            logger.info(f"TMDb connection stats: {tmdb_api.format_stats()}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -35,6 +35,7 @@ async def import_movie_by_id(db, movie_id):
         logger.error(f"Error fetching movie: {movie_details['error']}")
         return None
     
+    # import_movie reuses the full details instead of fetching them again
     return await import_movie(db, movie_details)
 
 async def main():
@@ -64,27 +65,30 @@ async def main():
     db = next(get_db())
     
     try:
-        # Ensure genres are in the database
-        await fetch_and_store_genres(db)
-        
-        if args.command == "ids":
-            # Import specific movie IDs
-            for movie_id in args.movie_ids:
-              movie = await import_movie_by_id(db, movie_id)
-              
-              if movie:
-                  logger.info(f"Successfully imported: {movie.title} ({movie.year})")
-        
-        elif args.command == "popular":
-            # Import popular movies
-            await import_popular_movies(db, args.count)
-        
-        elif args.command == "top":
-            # Import top rated movies
-            await import_top_rated_movies(db, args.count)
-        
-        else:
-            parser.print_help()
+        async with tmdb_api:
+            # Ensure genres are in the database
+            await fetch_and_store_genres(db)
+            
+            if args.command == "ids":
+                # Import specific movie IDs
+                for movie_id in args.movie_ids:
+                  movie = await import_movie_by_id(db, movie_id)
+                  
+                  if movie:
+                      logger.info(f"Successfully imported: {movie.title} ({movie.year})")
+            
+            elif args.command == "popular":
+                # Import popular movies
+                await import_popular_movies(db, args.count)
+            
+            elif args.command == "top":
+                # Import top rated movies
+                await import_top_rated_movies(db, args.count)
+            
+            else:
+                parser.print_help()
+            
+            logger.info(f"TMDb connection stats: {tmdb_api.format_stats()}")
     
     finally:
         db.close()
@@ -14,6 +14,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from app.database.models import Base
 from app.database.config import engine
+from app.database.import_context import reset_import_context
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,6 +27,8 @@ def recreate_database():
     
     logger.info("Creating all tables...")
     Base.metadata.create_all(bind=engine)
+    # Cached import indexes would still list the dropped movies
+    reset_import_context()
     
     logger.info("Database schema has been reset and recreated.")
 
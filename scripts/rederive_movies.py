@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Rebuild movie columns from the archived raw TMDb detail payloads.
+
+Imports append every detail payload they fetch to the ``movie_payloads``
+table. This script reads the latest payload of each movie in chunks,
+decompresses and maps them in a process pool and writes the columns back
+with executemany updates, so a new or fixed derived column never needs a
+refetch from TMDb.
+
+Rating and votes are only rebuilt when named in ``--columns``, since
+``scripts/add_custom_movie.py`` may have set custom values for them.
+
+Usage:
+    python scripts/rederive_movies.py                                   # all derived columns but rating and votes
+    python scripts/rederive_movies.py --columns rating,votes            # overwrites custom ratings
+    python scripts/rederive_movies.py --columns poster_path,backdrop_path
+    python scripts/rederive_movies.py --workers 8 --chunk-size 2000
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import bindparam, update
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.database.models import Movie
+from app.database.config import SessionLocal, engine
+from app.database.payload_archive import (
+    DERIVED_COLUMNS, DEFAULT_REDERIVED_COLUMNS, derive_rows, ensure_archive_table, iter_latest_payloads
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def rederive_movies(columns=None, workers=None, chunk_size=1000):
+    """
+    Rebuild movie columns from the payload archive.
+
+    Args:
+        columns: Movie columns to rebuild (default: all derived columns but rating and votes)
+        workers: Number of worker processes (default: CPU count)
+        chunk_size: Payloads per chunk handed to a worker and per committed update
+
+    Returns:
+        Number of payloads processed
+    """
+    columns = columns or DEFAULT_REDERIVED_COLUMNS
+    workers = workers or os.cpu_count() or 1
+    table = Movie.__table__
+    stmt = (
+        update(table)
+        .where(table.c.tmdb_id == bindparam("b_tmdb_id"))
+        .values({column: bindparam(column) for column in columns})
+    )
+
+    ensure_archive_table(engine)
+    db = SessionLocal()
+    started = time.perf_counter()
+    processed = 0
+
+    def write(rows):
+        nonlocal processed
+        if rows:
+            db.execute(stmt, [{"b_tmdb_id": row.pop("tmdb_id"), **row} for row in rows])
+            db.commit()
+        processed += len(rows)
+        elapsed = time.perf_counter() - started
+        logger.info(f"Rebuilt {processed} movies ({processed / elapsed:.0f} movies/s)")
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Keep a bounded number of chunks in flight so memory stays flat
+            max_in_flight = workers * 2
+            in_flight = []
+            for chunk in iter_latest_payloads(db, chunk_size):
+                in_flight.append(pool.submit(derive_rows, chunk, columns))
+                if len(in_flight) >= max_in_flight:
+                    write(in_flight.pop(0).result())
+            for future in in_flight:
+                write(future.result())
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Rebuilt {', '.join(columns)} for {processed} movies in {elapsed:.2f}s "
+                f"({processed / elapsed if elapsed else 0:.0f} movies/s)")
+    return processed
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild movie columns from archived TMDb payloads")
+    parser.add_argument("--columns", help=f"Comma-separated columns to rebuild, any of {','.join(DERIVED_COLUMNS)} "
+                             f"(default: {','.join(DEFAULT_REDERIVED_COLUMNS)})")
+    parser.add_argument("--workers", type=int, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Payloads per chunk (default: 1000)")
+    args = parser.parse_args()
+
+    columns = None
+    if args.columns:
+        columns = [column.strip() for column in args.columns.split(",") if column.strip()]
+        unknown = [column for column in columns if column not in DERIVED_COLUMNS]
+        if unknown:
+            parser.error(f"Cannot rebuild {', '.join(unknown)}; choose from {', '.join(DERIVED_COLUMNS)}")
+
+    rederive_movies(columns, args.workers, args.chunk_size)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Run or feed the offline TMDb stand-in server.
+
+The stand-in serves /search/movie, /movie/{id}, /movie/popular,
+/movie/top_rated, /discover/movie and /genre/movie/list from fixture files
+or a synthetic catalog, with optional latency, jitter, error and 429 injection.
+
+Usage:
+    # Serve a synthetic catalog of 5000 movies with 80ms +/- 40ms latency
+    python scripts/tmdb_standin.py serve --synthetic 5000 --latency-ms 80 --jitter-ms 40
+
+    # Point the app or any script at it
+    TMDB_BASE_URL=http://127.0.0.1:8001 python scripts/import_top_voted.py --count 500
+
+    # Record real TMDb responses into a fixture file (needs API credentials)
+    python scripts/tmdb_standin.py record --output fixtures/tmdb.json.gz --discover-pages 10
+
+    # Write a synthetic fixture file
+    python scripts/tmdb_standin.py generate --count 20000 --output fixtures/synthetic.json.gz
+"""
+
+import os
+import sys
+import asyncio
+import logging
+import argparse
+
+import uvicorn
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.tmdb_standin import FixtureStore, create_app
+from app.api.services.tmdb_service import tmdb_api
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def load_store(args) -> FixtureStore:
+    """Load fixtures from a file or generate a synthetic catalog."""
+    if args.fixtures:
+        store = FixtureStore.load(args.fixtures)
+        logger.info(f"Loaded {len(store.movies)} movies from {args.fixtures}")
+    else:
+        store = FixtureStore.generate(args.synthetic, seed=args.seed)
+        logger.info(f"Generated {len(store.movies)} synthetic movies (seed {args.seed})")
+    return store
+
+async def record_fixtures(output, discover_pages=10, popular_pages=5, min_votes=1000):
+    """Record genres, list pages and the detail payload of every listed movie from TMDb."""
+    async with tmdb_api:
+        genres = await tmdb_api.get_movie_genres()
+        if "error" in genres:
+            logger.error(f"Error fetching genres: {genres['error']}")
+            return
+
+        list_requests = [
+            tmdb_api._make_request("/discover/movie", {
+                "sort_by": "vote_count.desc",
+                "include_adult": "false",
+                "include_video": "false",
+                "page": page,
+                "vote_count.gte": min_votes
+            })
+            for page in range(1, discover_pages + 1)
+        ]
+        list_requests += [tmdb_api.get_popular_movies(page) for page in range(1, popular_pages + 1)]
+
+        movie_ids = set()
+        for page in await asyncio.gather(*list_requests):
+            if "error" in page:
+                logger.error(f"Error fetching list page: {page['error']}")
+                continue
+            movie_ids.update(movie["id"] for movie in page.get("results", []))
+
+        logger.info(f"Fetching details for {len(movie_ids)} movies...")
+        store = FixtureStore(genres=genres.get("genres"))
+        for details in await asyncio.gather(*[tmdb_api.get_movie_details(movie_id) for movie_id in movie_ids]):
+            if "error" not in details:
+                store.add(details)
+
+        store.save(output)
+        logger.info(f"Recorded {len(store.movies)} movies to {output} ({tmdb_api.format_stats()})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline TMDb stand-in server")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    # Parser for serving fixtures
+    serve_parser = subparsers.add_parser("serve", help="Serve fixtures over HTTP")
+    source = serve_parser.add_mutually_exclusive_group()
+    source.add_argument("--fixtures", help="Fixture file (.json or .json.gz) to serve")
+    source.add_argument("--synthetic", type=int, default=2000, help="Size of the synthetic catalog (default: 2000)")
+    serve_parser.add_argument("--seed", type=int, default=42, help="Seed for synthetic data and fault injection")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Host to bind (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8001, help="Port to bind (default: 8001)")
+    serve_parser.add_argument("--latency-ms", type=float, default=0, help="Base latency per request in ms")
+    serve_parser.add_argument("--jitter-ms", type=float, default=0, help="Maximum random extra latency in ms")
+    serve_parser.add_argument("--error-rate", type=float, default=0, help="Fraction of requests failing with 500")
+    serve_parser.add_argument("--throttle-rate", type=float, default=0, help="Fraction of requests failing with 429")
+    serve_parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds on injected 429s")
+
+    # Parser for recording real responses
+    record_parser = subparsers.add_parser("record", help="Record fixtures from the live TMDb API")
+    record_parser.add_argument("--output", required=True, help="Fixture file to write (.json or .json.gz)")
+    record_parser.add_argument("--discover-pages", type=int, default=10, help="Discover pages by vote count (default: 10)")
+    record_parser.add_argument("--popular-pages", type=int, default=5, help="Popular pages (default: 5)")
+    record_parser.add_argument("--min-votes", type=int, default=1000, help="Minimum votes for discover (default: 1000)")
+
+    # Parser for generating synthetic fixtures
+    generate_parser = subparsers.add_parser("generate", help="Write a synthetic fixture file")
+    generate_parser.add_argument("--output", required=True, help="Fixture file to write (.json or .json.gz)")
+    generate_parser.add_argument("--count", type=int, default=2000, help="Number of movies (default: 2000)")
+    generate_parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        app = create_app(
+            load_store(args),
+            latency=args.latency_ms / 1000,
+            jitter=args.jitter_ms / 1000,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            retry_after=args.retry_after,
+            seed=args.seed
+        )
+        uvicorn.run(app, host=args.host, port=args.port)
+    elif args.command == "record":
+        asyncio.run(record_fixtures(args.output, args.discover_pages, args.popular_pages, args.min_votes))
+    elif args.command == "generate":
+        FixtureStore.generate(args.count, seed=args.seed).save(args.output)
+        logger.info(f"Wrote {args.count} synthetic movies to {args.output}")
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -1,68 +1,179 @@
 #!/usr/bin/env python
 """
 Script to update existing movies with image paths from TMDb
+
+Movies are read in id order in bounded chunks, their base detail payloads
+(without credits, keywords, videos or images) are fetched concurrently under
+the shared TMDb rate limit, and the image paths are committed per batch.
+The last committed movie id is checkpointed, so an interrupted run can be
+continued with --resume.
+
+Usage:
+    python scripts/update_movie_images.py                # movies missing a poster or backdrop
+    python scripts/update_movie_images.py --all          # refresh every movie with a TMDb ID
+    python scripts/update_movie_images.py --resume       # continue an interrupted run
 """
 import sys
 import os
+import json
+import time
 import asyncio
+import argparse
 from pathlib import Path
 
+from sqlalchemy import update
+
 # Add the project root to the path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from app.database.config import get_db
+from app.database.config import SessionLocal
 from app.database.models.movie import Movie
 from app.api.services.tmdb_service import tmdb_api
 
-async def update_movie_images():
-    """Update existing movies with poster_path and backdrop_path from TMDb"""
+DEFAULT_CHECKPOINT_PATH = ".cache/update_movie_images.checkpoint.json"
+
+def load_checkpoint(path):
+    """Get the saved progress, or None if there is none."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_checkpoint(path, progress):
+    """Write the progress atomically."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(progress, f)
+    os.replace(tmp_path, path)
+
+def candidate_query(db, refresh_all=False):
+    """Movies with a TMDb ID, optionally only those missing an image path."""
+    query = db.query(Movie.id, Movie.tmdb_id).filter(Movie.tmdb_id.isnot(None))
+    if not refresh_all:
+        query = query.filter(Movie.poster_path.is_(None) | Movie.backdrop_path.is_(None))
+    return query
+
+def iter_candidate_chunks(db, chunk_size, after_id=0, refresh_all=False):
+    """
+    Yield lists of (id, tmdb_id) in id order, ``chunk_size`` rows at a time.
+
+    Each chunk is its own keyset query (``id > last id``), so memory stays
+    bounded without keeping a read cursor open while updates are committed
+    (SQLite's default journal mode would block those commits).
+    """
+    while True:
+        chunk = (
+            candidate_query(db, refresh_all)
+            .filter(Movie.id > after_id)
+            .order_by(Movie.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not chunk:
+            return
+        yield chunk
+        after_id = chunk[-1].id
+
+async def fetch_image_paths(movie_id, tmdb_id, semaphore):
+    """Fetch the image paths of one movie from its base detail payload."""
+    async with semaphore:
+        details = await tmdb_api.get_movie_details(tmdb_id, append_to_response=None)
+    if "error" in details:
+        print(f"  Error fetching movie {tmdb_id}: {details['error']}")
+        return None
+    return {
+        "id": movie_id,
+        "poster_path": details.get("poster_path"),
+        "backdrop_path": details.get("backdrop_path")
+    }
+
+async def update_movie_images(batch_size=100, concurrency=None, refresh_all=False, resume=False,
+                              checkpoint_path=DEFAULT_CHECKPOINT_PATH):
+    """
+    Update existing movies with poster_path and backdrop_path from TMDb
+
+    Args:
+        batch_size: Number of movies fetched and committed per batch
+        concurrency: Maximum number of detail requests in flight
+        refresh_all: Refresh every movie with a TMDb ID, not only those missing an image path
+        resume: Continue after the last movie committed by a previous run
+        checkpoint_path: File recording the last committed movie id
+    """
     print("Updating movie images from TMDb...")
-    
-    # Get a database session
-    db = next(get_db())
-    
+
+    progress = {"last_id": 0, "updated": 0, "failed": 0, "refresh_all": refresh_all}
+    if resume:
+        saved = load_checkpoint(checkpoint_path)
+        if saved is None:
+            print(f"No checkpoint found at {checkpoint_path}; starting from the beginning")
+        else:
+            progress = saved
+            refresh_all = saved.get("refresh_all", refresh_all)
+            print(f"Resuming after movie id {progress['last_id']} "
+                  f"({progress['updated']} updated, {progress['failed']} failed so far)")
+
+    semaphore = asyncio.Semaphore(concurrency or int(os.getenv("IMPORT_DETAIL_WORKERS", "8")))
+    db = SessionLocal()
+
     try:
-        # Get all movies that have a TMDb ID but no poster_path
-        movies = db.query(Movie).filter(
-            Movie.tmdb_id.isnot(None),
-            (Movie.poster_path.is_(None) | Movie.backdrop_path.is_(None))
-        ).all()
-        
-        if not movies:
+        total = candidate_query(db, refresh_all).filter(Movie.id > progress["last_id"]).count()
+        if not total:
             print("No movies found that need image updates")
             return
-        
-        print(f"Found {len(movies)} movies to update")
-        
-        # Update each movie with poster and backdrop paths
-        for i, movie in enumerate(movies):
-            print(f"Updating {i+1}/{len(movies)}: {movie.title} ({movie.year})")
-            
-            # Fetch detailed movie information from TMDb
-            movie_details = await tmdb_api.get_movie_details(movie.tmdb_id)
-            
-            if "error" in movie_details:
-                print(f"  Error fetching movie details: {movie_details['error']}")
-                continue
-            
-            # Update poster and backdrop paths
-            movie.poster_path = movie_details.get("poster_path")
-            movie.backdrop_path = movie_details.get("backdrop_path")
-            
-            # Add a small delay to avoid rate limiting
-            if (i + 1) % 5 == 0 and i + 1 < len(movies):
-                print("  Pausing for 1 second to avoid rate limiting...")
-                await asyncio.sleep(1)
-        
-        # Commit all changes
-        db.commit()
-        print("Movie images updated successfully!")
-    
+
+        print(f"Found {total} movies to update")
+
+        started = time.perf_counter()
+        processed = 0
+        for chunk in iter_candidate_chunks(db, batch_size, progress["last_id"], refresh_all):
+            results = await asyncio.gather(*[
+                fetch_image_paths(movie_id, tmdb_id, semaphore) for movie_id, tmdb_id in chunk
+            ])
+            updates = [result for result in results if result is not None]
+
+            # Commit the batch, then move the checkpoint past it
+            if updates:
+                db.execute(update(Movie), updates)
+            db.commit()
+
+            processed += len(chunk)
+            progress["last_id"] = chunk[-1].id
+            progress["updated"] += len(updates)
+            progress["failed"] += len(chunk) - len(updates)
+            save_checkpoint(checkpoint_path, progress)
+
+            elapsed = time.perf_counter() - started
+            print(f"Updated {processed}/{total} movies ({processed / elapsed:.1f} movies/s)")
+
+        elapsed = time.perf_counter() - started
+        print(f"Movie images updated successfully! {processed} movies in {elapsed:.1f}s "
+              f"({processed / elapsed:.1f} movies/s, {progress['failed']} failed)")
+
     except Exception as e:
+        db.rollback()
         print(f"Error updating movie images: {str(e)}")
+        print(f"Progress is saved in {checkpoint_path}; rerun with --resume to continue")
     finally:
         db.close()
 
+async def main():
+    """Run the image update with a shared TMDb connection pool."""
+    parser = argparse.ArgumentParser(description="Update movie image paths from TMDb")
+    parser.add_argument("--all", action="store_true", help="Refresh every movie, not only those missing images")
+    parser.add_argument("--batch-size", type=int, default=100, help="Movies fetched and committed per batch (default: 100)")
+    parser.add_argument("--concurrency", type=int, help="Maximum concurrent TMDb requests (default: IMPORT_DETAIL_WORKERS or 8)")
+    parser.add_argument("--resume", action="store_true", help="Continue after the last batch committed by a previous run")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT_PATH,
+                        help=f"Checkpoint file (default: {DEFAULT_CHECKPOINT_PATH})")
+    args = parser.parse_args()
+
+    async with tmdb_api:
+        await update_movie_images(args.batch_size, args.concurrency, args.all, args.resume, args.checkpoint)
+        print(f"TMDb connection stats: {tmdb_api.format_stats()}")
+
 if __name__ == "__main__":
     print("=== Updating Movie Images from TMDb ===")
-    asyncio.run(update_movie_images()) 
\ No newline at end of file
+    asyncio.run(main())